@@ -1,14 +1,31 @@
+import os
 import sys
-sys.path.append('.') 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import dash
 from dash import html, dcc
 
+from utils.paginas import registrar_paginas, reporte_arranque
+
 mathjax_script = "https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"
 
-app = dash.Dash(__name__, use_pages=True, external_scripts=[mathjax_script])
+# pages_folder="": las páginas las importamos nosotros (utils/paginas.py) para
+# diferir sus layouts pesados y medir el arranque de cada una.
+# CARGA_DIFERIDA=0 arma todos los layouts al arrancar (p. ej. con --preload).
+#
+# Con suppress_callback_exceptions=False, Dash arma su validation_layout
+# llamando al layout de todas las páginas en la primera petición, y nada
+# quedaría diferido. Por eso la validación de IDs solo se hace en modo no
+# diferido, donde los layouts ya están armados igual.
+CARGA_DIFERIDA = os.environ.get('CARGA_DIFERIDA', '1') != '0'
+app = dash.Dash(__name__, use_pages=True, pages_folder="", external_scripts=[mathjax_script],
+                suppress_callback_exceptions=CARGA_DIFERIDA)
 server = app.server 
 
+registrar_paginas('pages', diferida=CARGA_DIFERIDA)
+if os.environ.get('PERFIL_ARRANQUE'):
+    print(reporte_arranque(), file=sys.stderr)
+
 app.layout = html.Div([
     html.Header([
         html.H1("Técnicas de Modelamiento Matemático"),
@@ -0,0 +1,44 @@
+// =====================================================================
+// Modo en vivo (sliders) de SIR / SEIR: espera a que el valor se quede
+// quieto antes de pedirle nada al servidor (debounce).
+//
+// Cada movimiento del slider reinicia la espera; solo el último valor
+// llega al dcc.Store que dispara el callback del servidor, junto con un
+// id de cliente y un número de secuencia para que el servidor descarte
+// los pedidos viejos (utils/en_vivo.py).
+// =====================================================================
+
+(function () {
+    var ESPERA_MS = 200;
+    var cliente = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    var secuencia = 0;
+    var ultimo = {};   // id del store -> número del último movimiento
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        en_vivo: {
+            retrasar: function (activo) {
+                var valores = Array.prototype.slice.call(arguments, 1);
+                if (!activo || !activo.length) {
+                    return window.dash_clientside.no_update;
+                }
+
+                var contexto = window.dash_clientside.callback_context;
+                var clave = JSON.stringify(contexto && contexto.outputs_list ? contexto.outputs_list.id : '');
+                var movimiento = (ultimo[clave] || 0) + 1;
+                ultimo[clave] = movimiento;
+
+                return new Promise(function (resolver) {
+                    setTimeout(function () {
+                        if (ultimo[clave] !== movimiento) {
+                            // Llegó otro movimiento mientras esperábamos
+                            resolver(window.dash_clientside.no_update);
+                            return;
+                        }
+                        secuencia += 1;
+                        resolver({valores: valores, cliente: cliente, secuencia: secuencia});
+                    }, ESPERA_MS);
+                });
+            }
+        }
+    });
+})();
@@ -0,0 +1,44 @@
+// =====================================================================
+// Modelo logístico calculado en el navegador (clientside callback)
+//
+// La curva P(t) = K / (1 + ((K - P0) / P0) * e^(-r t)) es una fórmula
+// cerrada sobre 100 puntos: no necesita al servidor. Esta función es la
+// versión en JavaScript de utils/funciones.grafica_logistica (que sigue
+// siendo la referencia) y la usan clase3.py y clase4.py en modo navegador.
+// =====================================================================
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    modelamiento: {
+        curva_logistica: function (p0, r, k, t_max, n_puntos) {
+            n_puntos = n_puntos || 100;
+            var t = new Array(n_puntos);
+            var poblacion = new Array(n_puntos);
+            var paso = t_max / (n_puntos - 1);   // igual que np.linspace(0, t_max, n)
+            for (var i = 0; i < n_puntos; i++) {
+                t[i] = i === n_puntos - 1 ? t_max : i * paso;
+                poblacion[i] = k / (1 + ((k - p0) / p0) * Math.exp(-r * t[i]));
+            }
+            return {t: t, poblacion: poblacion};
+        },
+
+        logistica: function (n_clicks, p0, r, k, t_max, figura) {
+            // Entradas vacías o inválidas: dejamos la gráfica como está
+            var valores = [p0, r, k, t_max];
+            for (var i = 0; i < valores.length; i++) {
+                if (typeof valores[i] !== 'number' || !isFinite(valores[i])) {
+                    return window.dash_clientside.no_update;
+                }
+            }
+
+            var curva = window.dash_clientside.modelamiento.curva_logistica(p0, r, k, t_max, 100);
+
+            // Copia de la figura actual: solo cambian los arreglos de las trazas
+            var nueva = Object.assign({}, figura);
+            nueva.data = [
+                Object.assign({}, figura.data[0], {x: curva.t, y: curva.poblacion}),
+                Object.assign({}, figura.data[1], {x: [0, t_max], y: [k, k]})
+            ];
+            return nueva;
+        }
+    }
+});
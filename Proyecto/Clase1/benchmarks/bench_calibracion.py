@@ -0,0 +1,47 @@
+# Benchmark: calibración de SIR/SEIR (utils/calibracion.py) con los datos
+# de ejemplo. Mide el multistart con 1, 2, 4, ... procesos, y un segundo
+# ajuste que arranca en caliente desde el anterior. Los parámetros
+# verdaderos son β = 0.3, γ = 0.1, I₀ = 2.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_calibracion.py
+
+import sys
+sys.path.append('.')
+
+import os
+import time
+
+from utils.cache import CacheLRU
+from utils.calibracion import calibrar, datos_ejemplo
+
+INICIOS = 16
+
+
+def medir(modelo, procesos, cache=None, perdida='mc'):
+    t, casos = datos_ejemplo()
+    inicio = time.perf_counter()
+    resultado = calibrar(t, casos, modelo, 1000, 'I', perdida, n_inicios=INICIOS, procesos=procesos, cache=cache)
+    return time.perf_counter() - inicio, resultado
+
+
+def resumen(resultado):
+    return '  '.join(f"{nombre}={valor:.3g}" for nombre, (valor, _, _) in resultado['parametros'].items())
+
+
+if __name__ == '__main__':
+    nucleos = os.cpu_count() or 1
+    print(f"{nucleos} núcleos disponibles, {INICIOS} puntos de partida")
+    print(f"{'modelo':>7} {'procesos':>9} {'s':>7} {'evaluaciones':>13}  parámetros")
+    for modelo in ('sir', 'seir'):
+        procesos = 1
+        while procesos <= nucleos:
+            segundos, resultado = medir(modelo, procesos)
+            print(f"{modelo:>7} {procesos:>9} {segundos:7.2f} {resultado['evaluaciones']:13d}  {resumen(resultado)}")
+            procesos *= 2
+
+    # Arranque en caliente: el ajuste de Poisson parte del de mínimos cuadrados
+    cache = CacheLRU()
+    medir('sir', 1, cache)
+    segundos, resultado = medir('sir', 1, cache, perdida='poisson')
+    print(f"\nPoisson con {resultado['previos']} ajuste(s) previo(s): {segundos:.2f} s, "
+          f"{resultado['evaluaciones']} evaluaciones  {resumen(resultado)}")
@@ -0,0 +1,49 @@
+# Benchmark: construcción de los segmentos del campo vectorial (clase5.py)
+# con el doble bucle original frente a utils/campo.segmentos, y malla
+# uniforme frente a utils/campo.malla_adaptativa con el mismo detalle fino.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_campo.py
+
+import sys
+sys.path.append('.')
+
+import timeit
+
+import numpy as np
+
+from utils.campo import malla_adaptativa, segmentos
+from utils.expresiones import compilar_sistema
+
+
+def segmentos_bucle(x, y, x_end, y_end, mallado):
+    # Copia fiel del bucle original de update_vector_field
+    plot_x_lines = []
+    plot_y_lines = []
+
+    for i in range(mallado):
+        for j in range(mallado):
+            plot_x_lines.extend([x[i, j], x_end[i, j], None])
+            plot_y_lines.extend([y[i, j], y_end[i, j], None])
+    return plot_x_lines, plot_y_lines
+
+
+if __name__ == '__main__':
+    print(f"{'mallado':>8} {'bucle (ms)':>12} {'numpy (ms)':>12} {'aceleración':>12}")
+    for mallado in (20, 50, 100, 200, 500):
+        vals = np.linspace(-3, 3, mallado)
+        x, y = np.meshgrid(vals, vals)
+        x_end, y_end = x - 0.1 * y, y + 0.1 * x
+
+        repeticiones = max(1, 2000 // mallado)
+        bucle = min(timeit.repeat(lambda: segmentos_bucle(x, y, x_end, y_end, mallado),
+                                  number=repeticiones, repeat=3)) / repeticiones
+        vectorizado = min(timeit.repeat(lambda: segmentos(x, y, x_end, y_end),
+                                        number=repeticiones, repeat=3)) / repeticiones
+        print(f"{mallado:>8} {bucle * 1e3:12.3f} {vectorizado * 1e3:12.3f} {bucle / vectorizado:11.0f}x")
+
+    # Adaptativo: malla gruesa de 20 + 3 niveles = detalle de una uniforme de 160
+    print(f"\n{'campo':>28} {'evaluaciones':>13} {'vectores':>9} {'uniforme 160':>13}")
+    for ecuaciones in (('-y', 'x'), ('x', '-y'), ('np.sin(x)', 'np.cos(y)'), ('x*(1-x)', 'y')):
+        campo = compilar_sistema(*ecuaciones)
+        x, _, _, _, _, evaluaciones = malla_adaptativa(campo, 3, 3, 20, niveles=3)
+        print(f"{' | '.join(ecuaciones):>28} {evaluaciones:13d} {x.size:9d} {160 * 160:13d}")
@@ -0,0 +1,40 @@
+# Benchmark: ensamble de 10.000 realizaciones del SIR estocástico
+# (utils/estocastico.py) con 1, 2, 4, ... procesos. Con la misma semilla
+# el resultado debe ser idéntico sin importar el número de procesos.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_estocastico.py
+
+import sys
+sys.path.append('.')
+
+import os
+import time
+
+import numpy as np
+
+from utils.estocastico import ensamble
+
+REALIZACIONES = 10000
+
+
+def medir(metodo, procesos):
+    t_eval = np.linspace(0, 100, 201)
+    inicio = time.perf_counter()
+    trayectorias = ensamble('sir', [999, 1, 0], t_eval, (0.3, 0.1, 1000), REALIZACIONES,
+                            metodo, semilla=1, procesos=procesos)
+    return time.perf_counter() - inicio, trayectorias
+
+
+if __name__ == '__main__':
+    nucleos = os.cpu_count() or 1
+    print(f"{nucleos} núcleos disponibles")
+    print(f"{'método':>10} {'procesos':>9} {'s':>7} {'aceleración':>12} {'igual a 1 proc.':>16}")
+    for metodo in ('gillespie', 'tau'):
+        base, referencia = medir(metodo, 1)
+        print(f"{metodo:>10} {1:>9} {base:7.2f} {1.0:11.1f}x {'-':>16}")
+        procesos = 2
+        while procesos <= nucleos:
+            segundos, trayectorias = medir(metodo, procesos)
+            igual = np.array_equal(trayectorias, referencia)
+            print(f"{metodo:>10} {procesos:>9} {segundos:7.2f} {base / segundos:11.1f}x {str(igual):>16}")
+            procesos *= 2
@@ -0,0 +1,70 @@
+# Benchmark: construcción de la figura SIR (clase6.py) con el
+# fig.update_layout(...) original frente a la plantilla + fábrica de
+# utils/figuras.py. Se mide armar la figura y armarla + serializarla a
+# JSON (lo que hace Dash antes de responder).
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_figuras.py
+
+import sys
+sys.path.append('.')
+
+import timeit
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+
+from utils.figuras import figura
+
+
+def figura_original(t, S, I, R, t_max):
+    # Copia fiel de crear_figura_sir antes de la plantilla
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')))
+    fig.update_layout(
+        title=dict(text='<b>Evolución del Modelo SIR</b>', font=dict(color='#880e4f', size=16)),
+        title_x=0.5,
+        xaxis_title='Tiempo (días)',
+        yaxis_title='Número de personas',
+        height=450,
+        legend=dict(x=0.02, y=0.98),
+        plot_bgcolor='white',
+        paper_bgcolor='rgba(0,0,0,0)',
+        xaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True,
+                   zerolinewidth=2, zerolinecolor='black', range=[0, t_max]),
+        yaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True,
+                   zerolinewidth=2, zerolinecolor='black')
+    )
+    return fig
+
+
+def figura_plantilla(t, S, I, R, t_max):
+    return figura(
+        [
+            go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')),
+            go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')),
+            go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')),
+        ],
+        titulo='<b>Evolución del Modelo SIR</b>',
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max])
+    )
+
+
+def medir(funcion, repeticiones=100):
+    return min(timeit.repeat(funcion, number=repeticiones, repeat=5)) / repeticiones
+
+
+if __name__ == '__main__':
+    t = np.linspace(0, 100, 500)
+    S, I, R = np.exp(-t / 30), 1 - np.exp(-t / 30), t / 100
+    datos = (t, S, I, R, 100)
+
+    print(f"{'':>22} {'original (ms)':>14} {'plantilla (ms)':>15} {'aceleración':>12}")
+    for etiqueta, envolver in (('armar', lambda f: f), ('armar + JSON', lambda f: to_json_plotly(f))):
+        original = medir(lambda: envolver(figura_original(*datos)))
+        plantilla = medir(lambda: envolver(figura_plantilla(*datos)))
+        print(f"{etiqueta:>22} {original * 1e3:14.2f} {plantilla * 1e3:15.2f} {original / plantilla:11.1f}x")
@@ -0,0 +1,61 @@
+# Benchmark: SEIR metapoblacional (utils/metapoblacion.py) en cuadrículas
+# de 10 x 10 a 100 x 100 distritos. Compara una evaluación del RHS con la
+# matriz de contactos dispersa frente al bucle denso O(n²) en Python
+# (solo para las mallas chicas) y mide la simulación completa de un año.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_metapoblacion.py
+
+import sys
+sys.path.append('.')
+
+import time
+
+import numpy as np
+
+from utils.metapoblacion import estado_inicial, malla_distritos, seir_meta
+from utils.modelos import integrar
+
+BETA, GAMMA, SIGMA = 0.5, 0.1, 0.2
+
+
+def seir_meta_bucles(y, dy, beta, gamma, sigma, C, N):
+    # La versión ingenua: doble bucle sobre todos los pares de distritos
+    n = len(N)
+    for i in range(n):
+        fuerza = 0.0
+        for j in range(n):
+            fuerza += C[i, j] * y[j, 2] / N[j]
+        contagios = beta * y[i, 0] * fuerza
+        dy[i] = [-contagios, contagios - sigma * y[i, 1], sigma * y[i, 1] - gamma * y[i, 2], gamma * y[i, 2]]
+    return dy
+
+
+def por_llamada(funcion, *args, repeticiones=20):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(*args)
+    return (time.perf_counter() - inicio) / repeticiones * 1e3
+
+
+if __name__ == '__main__':
+    print(f"{'distritos':>10} {'RHS disperso ms':>16} {'RHS bucles ms':>14} {'año ms':>9} {'pasos':>6}")
+    for lado in (10, 30, 70, 100):
+        n = lado * lado
+        C = malla_distritos(lado, 0.05)
+        N = np.full(n, 1e4)
+        y0 = estado_inicial(N, 10, (lado // 2) * lado + lado // 2)
+        dy = np.empty_like(y0)
+        args = (BETA, GAMMA, SIGMA, C, N)
+
+        disperso = por_llamada(seir_meta, y0, dy, *args)
+        if n <= 900:
+            denso = C.toarray()
+            bucles = f"{por_llamada(seir_meta_bucles, y0, dy, BETA, GAMMA, SIGMA, denso, N, repeticiones=1):14.1f}"
+        else:
+            bucles = f"{'-':>14}"
+
+        info = {}
+        inicio = time.perf_counter()
+        integrar(seir_meta, y0, np.linspace(0, 365, 201), args=args, info=info)
+        ano = (time.perf_counter() - inicio) * 1e3
+        print(f"{n:>10} {disperso:16.3f} {bucles} {ano:9.1f} {info['pasos']:6d}")
@@ -0,0 +1,74 @@
+# Benchmark: latencia por simulación del motor compartido (utils/modelos.py)
+# frente a la llamada original a solve_ivp con un closure que devuelve listas.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_modelos.py
+
+import sys
+sys.path.append('.')
+
+import timeit
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from utils.modelos import barrido_sir, integrar, sir, seir
+
+REPETICIONES = 50
+
+
+def sir_solve_ivp(N, beta, gamma, I0, t_max):
+    # Copia fiel del callback original de clase6.py
+    def sir_model(t, y):
+        S, I, R = y
+        dSdt = - (beta * S * I) / N
+        dIdt = (beta * S * I) / N - gamma * I
+        dRdt = gamma * I
+        return [dSdt, dIdt, dRdt]
+
+    t_eval = np.linspace(0, t_max, 500)
+    return solve_ivp(sir_model, [0, t_max], [N - I0, I0, 0], t_eval=t_eval, method='RK45')
+
+
+def seir_solve_ivp(N, beta, gamma, sigma, I0, E0, t_max):
+    # Copia fiel del callback original de clase7.py
+    def seir_model(t, y):
+        S, E, I, R = y
+        dSdt = - (beta * S * I) / N
+        dEdt = (beta * S * I) / N - sigma * E
+        dIdt = sigma * E - gamma * I
+        dRdt = gamma * I
+        return [dSdt, dEdt, dIdt, dRdt]
+
+    t_eval = np.linspace(0, t_max, 500)
+    return solve_ivp(seir_model, [0, t_max], [N - I0 - E0, E0, I0, 0], t_eval=t_eval, method='RK45')
+
+
+def medir(nombre, funcion, simulaciones=1):
+    segundos = min(timeit.repeat(funcion, number=REPETICIONES, repeat=3)) / REPETICIONES
+    print(f"{nombre:<45} {segundos * 1e3:9.3f} ms/llamada {segundos * 1e3 / simulaciones:9.4f} ms/simulación")
+
+
+if __name__ == '__main__':
+    t_eval = np.linspace(0, 100, 500)
+
+    print("--- SIR (N=1000, beta=0.3, gamma=0.1, 100 días) ---")
+    medir("solve_ivp RK45 (original)", lambda: sir_solve_ivp(1000, 0.3, 0.1, 1, 100))
+    medir("integrar adaptativo", lambda: integrar(sir, [999, 1, 0], t_eval, args=(0.3, 0.1, 1000)))
+    medir("integrar rk4", lambda: integrar(sir, [999, 1, 0], t_eval, args=(0.3, 0.1, 1000), metodo='rk4'))
+
+    print("--- SEIR (N=1000, beta=0.5, gamma=0.1, sigma=0.2, 100 días) ---")
+    medir("solve_ivp RK45 (original)", lambda: seir_solve_ivp(1000, 0.5, 0.1, 0.2, 1, 0, 100))
+    medir("integrar adaptativo", lambda: integrar(seir, [999, 0, 1, 0], t_eval, args=(0.5, 0.1, 0.2, 1000)))
+
+    print("--- Lote de 1000 SIR (beta en [0.1, 1.0]) ---")
+    betas = np.linspace(0.1, 1.0, 1000)
+    y0 = np.tile([999.0, 1.0, 0.0], (len(betas), 1))
+    medir("integrar rk4 (lote)", lambda: integrar(sir, y0, t_eval, args=(betas, 0.1, 1000), metodo='rk4'), len(betas))
+    medir("integrar adaptativo (lote)", lambda: integrar(sir, y0, t_eval, args=(betas, 0.1, 1000)), len(betas))
+
+    print("--- Barrido SIR 100 x 100 (beta x gamma) ---")
+    betas, gammas = np.linspace(0.05, 1.0, 100), np.linspace(0.02, 0.5, 100)
+    segundos = min(timeit.repeat(lambda: barrido_sir(1000, betas, gammas, 1, 100), number=1, repeat=3))
+    segundos_ivp = min(timeit.repeat(lambda: sir_solve_ivp(1000, 0.3, 0.1, 1, 100), number=REPETICIONES, repeat=3)) / REPETICIONES
+    print(f"{'barrido_sir (10.000 simulaciones)':<45} {segundos * 1e3:9.3f} ms/llamada "
+          f"= {segundos / segundos_ivp:.0f} llamadas a solve_ivp")
@@ -0,0 +1,42 @@
+# Benchmark: parámetros "peores casos" de SIR/SEIR (β enorme, σ o γ muy
+# grandes) con Dormand-Prince solo (metodo='adaptativo') frente a la
+# selección automática de utils/modelos.integrar (metodo='auto'), que
+# cambia a BDF con el jacobiano analítico al detectar rigidez. Muestra
+# tiempo, pasos, evaluaciones del RHS y el método que terminó usando.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_rigidez.py
+
+import sys
+sys.path.append('.')
+
+import time
+
+from utils.modelos import integrar, seir, sir
+from utils.submuestreo import tiempos_densos
+
+CASOS = [
+    ('SIR normal', sir, [999, 1, 0], (0.3, 0.1, 1000), 100),
+    ('SIR β=1000', sir, [999, 1, 0], (1000, 0.1, 1000), 1000),
+    ('SIR γ=5, β=5000', sir, [999, 1, 0], (5000, 5, 1000), 1000),
+    ('SIR N=1e6, γ=0.001', sir, [1e6 - 1, 1, 0], (50, 0.001, 1e6), 10000),
+    ('SEIR normal', seir, [999, 0, 1, 0], (0.5, 0.1, 0.2, 1000), 100),
+    ('SEIR σ=500, β=1000', seir, [999, 0, 1, 0], (1000, 0.1, 500, 1000), 1000),
+]
+
+
+def correr(rhs, y0, args, t_max, metodo):
+    info = {}
+    inicio = time.perf_counter()
+    integrar(rhs, y0, tiempos_densos(t_max), args=args, metodo=metodo, info=info)
+    return (time.perf_counter() - inicio) * 1e3, info
+
+
+if __name__ == '__main__':
+    correr(sir, [999, 1, 0], (1000, 0.1, 1000), 10, 'auto')  # Calienta scipy
+
+    print(f"{'caso':>20} {'método':>14} {'ms':>9} {'pasos':>8} {'RHS':>9} {'jac':>4}")
+    for nombre, rhs, y0, args, t_max in CASOS:
+        for metodo in ('adaptativo', 'auto'):
+            ms, info = correr(rhs, y0, args, t_max, metodo)
+            print(f"{nombre:>20} {info['metodo']:>14} {ms:9.1f} {info['pasos']:8d} "
+                  f"{info['evaluaciones']:9d} {info['jacobianos']:4d}")
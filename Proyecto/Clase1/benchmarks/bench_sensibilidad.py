@@ -0,0 +1,47 @@
+# Benchmark: índices de Sobol del SEIR (utils/sensibilidad.py) con ~10^5
+# simulaciones. Mide el tiempo con 1, 2, 4, ... procesos y el pico de
+# memoria (tracemalloc, solo el proceso principal) según el tamaño de
+# trozo: la memoria depende del trozo, no del total de simulaciones.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_sensibilidad.py
+
+import sys
+sys.path.append('.')
+
+import os
+import time
+import tracemalloc
+
+from utils.sensibilidad import sobol
+
+LIMITES = [(0.1, 1.0), (0.05, 0.5), (0.1, 1.0)]
+MUESTRAS = 2 ** 14  # 2^14 · (3 + 2) = 81.920 simulaciones
+
+
+def medir(procesos, tamano_trozo):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = sobol(LIMITES, MUESTRAS, semilla=0, procesos=procesos, tamano_trozo=tamano_trozo)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2 ** 20, resultado
+
+
+if __name__ == '__main__':
+    nucleos = os.cpu_count() or 1
+    print(f"{nucleos} núcleos disponibles")
+    print(f"{'procesos':>9} {'trozo':>7} {'s':>7} {'MB pico':>8} {'simulaciones':>13}")
+    for tamano_trozo in (1024, 4096, 16384):
+        segundos, memoria, resultado = medir(1, tamano_trozo)
+        print(f"{1:>9} {tamano_trozo:>7} {segundos:7.2f} {memoria:8.1f} {resultado['evaluaciones']:13d}")
+
+    procesos = 2
+    while procesos <= nucleos:
+        segundos, memoria, resultado = medir(procesos, 4096)
+        print(f"{procesos:>9} {4096:>7} {segundos:7.2f} {memoria:8.1f} {resultado['evaluaciones']:13d}")
+        procesos *= 2
+
+    print("\nS1 / ST del pico de infectados:")
+    for simbolo, s1, st in zip('βγσ', resultado['S1'][:, 0], resultado['ST'][:, 0]):
+        print(f"  {simbolo}: {s1:.3f} / {st:.3f}")
@@ -0,0 +1,39 @@
+# Benchmark: SIR de clase6.py evaluado en np.linspace(0, t_max, 500)
+# frente a la malla densa + LTTB de utils/submuestreo.py. Para varios
+# horizontes se compara el pico de infectados que llega a la gráfica
+# (contra una referencia muy fina), los puntos enviados y el tiempo.
+#
+# Uso (desde Proyecto/Clase1):  python benchmarks/bench_submuestreo.py
+
+import sys
+sys.path.append('.')
+
+import timeit
+
+import numpy as np
+
+from utils.modelos import integrar, sir
+from utils.submuestreo import submuestrear, tiempos_densos
+
+PARAMETROS = (0.3, 0.1, 1000)
+
+
+def original(t_max):
+    t = np.linspace(0, t_max, 500)
+    return t, *integrar(sir, [999, 1, 0], t, args=PARAMETROS).T
+
+
+def submuestreado(t_max):
+    t = tiempos_densos(t_max)
+    return submuestrear(t, *integrar(sir, [999, 1, 0], t, args=PARAMETROS).T)
+
+
+if __name__ == '__main__':
+    print(f"{'t_max':>8} {'pico ref.':>10} {'pico 500':>10} {'pico LTTB':>10} {'puntos':>7} {'500 (ms)':>9} {'LTTB (ms)':>10}")
+    for t_max in (100, 1000, 10000, 100000):
+        referencia = integrar(sir, [999, 1, 0], np.linspace(0, t_max, 200000), args=PARAMETROS)[:, 1].max()
+        t1, _, I1, _ = original(t_max)
+        t2, _, I2, _ = submuestreado(t_max)
+        ms1 = min(timeit.repeat(lambda: original(t_max), number=3, repeat=3)) / 3 * 1e3
+        ms2 = min(timeit.repeat(lambda: submuestreado(t_max), number=3, repeat=3)) / 3 * 1e3
+        print(f"{t_max:>8} {referencia:10.2f} {I1.max():10.2f} {I2.max():10.2f} {len(t2):>7} {ms1:9.1f} {ms2:10.1f}")
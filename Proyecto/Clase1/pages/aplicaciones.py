@@ -2,39 +2,61 @@ import dash
 from dash import html, dcc
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import solve_ivp
+
+from utils.estocastico import bandas, ensamble
+from utils.figuras import trazas_banda
+from utils.compartimentos import modelo_compartimental
+from utils.modelos import integrar, sir
+from utils.submuestreo import submuestrear, tiempos_densos
+from utils.paginas import layout_diferido
+from utils.precalculo import figura_precalculada
 
 # --- 1. Registro de la página ---
 dash.register_page(__name__, path='/aplicaciones-sir', name='Aplicaciones SIR (Resumen)')
 
-# --- 2. Funciones para generar las Gráficas (simuladas en vivo) ---
+# --- 2. Funciones para generar las Gráficas ---
+# Los parámetros son fijos: las figuras se precalculan en precalculado/
+# (utils/precalculo.py) y solo se vuelven a simular si algo cambia.
+
+# Parámetros del Caso 1 (30 días es suficiente para ver este brote)
+PARAMETROS_CASO1 = dict(N=7138, I0=1, beta=1 / 7138, gamma=0.40, t_max=30)
+
+# Parámetros del Caso 2: S=266, I=1, R=8 (Total ~275)
+PARAMETROS_CASO2 = dict(S0=266, I0=1, R0=8, b=0.004, k_normal=0.01, k_alto=0.02, t_max=15)
+
+# Parámetros del Caso 3
+PARAMETROS_CASO3 = dict(S0=10000, I0=50, R0=0, b=0.00005, k=0.00002, t_max=100)
+
+# Rumor y política tienen la estructura del SIR de acción de masas, con
+# sus propios nombres (utils/compartimentos.py compila RHS y jacobiano)
+RUMOR = modelo_compartimental(
+    'rumor', ('S', 'P', 'R'),           # no lo oyeron, propagadores, racionales
+    [('S', 'P', 'b', ('S', 'P')),       # quien oye el rumor lo propaga
+     ('P', 'R', 'k')],                  # los propagadores se vuelven escépticos
+    ('b', 'k')
+)
 
-def grafica_caso1_epidemia():
-    # Parámetros del Caso 1
-    N = 7138
-    I0, R0 = 1, 0
+POLITICA = modelo_compartimental(
+    'politica', ('S', 'I', 'R'),        # no adoptaron, influyentes, rechazadores
+    [('S', 'I', 'b', ('S', 'I')),
+     ('I', 'R', 'k')],
+    ('b', 'k')
+)
+
+def grafica_caso1_epidemia(N, I0, beta, gamma, t_max):
+    R0 = 0
     S0 = N - I0 - R0
-    beta = 1 / 7138
-    gamma = 0.40
-    t_max = 30 # 30 días es suficiente para ver este brote
-
-    # Ecuaciones
-    def sir_model(t, y):
-        S, I, R = y
-        dSdt = -beta * S * I
-        dIdt = beta * S * I - gamma * I
-        dRdt = gamma * I
-        return [dSdt, dIdt, dRdt]
-
-    # Resolver
-    t_eval = np.linspace(0, t_max, 200)
-    sol = solve_ivp(sir_model, [0, t_max], [S0, I0, R0], t_eval=t_eval)
+
+    # Resolver (SIR de acción de masas: beta*S*I, sin dividir entre N)
+    t_eval = tiempos_densos(t_max)
+    y = integrar(sir, [S0, I0, R0], t_eval, args=(beta, gamma))
+    t_eval, S, I, R = submuestrear(t_eval, *y.T) # Puntos de pantalla (utils/submuestreo.py)
 
     # Figura
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[0], name='Susceptibles', line=dict(color='blue')))
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[1], name='Infectados', line=dict(color='red')))
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[2], name='Recuperados', line=dict(color='green')))
+    fig.add_trace(go.Scatter(x=t_eval, y=S, name='Susceptibles', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=t_eval, y=I, name='Infectados', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=t_eval, y=R, name='Recuperados', line=dict(color='green')))
     
     fig.update_layout(
         title="Dinámica de la Epidemia (N=7138)",
@@ -46,37 +68,24 @@ def grafica_caso1_epidemia():
     )
     return fig
 
-def grafica_caso2_rumor():
-    # Parámetros del Caso 2
-    # S=266, I=1, R=8 (Total ~275)
-    S0, I0, R0 = 266, 1, 8
-    b = 0.004
-    k_normal = 0.01
-    k_alto = 0.02
-    t_max = 15
-
-    def rumor_model(t, y, k_val):
-        S, I, R = y
-        dSdt = -b * S * I
-        dIdt = b * S * I - k_val * I
-        dRdt = k_val * I
-        return [dSdt, dIdt, dRdt]
-
-    t_eval = np.linspace(0, t_max, 200)
-    
-    # Simulación 1 (k=0.01)
-    sol1 = solve_ivp(lambda t, y: rumor_model(t, y, k_normal), [0, t_max], [S0, I0, R0], t_eval=t_eval)
-    # Simulación 2 (k=0.02) - Solo para comparar
-    sol2 = solve_ivp(lambda t, y: rumor_model(t, y, k_alto), [0, t_max], [S0, I0, R0], t_eval=t_eval)
+def grafica_caso2_rumor(S0, I0, R0, b, k_normal, k_alto, t_max):
+    t_eval = tiempos_densos(t_max)
+
+    # Ambas simulaciones (k=0.01 y k=0.02) en una sola pasada: estado (2, 3)
+    k_vals = np.array([k_normal, k_alto])
+    y0 = np.tile([S0, I0, R0], (len(k_vals), 1))
+    y = integrar(RUMOR.rhs, y0, t_eval, args=(b, k_vals))
+    # Solo las series que se grafican, reducidas a los puntos de pantalla
+    t_eval, S1, I1, R1, I2 = submuestrear(t_eval, *y[:, 0].T, y[:, 1, 1])
 
     fig = go.Figure()
     # Curvas principales (k=0.01)
-    fig.add_trace(go.Scatter(x=sol1.t, y=sol1.y[0], name='Susceptibles (k=0.01)', line=dict(color='blue')))
-    fig.add_trace(go.Scatter(x=sol1.t, y=sol1.y[1], name='Propagadores (k=0.01)', line=dict(color='red')))
-    fig.add_trace(go.Scatter(x=sol1.t, y=sol1.y[2], name='Racionales (k=0.01)', line=dict(color='green')))
+    fig.add_trace(go.Scatter(x=t_eval, y=S1, name='Susceptibles (k=0.01)', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=t_eval, y=I1, name='Propagadores (k=0.01)', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=t_eval, y=R1, name='Racionales (k=0.01)', line=dict(color='green')))
     
     # Comparación (k=0.02) - Punteada
-    fig.add_trace(go.Scatter(x=sol2.t, y=sol2.y[1], name='Propagadores (k=0.02)', line=dict(color='red', dash='dot')))
+    fig.add_trace(go.Scatter(x=t_eval, y=I2, name='Propagadores (k=0.02)', line=dict(color='red', dash='dot')))
 
     fig.update_layout(
         title="Propagación del Rumor (Comparativa k)",
@@ -88,27 +97,54 @@ def grafica_caso2_rumor():
     )
     return fig
 
-def grafica_caso3_politica():
-    # Parámetros del Caso 3
-    S0, I0, R0 = 10000, 50, 0
-    b = 0.00005
-    k = 0.00002
-    t_max = 100
+# Versiones estocásticas: con 275 alumnos el rumor puede morir solo. Semilla
+# fija, así la figura precalculada es reproducible.
+PARAMETROS_CASO2_ESTOCASTICO = dict(S0=266, I0=1, R0=8, b=0.004, k=0.01, t_max=15,
+                                    n_realizaciones=2000, metodo='gillespie', semilla=275)
+PARAMETROS_CASO3_ESTOCASTICO = dict(S0=10000, I0=50, R0=0, b=0.00005, k=0.00002, t_max=100,
+                                    n_realizaciones=1000, metodo='tau', semilla=10050)
+
+
+def grafica_estocastica(modelo, S0, I0, R0, b, k, t_max, n_realizaciones, metodo, semilla, titulo, nombres):
+    t_eval = np.linspace(0, t_max, 151)
+    trayectorias = ensamble(modelo, [S0, I0, R0], t_eval, (b, k), n_realizaciones, metodo, semilla)
+    inferior, mediana, superior = bandas(trayectorias, (0.05, 0.5, 0.95))
+
+    fig = go.Figure()
+    colores = (('blue', 'rgba(0, 0, 255, 0.15)'), ('red', 'rgba(255, 0, 0, 0.15)'), ('green', 'rgba(0, 128, 0, 0.15)'))
+    for c, (nombre, (color, relleno)) in enumerate(zip(nombres, colores)):
+        fig.add_traces(trazas_banda(t_eval, inferior[:, c], mediana[:, c], superior[:, c], nombre, color, relleno))
+
+    fig.update_layout(
+        title=f"{titulo} ({n_realizaciones} realizaciones, mediana y banda 5-95 %)",
+        xaxis_title="Días",
+        height=350,
+        margin=dict(l=20, r=20, t=40, b=20),
+        plot_bgcolor='white'
+    )
+    return fig
+
 
-    def policy_model(t, y):
-        S, I, R = y
-        dSdt = -b * S * I
-        dIdt = b * S * I - k * I
-        dRdt = k * I
-        return [dSdt, dIdt, dRdt]
+def grafica_caso2_estocastica(**parametros):
+    return grafica_estocastica(RUMOR, **parametros, titulo="Rumor estocástico (k=0.01)",
+                               nombres=('Susceptibles', 'Propagadores', 'Racionales'))
 
-    t_eval = np.linspace(0, t_max, 200)
-    sol = solve_ivp(policy_model, [0, t_max], [S0, I0, R0], t_eval=t_eval)
+
+def grafica_caso3_estocastica(**parametros):
+    return grafica_estocastica(POLITICA, **parametros, titulo="Política estocástica (tau-leaping)",
+                               nombres=('Susceptibles', 'Influyentes', 'Rechazadores'))
+
+
+def grafica_caso3_politica(S0, I0, R0, b, k, t_max):
+    # Misma estructura SIR de acción de masas (b*S*I, k*I)
+    t_eval = tiempos_densos(t_max)
+    y = integrar(POLITICA.rhs, [S0, I0, R0], t_eval, args=(b, k))
+    t_eval, S, I, R = submuestrear(t_eval, *y.T)
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[0], name='Susceptibles', line=dict(color='blue')))
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[1], name='Influyentes', line=dict(color='red')))
-    fig.add_trace(go.Scatter(x=sol.t, y=sol.y[2], name='Rechazadores', line=dict(color='green')))
+    fig.add_trace(go.Scatter(x=t_eval, y=S, name='Susceptibles', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=t_eval, y=I, name='Influyentes', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=t_eval, y=R, name='Rechazadores', line=dict(color='green')))
     
     fig.update_layout(
         title="Adopción de Política Pública",
@@ -122,93 +158,108 @@ def grafica_caso3_politica():
 
 
 # --- 3. Definición del Layout ---
-layout = html.Div(className='content-container', children=[
+# Se arma en la primera visita; las figuras se cargan de precalculado/
+@layout_diferido
+def layout():
+    return html.Div(className='content-container', children=[
     
-    html.Div(className='card', style={'width': '100%'}, children=[
+        html.Div(className='card', style={'width': '100%'}, children=[
         
-        html.H1("Aplicaciones y Generalización del Modelo SIR"),
+            html.H1("Aplicaciones y Generalización del Modelo SIR"),
         
-        dcc.Markdown(r"""
-            Como hemos visto en los modelos SIR y SEIR, el sistema básico de Ecuaciones
-            Diferenciales puede modelar la propagación de una enfermedad.
+            dcc.Markdown(r"""
+                Como hemos visto en los modelos SIR y SEIR, el sistema básico de Ecuaciones
+                Diferenciales puede modelar la propagación de una enfermedad.
             
-            Sin embargo, el concepto de "contagio" es más general. El mismo modelo
-            matemático puede usarse para describir cualquier proceso donde una "idea"
-            o "estado" se transfiere por contacto en una población cerrada.
-        """),
+                Sin embargo, el concepto de "contagio" es más general. El mismo modelo
+                matemático puede usarse para describir cualquier proceso donde una "idea"
+                o "estado" se transfiere por contacto en una población cerrada.
+            """),
         
-        html.Hr(),
+            html.Hr(),
 
-        # --- Pestañas (Tabs) ---
-        dcc.Tabs(id='tabs-sir-aplicaciones', value='tab-1', children=[
+            # --- Pestañas (Tabs) ---
+            dcc.Tabs(id='tabs-sir-aplicaciones', value='tab-1', children=[
             
-            # --- PESTAÑA 1: EPIDEMIA ---
-            dcc.Tab(label='Caso 1: Epidemia', value='tab-1', children=[
-                html.Div(className='tab-content', children=[
-                    html.H3("Escenario: Brote de Enfermedad"),
-                    dcc.Markdown(r"""
-                        * **S (Susceptibles):** Estudiantes sanos.
-                        * **I (Infectados):** Estudiantes enfermos que contagian.
-                        * **R (Recuperados):** Estudiantes inmunes.
-                    """),
+                # --- PESTAÑA 1: EPIDEMIA ---
+                dcc.Tab(label='Caso 1: Epidemia', value='tab-1', children=[
+                    html.Div(className='tab-content', children=[
+                        html.H3("Escenario: Brote de Enfermedad"),
+                        dcc.Markdown(r"""
+                            * **S (Susceptibles):** Estudiantes sanos.
+                            * **I (Infectados):** Estudiantes enfermos que contagian.
+                            * **R (Recuperados):** Estudiantes inmunes.
+                        """),
                     
-                    html.H4("Parámetros: N=7138, R0 ≈ 2.5"),
+                        html.H4("Parámetros: N=7138, R0 ≈ 2.5"),
                     
-                    # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
-                    dcc.Graph(figure=grafica_caso1_epidemia()),
+                        # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
+                        dcc.Graph(figure=figura_precalculada('aplicaciones_caso1', PARAMETROS_CASO1, grafica_caso1_epidemia)),
                     
-                    dcc.Markdown(r"""
-                        **Conclusión Clave:** Dado que $R_0 > 1$, la epidemia es inevitable.
-                        El pico ocurre cuando los susceptibles bajan al umbral crítico $S_c \approx 2855$.
-                    """, mathjax=True)
-                ])
-            ]),
+                        dcc.Markdown(r"""
+                            **Conclusión Clave:** Dado que $R_0 > 1$, la epidemia es inevitable.
+                            El pico ocurre cuando los susceptibles bajan al umbral crítico $S_c \approx 2855$.
+                        """, mathjax=True)
+                    ])
+                ]),
             
-            # --- PESTAÑA 2: RUMOR ---
-            dcc.Tab(label='Caso 2: Rumor', value='tab-2', children=[
-                html.Div(className='tab-content', children=[
-                    html.H3("Escenario: Rumor en la Facultad"),
-                    dcc.Markdown(r"""
-                        * **S:** Alumnos que no han oído el rumor.
-                        * **I (Propagadores):** Alumnos que creen y difunden.
-                        * **R (Racionales):** Alumnos que no creen/olvidan.
-                    """),
-
-                    html.H4("Parámetros: N=275, b=0.004"),
-                    dcc.Markdown("Comparamos $k=0.01$ (línea sólida) vs $k=0.02$ (línea punteada)."),
-
-                    # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
-                    dcc.Graph(figure=grafica_caso2_rumor()),
-
-                    dcc.Markdown(r"""
-                        **Conclusión Clave:** El modelo muestra cómo el factor social $k$ (escepticismo)
-                        es crítico para "aplanar la curva" del rumor.
-                    """, mathjax=True)
-                ])
-            ]),
+                # --- PESTAÑA 2: RUMOR ---
+                dcc.Tab(label='Caso 2: Rumor', value='tab-2', children=[
+                    html.Div(className='tab-content', children=[
+                        html.H3("Escenario: Rumor en la Facultad"),
+                        dcc.Markdown(r"""
+                            * **S:** Alumnos que no han oído el rumor.
+                            * **I (Propagadores):** Alumnos que creen y difunden.
+                            * **R (Racionales):** Alumnos que no creen/olvidan.
+                        """),
+
+                        html.H4("Parámetros: N=275, b=0.004"),
+                        dcc.Markdown("Comparamos $k=0.01$ (línea sólida) vs $k=0.02$ (línea punteada)."),
+
+                        # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
+                        dcc.Graph(figure=figura_precalculada('aplicaciones_caso2', PARAMETROS_CASO2, grafica_caso2_rumor)),
+
+                        dcc.Markdown(r"""
+                            **Conclusión Clave:** El modelo muestra cómo el factor social $k$ (escepticismo)
+                            es crítico para "aplanar la curva" del rumor.
+
+                            Con tan pocos alumnos el azar pesa: simulando contagios y "olvidos" uno
+                            por uno (algoritmo de Gillespie), la banda muestra cuánto cambia el
+                            resultado de una realización a otra.
+                        """, mathjax=True),
+
+                        dcc.Graph(figure=figura_precalculada(
+                            'aplicaciones_caso2_estocastico', PARAMETROS_CASO2_ESTOCASTICO, grafica_caso2_estocastica))
+                    ])
+                ]),
             
-            # --- PESTAÑA 3: POLÍTICA PÚBLICA ---
-            dcc.Tab(label='Caso 3: Política', value='tab-3', children=[
-                html.Div(className='tab-content', children=[
-                    html.H3("Escenario: Adopción de Política"),
-                    dcc.Markdown(r"""
-                        * **S:** Ciudadanos que no han adoptado.
-                        * **I (Influyentes):** Ciudadanos que promueven.
-                        * **R (Rechazadores):** Ciudadanos que rechazan.
-                    """),
-
-                    html.H4("Parámetros: N=10,050, b=0.00005, k=0.00002"),
-
-                    # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
-                    dcc.Graph(figure=grafica_caso3_politica()),
-
-                    dcc.Markdown(r"""
-                        **Conclusión Clave:** El modelo simula procesos sociales lentos.
-                        Permite estimar cómo campañas ($b$) o barreras ($k$) impactan la adopción.
-                    """, mathjax=True)
-                ])
-            ]),
+                # --- PESTAÑA 3: POLÍTICA PÚBLICA ---
+                dcc.Tab(label='Caso 3: Política', value='tab-3', children=[
+                    html.Div(className='tab-content', children=[
+                        html.H3("Escenario: Adopción de Política"),
+                        dcc.Markdown(r"""
+                            * **S:** Ciudadanos que no han adoptado.
+                            * **I (Influyentes):** Ciudadanos que promueven.
+                            * **R (Rechazadores):** Ciudadanos que rechazan.
+                        """),
+
+                        html.H4("Parámetros: N=10,050, b=0.00005, k=0.00002"),
+
+                        # AQUÍ ESTÁ EL CAMBIO: dcc.Graph en lugar de html.Img
+                        dcc.Graph(figure=figura_precalculada('aplicaciones_caso3', PARAMETROS_CASO3, grafica_caso3_politica)),
+
+                        dcc.Markdown(r"""
+                            **Conclusión Clave:** El modelo simula procesos sociales lentos.
+                            Permite estimar cómo campañas ($b$) o barreras ($k$) impactan la adopción.
+                            Con 10,050 ciudadanos la versión estocástica (tau-leaping) apenas se
+                            separa de la determinista: la banda es angosta.
+                        """, mathjax=True),
+
+                        dcc.Graph(figure=figura_precalculada(
+                            'aplicaciones_caso3_estocastico', PARAMETROS_CASO3_ESTOCASTICO, grafica_caso3_estocastica))
+                    ])
+                ]),
             
+            ]) 
         ]) 
-    ]) 
-])
\ No newline at end of file
+    ])
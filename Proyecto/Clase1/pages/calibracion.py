@@ -0,0 +1,230 @@
+import dash
+from dash import html, dcc, callback, Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
+import plotly.graph_objects as go
+import numpy as np
+
+from utils.cache import cache_figuras, memoizar_callback
+from utils.cache_disco import cache_compartida
+from utils.calibracion import calibrar, carga, datos_ejemplo, leer_casos, predecir
+from utils.figuras import figura
+from utils.trabajos import es_pesado, gestor_fondo, limitar_recursos
+
+# --- 1. Registro de la página ---
+dash.register_page(__name__, path='/calibracion', name='Calibración SIR/SEIR')
+
+NOMBRES_PARAMETRO = {'beta': 'β', 'gamma': 'γ', 'sigma': 'σ', 'I0': 'I₀', 'R0': 'R₀ = β/γ'}
+NOMBRES_OBSERVABLE = {'I': 'Infectados activos', 'nuevos': 'Casos nuevos'}
+MAX_INICIOS = 64
+
+# --- 2. Figura y tabla de resultados ---
+def crear_figura_calibracion(t=None, casos=None, t_modelo=None, ajuste=None, observable='I', titulo=None):
+    vacia = t is None
+    trazas = [] if vacia else [
+        go.Scatter(x=t, y=casos, mode='markers', name='Datos', marker=dict(color='black', size=6)),
+        go.Scatter(x=t_modelo, y=ajuste, mode='lines', name='Modelo ajustado', line=dict(color='red', width=3)),
+    ]
+    return figura(
+        trazas,
+        titulo=titulo or '<b>Calibración del modelo</b>',
+        eje_x='Tiempo (días)',
+        eje_y=NOMBRES_OBSERVABLE[observable],
+        showlegend=not vacia
+    )
+
+def tabla_parametros(parametros):
+    filas = ["| Parámetro | Estimado | IC 95 % |", "|---|---|---|"]
+    for nombre, (valor, inferior, superior) in parametros.items():
+        # Un intervalo de varios órdenes de magnitud: los datos no lo determinan
+        intervalo = ("no identificable" if superior > 1e3 * valor or inferior < 1e-3 * valor
+                     else f"[{inferior:.4g}, {superior:.4g}]")
+        filas.append(f"| {NOMBRES_PARAMETRO[nombre]} | {valor:.4g} | {intervalo} |")
+    return '\n'.join(filas)
+
+# --- 3. Layout ---
+layout = html.Div(className='content-container', children=[
+
+    # --- Columna Izquierda: Datos y opciones ---
+    html.Div(className='left-column card', children=[
+        html.H2("Calibración con datos observados"),
+
+        dcc.Markdown(r"""
+En vez de probar β y γ a mano, se buscan los parámetros (y los infectados
+iniciales I₀) que mejor reproducen los casos observados.
+
+Sube un **CSV** con dos columnas, `día,casos` (o una sola columna de casos,
+uno por día). Sin archivo se usan datos de ejemplo: un SIR con
+β = 0.3, γ = 0.1, N = 1000 y ruido de Poisson.
+
+* **Mínimos cuadrados:** minimiza $\sum_k (\text{modelo}_k - \text{casos}_k)^2$.
+* **Poisson (máxima verosimilitud):** mejor para conteos chicos.
+
+Se parte desde varios puntos a la vez (multistart) y los intervalos de
+confianza salen de la curvatura del ajuste.
+""", mathjax=True),
+
+        dcc.Upload(
+            id='upload-casos',
+            children=html.Div(["Arrastra o ", html.A("elige un CSV", href="#")]),
+            style={'width': '100%', 'padding': '20px 0', 'borderWidth': '2px', 'borderStyle': 'dashed',
+                   'borderRadius': '5px', 'textAlign': 'center', 'boxSizing': 'border-box'},
+            multiple=False
+        ),
+        html.Div(id='nombre-archivo-casos', className='input-label'),
+
+        html.Label("Modelo:", className='input-label'),
+        dcc.RadioItems(
+            id='radio-modelo-calibracion',
+            options=[{'label': ' SIR', 'value': 'sir'}, {'label': ' SEIR', 'value': 'seir'}],
+            value='sir',
+            className='input-label'
+        ),
+
+        html.Label("Los datos son:", className='input-label'),
+        dcc.RadioItems(
+            id='radio-observable-calibracion',
+            options=[
+                {'label': ' Infectados activos I(t)', 'value': 'I'},
+                {'label': ' Casos nuevos entre un dato y el siguiente', 'value': 'nuevos'},
+            ],
+            value='I',
+            className='input-label'
+        ),
+
+        html.Label("Criterio de ajuste:", className='input-label'),
+        dcc.RadioItems(
+            id='radio-perdida-calibracion',
+            options=[
+                {'label': ' Mínimos cuadrados', 'value': 'mc'},
+                {'label': ' Poisson (máxima verosimilitud)', 'value': 'poisson'},
+            ],
+            value='mc',
+            className='input-label'
+        ),
+
+        html.Label("Población Total (N):", className='input-label'),
+        dcc.Input(id='input-N-calibracion', type='number', value=1000, className='input-field'),
+
+        html.Label(f"Puntos de partida (máx. {MAX_INICIOS}):", className='input-label'),
+        dcc.Input(id='input-inicios-calibracion', type='number', value=8, className='input-field'),
+
+        html.Button('Calibrar', id='btn-calibrar', n_clicks=0, className='btn-generar'),
+
+        # --- Ajustes largos: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-calibracion', style={'display': 'none'}, children=[
+            html.Label("Calibración en curso (puntos de partida terminados)...", className='input-label'),
+            html.Progress(id='progreso-calibracion', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-calibracion', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-calibracion')
+    ]),
+
+    # --- Columna Derecha: Ajuste y parámetros ---
+    html.Div(className='right-column card', children=[
+        html.H2("Datos y modelo ajustado"),
+        dcc.Loading(dcc.Graph(id='graph-calibracion', figure=crear_figura_calibracion())),
+        dcc.Markdown(id='tabla-calibracion')
+    ])
+])
+
+# --- 4. Callbacks ---
+@callback(
+    Output('nombre-archivo-casos', 'children'),
+    Input('upload-casos', 'filename')
+)
+def mostrar_archivo(nombre):
+    return f"Archivo: {nombre}" if nombre else "Sin archivo: se usarán los datos de ejemplo."
+
+# Los ajustes chicos se resuelven aquí mismo; los de muchos puntos de
+# partida (o SEIR, casos nuevos, Poisson) van al callback en segundo plano
+@callback(
+    Output('graph-calibracion', 'figure'),
+    Output('tabla-calibracion', 'children'),
+    Output('store-trabajo-calibracion', 'data'),
+    Input('btn-calibrar', 'n_clicks'),
+    State('upload-casos', 'contents'),
+    State('radio-modelo-calibracion', 'value'),
+    State('radio-observable-calibracion', 'value'),
+    State('radio-perdida-calibracion', 'value'),
+    State('input-N-calibracion', 'value'),
+    State('input-inicios-calibracion', 'value')
+)
+def calibrar_casos(n_clicks, contenido, modelo, observable, perdida, N, inicios):
+    parametros = (contenido, modelo, observable, perdida, N, inicios)
+    try:
+        ajustes = carga(modelo, observable, perdida, min(max(int(inicios), 1), MAX_INICIOS))
+    except (TypeError, ValueError):
+        ajustes = 0
+    # Un ajuste pesado ya calculado (aquí o en segundo plano) sale de la caché
+    if n_clicks and gestor_fondo is not None and es_pesado(ajustes=ajustes) \
+            and update_calibracion.buscar(n_clicks, *parametros) is None:
+        return no_update, no_update, {'parametros': parametros, 'n': n_clicks}
+    return *update_calibracion(n_clicks, *parametros), no_update
+
+@memoizar_callback(cache_figuras, cache_compartida) # Mismo archivo y opciones: mismo ajuste
+def update_calibracion(n_clicks, contenido, modelo, observable, perdida, N, inicios):
+    if n_clicks == 0:
+        return crear_figura_calibracion(), ""
+    return ajustar_casos(contenido, modelo, observable, perdida, N, inicios)
+
+def ajustar_casos(contenido, modelo, observable, perdida, N, inicios, avance=None):
+    # avance(hecho, total): puntos de partida terminados, para la barra de progreso
+
+    # --- A. Datos y opciones ---
+    try:
+        N = float(N)
+        inicios = min(max(int(inicios), 1), MAX_INICIOS)
+        t, casos = leer_casos(contenido) if contenido else datos_ejemplo()
+    except (ValueError, TypeError, UnicodeDecodeError) as error:
+        mensaje = str(error) if isinstance(error, ValueError) else "Revisa N, los puntos de partida y el archivo."
+        return crear_figura_calibracion(), f"**No se pudo calibrar:** {mensaje}"
+
+    if N <= casos.max():
+        return crear_figura_calibracion(), "**No se pudo calibrar:** N debe ser mayor que los casos observados."
+
+    # --- B. Ajuste (multistart en varios procesos; utils/calibracion.py) ---
+    try:
+        resultado = calibrar(t, casos, modelo, N, observable, perdida, n_inicios=inicios, avance=avance)
+    except ValueError as error: # Opción desconocida o N demasiado chico
+        return crear_figura_calibracion(), f"**No se pudo calibrar:** {error}"
+    except RuntimeError: # El integrador no pudo avanzar con algún punto de partida
+        return crear_figura_calibracion(), "**No se pudo calibrar:** el modelo no se pudo integrar con estos datos."
+
+    # --- C. Curva ajustada en una malla fina (los nuevos casos, por intervalo de los datos) ---
+    if observable == 'I':
+        t_modelo = np.linspace(0, t[-1], 400)
+    else:
+        t_modelo = t
+    ajuste = predecir(modelo, resultado['theta'], t_modelo, N, observable)[0]
+
+    titulo = (f"<b>Ajuste {modelo.upper()}</b><br><sup>{resultado['inicios']} puntos de partida "
+              f"({resultado['previos']} de ajustes anteriores), {resultado['evaluaciones']} evaluaciones</sup>")
+    return (crear_figura_calibracion(t, casos, t_modelo, ajuste, observable, titulo),
+            tabla_parametros(resultado['parametros']))
+
+# --- Ajustes largos en segundo plano ---
+# Proceso aparte (DiskcacheManager) con límites de CPU y memoria: la barra
+# avanza con cada punto de partida y "Cancelar" mata el proceso
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-calibracion', 'figure', allow_duplicate=True),
+        Output('tabla-calibracion', 'children', allow_duplicate=True),
+        Input('store-trabajo-calibracion', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-calibracion', 'value'), Output('progreso-calibracion', 'max')],
+        running=[
+            (Output('btn-calibrar', 'disabled'), True, False),
+            (Output('trabajo-calibracion', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-calibracion', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_calibracion_fondo(set_progress, trabajo):
+        limitar_recursos()
+        if not trabajo:
+            raise PreventUpdate
+        resultado = ajustar_casos(*trabajo['parametros'],
+                                  avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        # Misma clave que el camino rápido: el próximo pedido igual sale de la caché
+        return update_calibracion.guardar((trabajo['n'], *trabajo['parametros']), resultado)
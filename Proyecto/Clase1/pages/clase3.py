@@ -1,8 +1,12 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State
 import plotly.graph_objects as go
 import numpy as np
 
+from utils.cache import memoizar_callback
+from utils.figuras import enviar_parche, figura
+from utils.funciones import LOGISTICA_EN_NAVEGADOR, figura_logistica
+
 dash.register_page(__name__, path='/modelo-interactivo', name='Modelo Interactivo')
 
 layout = html.Div(className='content-container', children=[
@@ -53,22 +57,15 @@ layout = html.Div(className='content-container', children=[
     html.Div(className='right-column card', children=[
         html.H2("Gráfica"),
         
-        dcc.Graph(id='graph-logistico-interactivo')
+        # Base vacía con el estilo; el callback solo envía los arreglos x/y
+        dcc.Graph(id='graph-logistico-interactivo', figure=figura_logistica())
     ])
 ])
 
 
 
-@callback(
-    
-    Output('graph-logistico-interactivo', 'figure'),
-    
-    Input('btn-generar', 'n_clicks'),
-    State('input-p0', 'value'),
-    State('input-r', 'value'),
-    State('input-k', 'value'),
-    State('input-t', 'value')
-)
+@enviar_parche()
+@memoizar_callback()
 def update_graph(n_clicks, p0, r, k, t_max):
     
     t = np.linspace(0, t_max, 100)
@@ -79,21 +76,34 @@ def update_graph(n_clicks, p0, r, k, t_max):
     trace_capacidad = go.Scatter(x=[0, t_max], y=[k, k], mode='lines', name='Capacidad de Carga (K)', line=dict(color='grey', dash='dash'))
 
 
-    fig = go.Figure(data=[trace_poblacion, trace_capacidad])
-    
-
-    fig.update_layout(
-        title=dict(text='<b>Modelo Logístico de Crecimiento Poblacional</b>', font=dict(color='#880e4f', size=16)),
-        title_x=0.5,
-        xaxis_title='Tiempo (t)',
-        yaxis_title='Población P(t)',
-        height=450,
-        legend=dict(x=0.02, y=0.98),
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='black'),
-        yaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='black')
+    # Estilo común: plantilla de utils/figuras.py
+    return figura(
+        [trace_poblacion, trace_capacidad],
+        titulo='<b>Modelo Logístico de Crecimiento Poblacional</b>',
+        eje_x='Tiempo (t)',
+        eje_y='Población P(t)'
     )
-    
 
-    return fig
+
+if LOGISTICA_EN_NAVEGADOR:
+    # La misma curva en el navegador (assets/logistica.js): el botón la
+    # redibuja sin ida y vuelta al servidor
+    clientside_callback(
+        ClientsideFunction(namespace='modelamiento', function_name='logistica'),
+        Output('graph-logistico-interactivo', 'figure'),
+        Input('btn-generar', 'n_clicks'),
+        State('input-p0', 'value'),
+        State('input-r', 'value'),
+        State('input-k', 'value'),
+        State('input-t', 'value'),
+        State('graph-logistico-interactivo', 'figure')
+    )
+else:
+    callback(
+        Output('graph-logistico-interactivo', 'figure'),
+        Input('btn-generar', 'n_clicks'),
+        State('input-p0', 'value'),
+        State('input-r', 'value'),
+        State('input-k', 'value'),
+        State('input-t', 'value')
+    )(update_graph)
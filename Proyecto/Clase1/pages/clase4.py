@@ -1,9 +1,11 @@
 #REFACTORIZAMOS LLAMANDO LA FUNCION DEL ARCHIVO FUNCIONES.PY
 
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State
 
-from utils.funciones import grafica_logistica
+from utils.cache import memoizar_callback
+from utils.figuras import enviar_parche
+from utils.funciones import LOGISTICA_EN_NAVEGADOR, figura_logistica, grafica_logistica
 
 dash.register_page(__name__, path='/modelo-llamado', name='Modelo con llamado')
 
@@ -24,21 +26,39 @@ layout = html.Div(className='content-container', children=[
     
     html.Div(className='right-column card', children=[
         html.H2("Gráfica"),
-        dcc.Graph(id='graph-logistico-refactorizado')
+        dcc.Graph(id='graph-logistico-refactorizado', figure=figura_logistica())
     ])
 ])
 
 
-@callback(
-    Output('graph-logistico-refactorizado', 'figure'),
-    Input('btn-generar-ref', 'n_clicks'),
-    State('input-p0-ref', 'value'),
-    State('input-r-ref', 'value'),
-    State('input-k-ref', 'value'),
-    State('input-t-ref', 'value')
-)
+@enviar_parche() # Solo viajan los arreglos x/y
+@memoizar_callback()
 def update_graph_refactorizado(n_clicks, p0, r, k, t_max):
     # ¡Mira qué limpio!
     # Simplemente llamamos a nuestra función importada y le pasamos los parámetros.
     fig = grafica_logistica(p0, r, k, t_max)
     return fig
+
+
+if LOGISTICA_EN_NAVEGADOR:
+    # La misma curva en el navegador (assets/logistica.js): el botón la
+    # redibuja sin ida y vuelta al servidor
+    clientside_callback(
+        ClientsideFunction(namespace='modelamiento', function_name='logistica'),
+        Output('graph-logistico-refactorizado', 'figure'),
+        Input('btn-generar-ref', 'n_clicks'),
+        State('input-p0-ref', 'value'),
+        State('input-r-ref', 'value'),
+        State('input-k-ref', 'value'),
+        State('input-t-ref', 'value'),
+        State('graph-logistico-refactorizado', 'figure')
+    )
+else:
+    callback(
+        Output('graph-logistico-refactorizado', 'figure'),
+        Input('btn-generar-ref', 'n_clicks'),
+        State('input-p0-ref', 'value'),
+        State('input-r-ref', 'value'),
+        State('input-k-ref', 'value'),
+        State('input-t-ref', 'value')
+    )(update_graph_refactorizado)
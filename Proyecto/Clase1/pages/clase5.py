@@ -1,13 +1,62 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, Input, Output, State, no_update
 import plotly.graph_objects as go
 import numpy as np
 import sys # Para manejar errores
 
+from utils.cache import cache_figuras, memoizar_callback
+from utils.cache_disco import cache_compartida
+from utils.campo import colores_segmentos, malla_adaptativa, segmentos, semillas_malla, trayectorias
+from utils.expresiones import compilar_sistema
+from utils.figuras import enviar_parche, figura
+from utils.trabajos import MALLADO_MAXIMO, es_pesado, gestor_fondo, limitar_recursos
+
 # --- 1. Registro de la página ---
 dash.register_page(__name__, path='/campo-vectorial', name='Campo Vectorial')
 
-# --- 2. Definición del Layout ---
+# --- 2. Figura del campo (vacía o con datos) ---
+# Ejes en rojo y la misma escala en X e Y (aspect ratio 1:1). Las dos
+# trazas existen siempre: el callback envía solo sus arreglos (dash.Patch).
+def crear_figura_campo(plot_x=(), plot_y=(), colores=(), tray_x=(), tray_y=(),
+                       titulo='Introduce las ecuaciones y presiona "Generar"',
+                       range_x=None, range_y=None):
+    # Líneas azules + puntos de inicio (rojos) y de fin (azules) en una sola
+    # traza: el color de cada marcador sale de una escala de dos colores.
+    trace_campo = go.Scatter(
+        x=plot_x, 
+        y=plot_y, 
+        mode='lines+markers',
+        name='Vectores',
+        line=dict(color='#0000FF', width=1.5), # Líneas azules
+        marker=dict(
+            color=colores, # 0 = inicio, 1 = dirección
+            colorscale=[[0, '#FF0000'], [1, '#0000FF']],
+            cmin=0, cmax=1,
+            size=3
+        )
+    )
+    trace_trayectorias = go.Scatter(
+        x=tray_x,
+        y=tray_y,
+        mode='lines',
+        name='Trayectorias',
+        line=dict(color='#880e4f', width=1.2)
+    )
+
+    eje_x = dict(zerolinecolor='red')
+    eje_y = dict(zerolinecolor='red', scaleanchor='x', scaleratio=1)
+    if range_x is not None:
+        eje_x['range'] = [-range_x * 1.05, range_x * 1.05]
+        eje_y['range'] = [-range_y * 1.05, range_y * 1.05]
+    return figura(
+        [trace_campo, trace_trayectorias], titulo, 'Eje X', 'Eje Y',
+        xaxis=eje_x,
+        yaxis=eje_y,
+        showlegend=False,
+        margin=dict(l=40, r=20, t=60, b=40)
+    )
+
+# --- 3. Definición del Layout ---
 layout = html.Div(className='content-container', children=[
     
     # --- Columna Izquierda: Controles ---
@@ -54,7 +103,61 @@ layout = html.Div(className='content-container', children=[
             className='input-field'
         ),
         
+        html.Label("Muestreo del campo:", className='input-label'),
+        dcc.RadioItems(
+            id='radio-muestreo',
+            options=[
+                {'label': ' Uniforme', 'value': 'uniforme'},
+                {'label': ' Adaptativo (refina cerca de equilibrios)', 'value': 'adaptativo'},
+            ],
+            value='uniforme',
+            className='input-label'
+        ),
+        
+        html.Label("Niveles de refinamiento (modo adaptativo):", className='input-label'),
+        dcc.Input(
+            id='input-niveles',
+            type='number',
+            value=3,
+            className='input-field'
+        ),
+        
+        # --- Trayectorias: todas las semillas se integran juntas (utils/campo.py) ---
+        dcc.Checklist(
+            id='check-trayectorias',
+            options=[{'label': ' Mostrar trayectorias (una por celda)', 'value': 'si'}],
+            value=[],
+            className='input-label'
+        ),
+        
+        html.Label("Semillas por eje:", className='input-label'),
+        dcc.Input(
+            id='input-semillas',
+            type='number',
+            value=10,
+            className='input-field'
+        ),
+        
+        html.Label("Tiempo de integración de cada trayectoria:", className='input-label'),
+        dcc.Input(
+            id='input-tiempo-tray',
+            type='number',
+            value=5,
+            className='input-field'
+        ),
+        
         html.Button('Generar campo', id='btn-generar-campo', n_clicks=0, className='btn-generar'),
+        html.Button('Limpiar semillas', id='btn-limpiar-semillas', n_clicks=0, className='btn-generar'),
+        dcc.Markdown("Haz clic sobre el campo para agregar una trayectoria desde ese punto."),
+        dcc.Store(id='store-semillas', data=[]),
+
+        # --- Mallados muy finos: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-campo', style={'display': 'none'}, children=[
+            html.Label("Calculando un mallado grande...", className='input-label'),
+            html.Progress(id='progreso-campo', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-campo', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-campo'),
         
         html.Hr(style={'marginTop': '20px'}),
         
@@ -84,70 +187,95 @@ layout = html.Div(className='content-container', children=[
             'marginBottom': '10px'
         }),
         
-        dcc.Graph(id='graph-campo-vectorial')
+        dcc.Graph(id='graph-campo-vectorial', figure=crear_figura_campo())
     ])
 ])
 
-# --- 3. Callback para actualizar el gráfico ---
+# --- 4. Callbacks ---
+
+MAX_SEMILLAS_CLICK = 50
 
+# Cada clic sobre el gráfico agrega una semilla; el botón las borra
+@callback(
+    Output('store-semillas', 'data'),
+    Input('graph-campo-vectorial', 'clickData'),
+    Input('btn-limpiar-semillas', 'n_clicks'),
+    State('store-semillas', 'data'),
+    prevent_initial_call=True
+)
+def actualizar_semillas(clickData, n_limpiar, semillas):
+    if dash.ctx.triggered_id == 'btn-limpiar-semillas' or not clickData:
+        return []
+    punto = clickData['points'][0]
+    return (semillas or [])[-(MAX_SEMILLAS_CLICK - 1):] + [[punto['x'], punto['y']]]
+
+# Gráfico del campo (y trayectorias). Los mallados chicos se resuelven
+# aquí mismo; los muy finos se dejan en store-trabajo-campo para el
+# callback en segundo plano de abajo
 @callback(
     Output('graph-campo-vectorial', 'figure'),
     Output('error-output-campo', 'children'),
+    Output('store-trabajo-campo', 'data'),
     Input('btn-generar-campo', 'n_clicks'),
+    Input('store-semillas', 'data'),
     State('input-dxdt', 'value'),
     State('input-dydt', 'value'),
     State('input-range-x', 'value'),
     State('input-range-y', 'value'),
-    State('input-mallado', 'value')
+    State('input-mallado', 'value'),
+    State('check-trayectorias', 'value'),
+    State('input-semillas', 'value'),
+    State('input-tiempo-tray', 'value'),
+    State('radio-muestreo', 'value'),
+    State('input-niveles', 'value')
 )
-def update_vector_field(n_clicks, eq_dxdt, eq_dydt, range_x, range_y, mallado):
+def generar_campo(n_clicks, *parametros):
+    mallado = parametros[5]
+    # Un mallado grande ya calculado (aquí o en segundo plano) sale de la caché
+    if n_clicks and gestor_fondo is not None and es_pesado(mallado=mallado) \
+            and update_vector_field.buscar(n_clicks, *parametros) is None:
+        return no_update, "", {'parametros': parametros, 'n': n_clicks}
+    return *update_vector_field(n_clicks, *parametros), no_update
+
+# Al navegador solo viajan los arreglos de las trazas, el título y los rangos
+@enviar_parche(
+    campos=('x', 'y', 'marker.color'),
+    layout=('title.text', 'xaxis.range', 'yaxis.range')
+)
+@memoizar_callback(cache_figuras, cache_compartida) # En disco: la comparte el trabajo en segundo plano
+def update_vector_field(n_clicks, semillas_click, eq_dxdt, eq_dydt, range_x, range_y, mallado,
+                        mostrar_trayectorias, semillas_por_eje, t_trayectoria,
+                        muestreo, niveles):
     
     # --- Figura base (vacía pero con estilo) ---
-    fig = go.Figure()
-    fig.update_layout(
-        title='Introduce las ecuaciones y presiona "Generar"',
-        title_x=0.5,
-        xaxis_title='Eje X',
-        yaxis_title='Eje Y',
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='red'),
-        yaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='red'),
-        # Asegura que los ejes tengan la misma escala (aspect ratio 1:1)
-        yaxis_scaleanchor="x",
-        yaxis_scaleratio=1,
-        showlegend=False
-    )
+    fig = crear_figura_campo()
     
     if n_clicks == 0:
         return fig, "" # Retorna la figura vacía si no se ha hecho clic
 
     try:
-        # --- A. Crear el mallado (Grid) ---
+        # --- A. Crear el mallado (Grid) y B. evaluar las ecuaciones ---
         # Aseguramos que los valores sean numéricos
-        range_x, range_y, mallado = float(range_x), float(range_y), int(mallado)
-        
-        x_vals = np.linspace(-range_x, range_x, mallado)
-        y_vals = np.linspace(-range_y, range_y, mallado)
-        x, y = np.meshgrid(x_vals, y_vals)
-        
-        # --- B. Evaluar las ecuaciones (¡Peligroso! Ver nota abajo) ---
-        # Creamos un diccionario seguro para las funciones permitidas
-        safe_dict = {
-            'np': np,
-            'x': x,
-            'y': y,
-            'cos': np.cos,
-            'sin': np.sin,
-            'exp': np.exp,
-            'sqrt': np.sqrt,
-            'log': np.log
-        }
-        
-        # AVISO: eval() es un riesgo de seguridad si la app es pública.
-        # Para un proyecto de clase controlado, es aceptable.
-        u = eval(eq_dxdt, {"__builtins__": {}}, safe_dict)
-        v = eval(eq_dydt, {"__builtins__": {}}, safe_dict)
+        range_x, range_y, mallado = float(range_x), float(range_y), min(int(mallado), MALLADO_MAXIMO)
+        
+        # Sin eval(): utils/expresiones.py valida el texto contra una lista
+        # blanca (x, y, pi, e y funciones de NumPy) y lo compila una sola vez.
+        # Ambas ecuaciones se evalúan juntas, compartiendo subexpresiones.
+        campo = compilar_sistema(eq_dxdt, eq_dydt)
+        
+        if muestreo == 'adaptativo':
+            # Malla gruesa de mallado x mallado que se subdivide solo donde el
+            # campo gira, cambia de magnitud o tiene un posible equilibrio
+            niveles = min(max(int(niveles), 0), 6)
+            x, y, u, v, ancho, _ = malla_adaptativa(campo, range_x, range_y, mallado, niveles)
+            line_length = ancho * 0.4
+        else:
+            x_vals = np.linspace(-range_x, range_x, mallado)
+            y_vals = np.linspace(-range_y, range_y, mallado)
+            x, y = np.meshgrid(x_vals, y_vals)
+            u, v = campo(x, y)
+            # Hacemos que la longitud de la línea sea proporcional al tamaño de la celda
+            line_length = (range_x * 2 / mallado) * 0.4
         
         # --- C. Normalizar los vectores ---
         # (Para que todos tengan la misma longitud y solo muestren dirección)
@@ -156,73 +284,66 @@ def update_vector_field(n_clicks, eq_dxdt, eq_dydt, range_x, range_y, mallado):
         v_norm = v / magnitud
         
         # --- D. Calcular puntos de inicio y fin (como en tu imagen) ---
-        # Hacemos que la longitud de la línea sea proporcional al tamaño de la celda
-        line_length = (range_x * 2 / mallado) * 0.4
-        
         x_end = x + u_norm * line_length
         y_end = y + v_norm * line_length
         
         # --- E. Preparar datos para Plotly ---
-        # (Usamos 'None' para separar cada segmento de línea)
-        plot_x_lines = []
-        plot_y_lines = []
-        
-        for i in range(mallado):
-            for j in range(mallado):
-                plot_x_lines.extend([x[i, j], x_end[i, j], None])
-                plot_y_lines.extend([y[i, j], y_end[i, j], None])
-
-        # --- F. Crear las trazas (Traces) ---
-        # 1. Las líneas del vector
-        trace_lines = go.Scatter(
-            x=plot_x_lines, 
-            y=plot_y_lines, 
-            mode='lines',
-            name='Vectores',
-            line=dict(color='#0000FF', width=1.5) # Líneas azules
-        )
-        
-        # 2. Los puntos de inicio (rojos)
-        trace_start = go.Scatter(
-            x=x.flatten(), 
-            y=y.flatten(),
-            mode='markers', 
-            name='Punto Inicial',
-            marker=dict(color='#FF0000', size=3) # Puntos rojos
-        )
+        # (Un NaN separa cada segmento; arreglos preasignados en utils/campo.py)
+        plot_x_lines, plot_y_lines = segmentos(x, y, x_end, y_end)
+
+        # --- F. Colores de los marcadores ---
+        colores = colores_segmentos(x.size) # 0 = inicio, 1 = dirección
         
-        # 3. Los puntos de fin (azules)
-        trace_end = go.Scatter(
-            x=x_end.flatten(), 
-            y=y_end.flatten(),
-            mode='markers', 
-            name='Dirección',
-            marker=dict(color='#0000FF', size=3) # Puntos azules
-        )
+        # --- G. Trayectorias (opcional) ---
+        # Semillas de la malla + las que el usuario agregó con clics,
+        # integradas como un solo estado (n_semillas, 2) con RK4.
+        semillas = np.empty((0, 2))
+        if mostrar_trayectorias:
+            por_eje = min(max(int(semillas_por_eje), 1), 40)
+            semillas = semillas_malla(range_x, range_y, por_eje)
+        if semillas_click:
+            semillas = np.vstack([semillas, np.asarray(semillas_click, dtype=float)])
+
+        tray_x = tray_y = ()
+        if len(semillas):
+            limites = (-range_x * 1.05, range_x * 1.05, -range_y * 1.05, range_y * 1.05)
+            tray_x, tray_y = trayectorias(campo, semillas, float(t_trayectoria), limites)
         
-        # --- G. Ensamblar la figura ---
-        fig = go.Figure(data=[trace_lines, trace_start, trace_end])
-        
-        # Actualizamos el layout con el estilo y el título dinámico
-        fig.update_layout(
-            title=f"Campo Vectorial: dx/dt = {eq_dxdt}  |  dy/dt = {eq_dydt}",
-            title_x=0.5,
-            xaxis_title='Eje X',
-            yaxis_title='Eje Y',
-            plot_bgcolor='white',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='red', range=[-range_x*1.05, range_x*1.05]),
-            yaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='red', range=[-range_y*1.05, range_y*1.05]),
-            yaxis_scaleanchor="x",
-            yaxis_scaleratio=1,
-            showlegend=False,
-            margin=dict(l=40, r=20, t=60, b=40)
+        # --- H. Ensamblar la figura ---
+        # Estilo y título dinámico sobre la plantilla de utils/figuras.py
+        fig = crear_figura_campo(
+            plot_x_lines, plot_y_lines, colores, tray_x, tray_y,
+            f"Campo Vectorial: dx/dt = {eq_dxdt}  |  dy/dt = {eq_dydt}",
+            range_x, range_y
         )
         
         return fig, "" # Retorna la figura y ningún error
 
     except Exception as e:
-        # --- H. Manejo de Errores ---
+        # --- I. Manejo de Errores ---
         print(f"Error en callback: {e}", file=sys.stderr)
         error_msg = f"Error al generar el gráfico: {e}. Revisa tus ecuaciones."
-        return fig, error_msg # Retorna la fig vacía y el mensaje de error
\ No newline at end of file
+        return fig, error_msg # Retorna la fig vacía y el mensaje de error
+
+# --- Mallados grandes en segundo plano ---
+# Corre en un proceso aparte (DiskcacheManager) con límites de CPU y
+# memoria; el progreso es por etapas y "Cancelar" mata el proceso
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-campo-vectorial', 'figure', allow_duplicate=True),
+        Output('error-output-campo', 'children', allow_duplicate=True),
+        Input('store-trabajo-campo', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-campo', 'value'), Output('progreso-campo', 'max')],
+        running=[
+            (Output('btn-generar-campo', 'disabled'), True, False),
+            (Output('trabajo-campo', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-campo', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_vector_field_fondo(set_progress, trabajo):
+        limitar_recursos()
+        set_progress(('1', '2'))
+        return update_vector_field(trabajo['n'], *trabajo['parametros'])
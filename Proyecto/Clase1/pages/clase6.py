@@ -1,14 +1,84 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import solve_ivp # ¡Importante!
+
+from utils.cache import cache_figuras, memoizar_callback
+from utils.cache_disco import cache_compartida
+from utils.en_vivo import solicitudes_en_vivo
+from utils.estocastico import MAX_POBLACION, bandas, ensamble
+from utils.figuras import enviar_parche, figura, figura_columnas, parche, trazas_banda
+from utils.modelos import barrido_sir, integrar, sir
+from utils.submuestreo import submuestrear, tiempos_densos
+from utils.trabajos import T_MAX_MAXIMO, es_pesado, gestor_fondo, integrar_por_tramos, limitar_recursos
 
 # --- 1. Registro de la página ---
 # El 'name' aparecerá en tu menú desplegable
 dash.register_page(__name__, path='/modelo-sir', name='Modelo SIR')
 
-# --- 2. Definición del Layout ---
+# --- 2. Función para crear el gráfico base (vacío o con datos) ---
+def crear_figura_sir(t=None, S=None, I=None, R=None, t_max=100):
+    # Las trazas existen siempre (vacías al inicio): los callbacks envían
+    # solo sus arreglos x/y con un dash.Patch (utils/figuras.py)
+    vacia = t is None
+    if vacia:
+        t = S = I = R = []
+
+    trazas = [
+        go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')),
+        go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')),
+        go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')),
+    ]
+    
+    # El estilo (fondo, rejilla, ejes) viene de la plantilla en utils/figuras.py
+    return figura(
+        trazas,
+        titulo='<b>Evolución del Modelo SIR</b>',
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max]),
+        showlegend=not vacia
+    )
+
+# Mediana y bandas 5-95 % de las realizaciones estocásticas
+COLORES_ESTOCASTICO = (
+    ('Susceptibles (S)', 'blue', 'rgba(0, 0, 255, 0.15)'),
+    ('Infectados (I)', 'red', 'rgba(255, 0, 0, 0.15)'),
+    ('Recuperados (R)', 'green', 'rgba(0, 128, 0, 0.15)'),
+)
+
+MAX_REALIZACIONES = 10000
+# Gillespie simula cada evento (~2N por realización): con N grande, o con
+# N · realizaciones por encima del presupuesto (~4 s con un núcleo), se usa tau-leaping
+MAX_N_GILLESPIE = 20000
+MAX_EVENTOS_GILLESPIE = 10_000_000
+NOMBRES_METODO = {'gillespie': 'Gillespie', 'tau': 'tau-leaping'}
+
+MAX_RESOLUCION_BARRIDO = 100
+
+
+def crear_figura_estocastica(t=None, bandas_sir=None, extincion=None, t_max=100, metodo='gillespie'):
+    trazas = []
+    if t is not None:
+        inferior, mediana, superior = bandas_sir
+        for k, (nombre, color, relleno) in enumerate(COLORES_ESTOCASTICO):
+            trazas += trazas_banda(t, inferior[:, k], mediana[:, k], superior[:, k], nombre, color, relleno)
+
+    titulo = '<b>SIR estocástico: mediana y banda 5-95 %</b>'
+    if extincion is not None:
+        titulo += (f'<br><sup>{NOMBRES_METODO[metodo]} · brote extinguido antes '
+                   f'del 10 % de la población: {extincion:.0%}</sup>')
+
+    return figura(
+        trazas,
+        titulo=titulo,
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max])
+    )
+
+# --- 3. Definición del Layout ---
 layout = html.Div(className='content-container', children=[
     
     # --- Columna Izquierda: Controles y Explicación ---
@@ -40,70 +110,119 @@ $$
         html.Hr(),
 
         html.Label("Población Total (N):", className='input-label'),
-        dcc.Input(id='input-N', type='number', value=1000, className='input-field'),
+        dcc.Input(id='input-N', type='number', value=1000, min=1, className='input-field'),
 
         html.Label("Tasa de transmisión (β):", className='input-label'),
-        dcc.Input(id='input-beta', type='number', value=0.3, step=0.01, className='input-field'),
+        dcc.Input(id='input-beta', type='number', value=0.3, min=0, step=0.01, className='input-field'),
 
         html.Label("Tasa de recuperación (γ):", className='input-label'),
-        dcc.Input(id='input-gamma', type='number', value=0.1, step=0.01, className='input-field'),
+        dcc.Input(id='input-gamma', type='number', value=0.1, min=0, step=0.01, className='input-field'),
 
         html.Label("Infectados iniciales (I₀):", className='input-label'),
-        dcc.Input(id='input-I0', type='number', value=1, className='input-field'),
+        dcc.Input(id='input-I0', type='number', value=1, min=0, className='input-field'),
         
         html.Label("Tiempo de simulación (días):", className='input-label'),
-        dcc.Input(id='input-tiempo', type='number', value=100, className='input-field'),
+        dcc.Input(id='input-tiempo', type='number', value=100, min=1, className='input-field'),
+
+        html.Button('Simular Epidemia', id='btn-simular-sir', n_clicks=0, className='btn-generar'),
+
+        # --- Simulaciones largas: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-sir', style={'display': 'none'}, children=[
+            html.Label("Simulación larga en curso...", className='input-label'),
+            html.Progress(id='progreso-sir', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-sir', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-sir'),
+
+        # --- Modo en vivo: recalcula al soltar/arrastrar los sliders (con espera) ---
+        html.H3("Modo en vivo"),
+        dcc.Checklist(
+            id='check-vivo-sir',
+            options=[{'label': ' Recalcular al mover los sliders', 'value': 'si'}],
+            value=[],
+            className='input-label'
+        ),
+        html.Label("β (en vivo):", className='input-label'),
+        dcc.Slider(id='slider-beta', min=0.01, max=1.5, step=0.01, value=0.3, updatemode='drag',
+                   marks=None, tooltip={'placement': 'bottom', 'always_visible': True}),
+        html.Label("γ (en vivo):", className='input-label'),
+        dcc.Slider(id='slider-gamma', min=0.01, max=1, step=0.01, value=0.1, updatemode='drag',
+                   marks=None, tooltip={'placement': 'bottom', 'always_visible': True}),
+        dcc.Store(id='store-vivo-sir'),
+
+        html.Hr(style={'marginTop': '20px'}),
+
+        # --- Modo estocástico: muchas realizaciones y bandas de cuantiles ---
+        html.H3("Modelo estocástico"),
+        dcc.Markdown("Con N, β, γ, I₀ y el tiempo de arriba, pero con contagios y "
+                     "recuperaciones al azar: con poblaciones chicas el brote puede extinguirse solo."),
+
+        html.Label(f"Realizaciones (máx. {MAX_REALIZACIONES}):", className='input-label'),
+        dcc.Input(id='input-realizaciones', type='number', value=1000, className='input-field'),
+
+        dcc.RadioItems(
+            id='radio-metodo-estocastico',
+            options=[
+                {'label': ' Gillespie (exacto)', 'value': 'gillespie'},
+                {'label': ' Tau-leaping (aproximado, para N grande)', 'value': 'tau'},
+            ],
+            value='gillespie',
+            className='input-label'
+        ),
+
+        html.Label("Semilla:", className='input-label'),
+        dcc.Input(id='input-semilla', type='number', value=42, className='input-field'),
 
-        html.Button('Simular Epidemia', id='btn-simular-sir', n_clicks=0, className='btn-generar')
+        html.Button('Simular realizaciones', id='btn-estocastico-sir', n_clicks=0, className='btn-generar'),
+
+        html.Hr(style={'marginTop': '20px'}),
+
+        # --- Modo barrido: toda la malla (β, γ) en una sola integración ---
+        html.H3("Barrido de parámetros (β, γ)"),
+        dcc.Markdown("Usa N, I₀ y el tiempo de arriba, y resuelve todas las combinaciones a la vez."),
+
+        html.Label("β mínimo / máximo:", className='input-label'),
+        dcc.Input(id='input-beta-min', type='number', value=0.05, min=0, step=0.01, className='input-field'),
+        dcc.Input(id='input-beta-max', type='number', value=1.0, min=0, step=0.01, className='input-field'),
+
+        html.Label("γ mínimo / máximo:", className='input-label'),
+        dcc.Input(id='input-gamma-min', type='number', value=0.02, min=0, step=0.01, className='input-field'),
+        dcc.Input(id='input-gamma-max', type='number', value=0.5, min=0, step=0.01, className='input-field'),
+
+        html.Label(f"Resolución de la malla (n x n, máx. {MAX_RESOLUCION_BARRIDO}):", className='input-label'),
+        dcc.Input(id='input-resolucion-barrido', type='number', value=50, min=2,
+                  max=MAX_RESOLUCION_BARRIDO, className='input-field'),
+
+        html.Button('Barrido β-γ', id='btn-barrido-sir', n_clicks=0, className='btn-generar'),
+
+        # --- Mallas finas u horizontes largos: en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-barrido', style={'display': 'none'}, children=[
+            html.Label("Barrido grande en curso...", className='input-label'),
+            html.Progress(id='progreso-barrido', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-barrido', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-barrido')
     ]),
     
     # --- Columna Derecha: Gráfica ---
     html.Div(className='right-column card', children=[
         html.H2("Evolución de la Epidemia"),
-        dcc.Graph(id='graph-sir-evolucion')
-    ])
-])
+        dcc.Graph(id='graph-sir-evolucion', figure=crear_figura_sir()),
 
-# --- 3. Función para crear el gráfico base (vacío o con datos) ---
-def crear_figura_sir(t=None, S=None, I=None, R=None, t_max=100):
-    fig = go.Figure()
+        html.H2("Modelo estocástico"),
+        dcc.Graph(id='graph-sir-estocastico', figure=crear_figura_estocastica()),
 
-    if t is not None:
-        # Si hay datos, dibujamos las curvas
-        fig.add_trace(go.Scatter(
-            x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')
-        ))
-        fig.add_trace(go.Scatter(
-            x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')
-        ))
-        fig.add_trace(go.Scatter(
-            x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')
-        ))
-    
-    # Damos estilo a la figura (con datos o vacía)
-    fig.update_layout(
-        title=dict(text='<b>Evolución del Modelo SIR</b>', font=dict(color='#880e4f', size=16)),
-        title_x=0.5,
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Número de personas',
-        height=450,
-        legend=dict(x=0.02, y=0.98),
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(
-            showgrid=True, gridcolor='lightgrey', zeroline=True, 
-            zerolinewidth=2, zerolinecolor='black', range=[0, t_max]
-        ),
-        yaxis=dict(
-            showgrid=True, gridcolor='lightgrey', zeroline=True, 
-            zerolinewidth=2, zerolinecolor='black'
-        )
-    )
-    return fig
+        html.H2("Barrido de parámetros"),
+        dcc.Graph(id='graph-sir-barrido')
+    ])
+])
 
-# --- 4. Callback para actualizar el gráfico ---
+# --- 4. Callbacks para actualizar el gráfico ---
+# Los pedidos chicos se resuelven aquí mismo; los de horizonte muy largo
+# se dejan en store-trabajo-sir para el callback en segundo plano de abajo
 @callback(
     Output('graph-sir-evolucion', 'figure'),
+    Output('store-trabajo-sir', 'data'),
     Input('btn-simular-sir', 'n_clicks'),
     State('input-N', 'value'),
     State('input-beta', 'value'),
@@ -111,6 +230,16 @@ def crear_figura_sir(t=None, S=None, I=None, R=None, t_max=100):
     State('input-I0', 'value'),
     State('input-tiempo', 'value')
 )
+def simular_sir(n_clicks, N, beta, gamma, I0, t_max):
+    # Un pedido pesado ya calculado (aquí o en segundo plano) sale de la caché
+    if n_clicks and gestor_fondo is not None and es_pesado(t_max=t_max) \
+            and update_sir_graph.buscar(n_clicks, N, beta, gamma, I0, t_max) is None:
+        return no_update, {'N': N, 'beta': beta, 'gamma': gamma, 'I0': I0, 't_max': t_max, 'n': n_clicks}
+    return update_sir_graph(n_clicks, N, beta, gamma, I0, t_max), no_update
+
+# Al navegador solo viajan los arreglos x/y (y el rango del eje X)
+@enviar_parche(layout=('xaxis.range', 'showlegend'))
+@memoizar_callback(cache_figuras, cache_compartida) # Memoria del worker y luego disco compartido
 def update_sir_graph(n_clicks, N, beta, gamma, I0, t_max):
     
     # Si el botón no se ha presionado, muestra el gráfico vacío
@@ -123,41 +252,255 @@ def update_sir_graph(n_clicks, N, beta, gamma, I0, t_max):
         I0 = int(I0)
         beta = float(beta)
         gamma = float(gamma)
-        t_max = int(t_max)
+        t_max = int(min(float(t_max), T_MAX_MAXIMO))
     except (ValueError, TypeError):
         return crear_figura_sir(t_max=t_max) # Error en inputs, devuelve vacío
 
+    if N <= 0 or not 0 <= I0 <= N or beta < 0 or gamma < 0 or t_max <= 0:
+        return crear_figura_sir(t_max=t_max) # Población vacía, más infectados que personas o tasas negativas
+
     # --- B. Condiciones Iniciales ---
     R0 = 0
     S0 = N - I0 - R0
     y0 = [S0, I0, R0] # Vector de condiciones iniciales
 
-    # --- C. Definir el sistema de Ecuaciones (las 3 ecuaciones) ---
-    def sir_model(t, y):
-        S, I, R = y
-        dSdt = - (beta * S * I) / N
-        dIdt = (beta * S * I) / N - gamma * I
-        dRdt = gamma * I
-        return [dSdt, dIdt, dRdt]
-
-    # --- D. Resolver el sistema ---
-    t_span = [0, t_max]
-    # t_eval son los puntos en el tiempo donde queremos la solución
-    t_eval = np.linspace(0, t_max, 500) 
-    
-    sol = solve_ivp(
-        sir_model, 
-        t_span, 
-        y0, 
-        t_eval=t_eval, 
-        method='RK45' # Un método de resolución estándar
+    # --- C. Resolver el sistema (motor compartido en utils/modelos.py) ---
+    # t_eval: malla densa (salida densa del integrador), más fina cuanto
+    # más largo el horizonte; luego se reduce a los puntos de pantalla
+    t_eval = tiempos_densos(t_max)
+    try:
+        y = integrar(sir, y0, t_eval, args=(beta, gamma, N))
+    except RuntimeError: # El integrador no pudo avanzar (parámetros extremos)
+        return crear_figura_sir(t_max=t_max)
+
+    # --- D. Extraer resultados (LTTB, conserva el pico; utils/submuestreo.py) ---
+    t, S, I, R = submuestrear(t_eval, *y.T)
+
+    # --- E. Devolver la figura con los datos ---
+    return crear_figura_sir(t, S, I, R, t_max)
+
+# --- Simulaciones largas en segundo plano ---
+# Corre en un proceso aparte (DiskcacheManager): el worker queda libre,
+# la barra avanza por tramos y el botón "Cancelar" mata el proceso
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-sir-evolucion', 'figure', allow_duplicate=True),
+        Input('store-trabajo-sir', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-sir', 'value'), Output('progreso-sir', 'max')],
+        running=[
+            (Output('btn-simular-sir', 'disabled'), True, False),
+            (Output('trabajo-sir', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-sir', 'n_clicks')],
+        prevent_initial_call=True
     )
+    def update_sir_graph_fondo(set_progress, trabajo):
+        limitar_recursos()
+        try:
+            N = int(trabajo['N'])
+            I0 = int(trabajo['I0'])
+            beta = float(trabajo['beta'])
+            gamma = float(trabajo['gamma'])
+            t_max = int(min(float(trabajo['t_max']), T_MAX_MAXIMO))
+        except (ValueError, TypeError, KeyError):
+            raise PreventUpdate
+        if N <= 0 or not 0 <= I0 <= N or beta < 0 or gamma < 0 or t_max <= 0:
+            raise PreventUpdate
 
-    # --- E. Extraer resultados ---
-    t = sol.t
-    S = sol.y[0]
-    I = sol.y[1]
-    R = sol.y[2]
+        t_eval = tiempos_densos(t_max)
+        try:
+            y = integrar_por_tramos(sir, [N - I0, I0, 0], t_eval, args=(beta, gamma, N),
+                                    avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        except RuntimeError:
+            return parche(crear_figura_sir(t_max=t_max), layout=('xaxis.range', 'showlegend'))
+        t, S, I, R = submuestrear(t_eval, *y.T)
 
-    # --- F. Devolver la figura con los datos ---
-    return crear_figura_sir(t, S, I, R, t_max)
\ No newline at end of file
+        # Misma clave que el camino rápido: el próximo pedido igual sale de la caché
+        argumentos = tuple(trabajo[k] for k in ('n', 'N', 'beta', 'gamma', 'I0', 't_max'))
+        fig = update_sir_graph.guardar(argumentos, crear_figura_sir(t, S, I, R, t_max))
+        return parche(fig, layout=('xaxis.range', 'showlegend'))
+
+# --- Modo estocástico: ensamble en varios procesos (utils/estocastico.py) ---
+@callback(
+    Output('graph-sir-estocastico', 'figure'),
+    Input('btn-estocastico-sir', 'n_clicks'),
+    State('input-N', 'value'),
+    State('input-beta', 'value'),
+    State('input-gamma', 'value'),
+    State('input-I0', 'value'),
+    State('input-tiempo', 'value'),
+    State('input-realizaciones', 'value'),
+    State('radio-metodo-estocastico', 'value'),
+    State('input-semilla', 'value')
+)
+@memoizar_callback() # Con la semilla fija el resultado es reproducible
+def update_sir_estocastico(n_clicks, N, beta, gamma, I0, t_max, realizaciones, metodo, semilla):
+
+    if n_clicks == 0:
+        return crear_figura_estocastica()
+
+    try:
+        N = int(N)
+        I0 = int(I0)
+        beta = float(beta)
+        gamma = float(gamma)
+        t_max = float(min(float(t_max), T_MAX_MAXIMO))
+        realizaciones = min(max(int(realizaciones), 1), MAX_REALIZACIONES)
+        semilla = int(semilla) if semilla is not None else None
+        if semilla is not None and semilla < 0:
+            raise ValueError("La semilla debe ser no negativa")
+    except (ValueError, TypeError):
+        return crear_figura_estocastica()
+
+    # N acotado: los conteos son int64 y las propensiones float (utils/estocastico.py).
+    # Con tasas negativas las propensiones no tienen sentido (y rng.poisson las rechaza)
+    if N <= 0 or N > MAX_POBLACION or not 0 <= I0 <= N or beta < 0 or gamma < 0 or t_max <= 0:
+        return crear_figura_estocastica()
+
+    if metodo not in NOMBRES_METODO or N > MAX_N_GILLESPIE or N * realizaciones > MAX_EVENTOS_GILLESPIE:
+        metodo = 'tau'
+
+    t = np.linspace(0, t_max, 201)
+    trayectorias = ensamble('sir', [N - I0, I0, 0], t, (beta, gamma, N), realizaciones, metodo, semilla)
+
+    # Fracción de realizaciones en que el brote se apagó (I = 0) antes de llegar al 10 % de N
+    final = trayectorias[-1]
+    extincion = np.mean((final[:, 1] == 0) & (final[:, 2] < 0.1 * N))
+    return crear_figura_estocastica(t, bandas(trayectorias, (0.05, 0.5, 0.95)), extincion, t_max, metodo)
+
+# --- 5. Modo barrido: mapas de calor de pico y tamaño final ---
+def crear_figura_barrido(betas=None, gammas=None, pico=None, tamano_final=None):
+    columnas = [[], []]
+    if betas is not None:
+        columnas[0].append(go.Heatmap(
+            x=betas, y=gammas, z=pico, colorscale='Reds',
+            colorbar=dict(x=0.42, len=0.9), name='Pico'
+        ))
+        columnas[1].append(go.Heatmap(
+            x=betas, y=gammas, z=tamano_final, colorscale='Purples',
+            colorbar=dict(x=1.0, len=0.9), name='Tamaño final'
+        ))
+
+    return figura_columnas(
+        columnas,
+        ('Pico de infectados', 'Tamaño final de la epidemia'),
+        '<b>Barrido SIR en (β, γ)</b>',
+        eje_x='β (transmisión)',
+        eje_y='γ (recuperación)',
+        espacio=0.15
+    )
+
+# Como la simulación larga: las mallas finas y los horizontes largos se
+# dejan en store-trabajo-barrido para el callback en segundo plano
+@callback(
+    Output('graph-sir-barrido', 'figure'),
+    Output('store-trabajo-barrido', 'data'),
+    Input('btn-barrido-sir', 'n_clicks'),
+    State('input-N', 'value'),
+    State('input-I0', 'value'),
+    State('input-tiempo', 'value'),
+    State('input-beta-min', 'value'),
+    State('input-beta-max', 'value'),
+    State('input-gamma-min', 'value'),
+    State('input-gamma-max', 'value'),
+    State('input-resolucion-barrido', 'value')
+)
+def barrer_sir(n_clicks, *parametros):
+    t_max, resolucion = parametros[2], parametros[-1]
+    try:
+        combinaciones = min(max(int(resolucion), 2), MAX_RESOLUCION_BARRIDO) ** 2
+    except (TypeError, ValueError):
+        combinaciones = 0
+    if n_clicks and gestor_fondo is not None and es_pesado(t_max=t_max, barrido=combinaciones) \
+            and update_sir_barrido.buscar(n_clicks, *parametros) is None:
+        return no_update, {'parametros': parametros, 'n': n_clicks}
+    return update_sir_barrido(n_clicks, *parametros), no_update
+
+@memoizar_callback(cache_figuras, cache_compartida) # En disco: la comparte el trabajo en segundo plano
+def update_sir_barrido(n_clicks, N, I0, t_max, beta_min, beta_max, gamma_min, gamma_max, resolucion):
+    if n_clicks == 0:
+        return crear_figura_barrido()
+    return calcular_barrido(N, I0, t_max, beta_min, beta_max, gamma_min, gamma_max, resolucion)
+
+def calcular_barrido(N, I0, t_max, beta_min, beta_max, gamma_min, gamma_max, resolucion, avance=None):
+    # avance(hecho, total): se integra por tramos para la barra de progreso
+    try:
+        N = int(N)
+        I0 = int(I0)
+        t_max = float(min(float(t_max), T_MAX_MAXIMO))
+        beta_min, beta_max = float(beta_min), float(beta_max)
+        gamma_min, gamma_max = float(gamma_min), float(gamma_max)
+        resolucion = min(max(int(resolucion), 2), MAX_RESOLUCION_BARRIDO)
+    except (ValueError, TypeError):
+        return crear_figura_barrido()
+
+    if N <= 0 or not 0 <= I0 <= N or t_max <= 0:
+        return crear_figura_barrido()
+    # Tasas positivas y rangos en orden (con γ <= 0 la epidemia crece sin límite)
+    if not 0 < beta_min <= beta_max or not 0 < gamma_min <= gamma_max:
+        return crear_figura_barrido()
+
+    betas = np.linspace(beta_min, beta_max, resolucion)
+    gammas = np.linspace(gamma_min, gamma_max, resolucion)
+
+    # Todas las combinaciones se integran juntas como un estado (n_params, 3)
+    try:
+        pico, tamano_final = barrido_sir(N, betas, gammas, I0, t_max, avance=avance)
+    except RuntimeError: # El integrador no pudo avanzar con alguna combinación
+        return crear_figura_barrido()
+    return crear_figura_barrido(betas, gammas, pico, tamano_final)
+
+# Proceso aparte con progreso por tramos y "Cancelar"; el resultado queda
+# en la caché con la misma clave que el camino rápido
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-sir-barrido', 'figure', allow_duplicate=True),
+        Input('store-trabajo-barrido', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-barrido', 'value'), Output('progreso-barrido', 'max')],
+        running=[
+            (Output('btn-barrido-sir', 'disabled'), True, False),
+            (Output('trabajo-barrido', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-barrido', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_sir_barrido_fondo(set_progress, trabajo):
+        limitar_recursos()
+        if not trabajo:
+            raise PreventUpdate
+        fig = calcular_barrido(*trabajo['parametros'],
+                               avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        return update_sir_barrido.guardar((trabajo['n'], *trabajo['parametros']), fig)
+
+
+# --- Modo en vivo ---
+# El navegador espera a que el slider se quede quieto (assets/en_vivo.js)
+clientside_callback(
+    ClientsideFunction(namespace='en_vivo', function_name='retrasar'),
+    Output('store-vivo-sir', 'data'),
+    Input('check-vivo-sir', 'value'),
+    Input('slider-beta', 'value'),
+    Input('slider-gamma', 'value'),
+    prevent_initial_call=True
+)
+
+# Solo se resuelve el último pedido de cada cliente en esta página (utils/en_vivo.py);
+# reutiliza update_sir_graph y su caché
+@callback(
+    Output('graph-sir-evolucion', 'figure', allow_duplicate=True),
+    Input('store-vivo-sir', 'data'),
+    State('input-N', 'value'),
+    State('input-I0', 'value'),
+    State('input-tiempo', 'value'),
+    prevent_initial_call=True
+)
+def update_sir_graph_en_vivo(vivo, N, I0, t_max):
+    if not vivo:
+        raise PreventUpdate
+    beta, gamma = vivo['valores']
+    with solicitudes_en_vivo.turno('sir', vivo['cliente'], vivo['secuencia']):
+        return update_sir_graph(1, N, beta, gamma, I0, t_max)
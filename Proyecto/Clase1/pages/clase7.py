@@ -1,14 +1,135 @@
 import dash
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
 import numpy as np
-from scipy.integrate import solve_ivp # Usamos el mismo solucionador
+
+from utils.cache import cache_figuras, memoizar_callback
+from utils.cache_disco import cache_compartida
+from utils.en_vivo import solicitudes_en_vivo
+from utils.figuras import enviar_parche, figura, parche
+from utils.metapoblacion import estado_inicial, leer_matriz, malla_distritos, seir_meta
+from utils.modelos import SEIRS, SIRD, SIRV, integrar, seir # Usamos el mismo motor que el SIR
+from utils.submuestreo import submuestrear, tiempos_densos
+from utils.trabajos import T_MAX_MAXIMO, es_pesado, gestor_fondo, integrar_por_tramos, limitar_recursos
 
 # --- 1. Registro de la página ---
 # El 'name' aparecerá en tu menú desplegable
 dash.register_page(__name__, path='/modelo-seir', name='Modelo SEIR')
 
-# --- 2. Definición del Layout ---
+# --- 2. Función para crear el gráfico base (vacío o con datos) ---
+def crear_figura_seir(t=None, S=None, E=None, I=None, R=None, t_max=100):
+    # Las trazas existen siempre (vacías al inicio): los callbacks envían
+    # solo sus arreglos x/y con un dash.Patch (utils/figuras.py)
+    vacia = t is None
+    if vacia:
+        t = S = E = I = R = []
+
+    trazas = [
+        go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')),
+        go.Scatter(x=t, y=E, mode='lines', name='Expuestos (E)', line=dict(color='orange')),
+        go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')),
+        go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')),
+    ]
+    
+    # El estilo (fondo, rejilla, ejes) viene de la plantilla en utils/figuras.py
+    return figura(
+        trazas,
+        titulo='<b>Evolución del Modelo SEIR</b>',
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max]),
+        showlegend=not vacia
+    )
+
+# Metapoblación: hasta 100 x 100 distritos; pocos instantes guardados por
+# distrito (el estado completo es n_t x n_distritos x 4). El día del pico
+# no sale de esos instantes: lo sigue el integrador (integrar(..., maximo=))
+MAX_LADO_META = 100
+PUNTOS_META = 201
+# Matriz subida por el usuario: tamaño del archivo y conexiones distintas de cero
+MAX_BYTES_MATRIZ = 20 * 1024 * 1024
+MAX_CONEXIONES_META = 1_000_000
+
+def crear_figura_meta(t=None, S=None, E=None, I=None, R=None, t_max=100, n_distritos=0, aviso=None):
+    vacia = t is None
+    if vacia:
+        t = S = E = I = R = []
+
+    trazas = [
+        go.Scatter(x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')),
+        go.Scatter(x=t, y=E, mode='lines', name='Expuestos (E)', line=dict(color='orange')),
+        go.Scatter(x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')),
+        go.Scatter(x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')),
+    ]
+    titulo = '<b>SEIR metapoblacional: total de la región</b>'
+    if aviso:
+        titulo += f'<br><sup>{aviso}</sup>'
+    elif not vacia:
+        titulo += f'<br><sup>{n_distritos} distritos acoplados</sup>'
+    return figura(
+        trazas,
+        titulo=titulo,
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max]),
+        showlegend=not vacia
+    )
+
+def crear_mapa_meta(dia_pico=None):
+    # Día del pico de infectados en cada distrito: muestra cómo avanza la ola
+    trazas = [] if dia_pico is None else [
+        go.Heatmap(z=dia_pico, colorscale='Viridis', colorbar=dict(title='Día'),
+                   hovertemplate='Distrito (%{x}, %{y})<br>Pico el día %{z:.0f}<extra></extra>')
+    ]
+    return figura(
+        trazas,
+        titulo='<b>Día del pico de infectados por distrito</b>',
+        xaxis=dict(showgrid=False, constrain='domain'),
+        yaxis=dict(showgrid=False, scaleanchor='x')
+    )
+
+# Variantes del SEIR (utils/modelos.py): cada una cambia un flujo y trae
+# su propia tasa, que se pasa a integrar() en el orden de modelo.parametros
+VARIANTES = {
+    'seirs': dict(modelo=SEIRS, tasa='xi', titulo='SEIRS: la inmunidad se pierde'),
+    'sird': dict(modelo=SIRD, tasa='mu', titulo='SIRD: parte de los infectados fallece'),
+    'sirv': dict(modelo=SIRV, tasa='nu', titulo='SIRV: se vacuna a los susceptibles'),
+}
+OPCIONES_VARIANTE = [
+    {'label': ' SEIRS (pérdida de inmunidad ξ)', 'value': 'seirs'},
+    {'label': ' SIRD (mortalidad μ)', 'value': 'sird'},
+    {'label': ' SIRV (vacunación ν)', 'value': 'sirv'},
+]
+COMPARTIMENTOS = {
+    'S': ('Susceptibles (S)', 'blue'),
+    'E': ('Expuestos (E)', 'orange'),
+    'I': ('Infectados (I)', 'red'),
+    'R': ('Recuperados (R)', 'green'),
+    'D': ('Fallecidos (D)', 'black'),
+    'V': ('Vacunados (V)', 'purple'),
+}
+
+def crear_figura_variante(variante='seirs', t=None, columnas=None, t_max=100):
+    modelo = VARIANTES[variante]['modelo']
+    vacia = t is None
+    if vacia:
+        t, columnas = [], [[] for _ in modelo.compartimentos]
+
+    trazas = [
+        go.Scatter(x=t, y=y, mode='lines', name=COMPARTIMENTOS[c][0], line=dict(color=COMPARTIMENTOS[c][1]))
+        for c, y in zip(modelo.compartimentos, columnas)
+    ]
+    return figura(
+        trazas,
+        titulo=f"<b>{VARIANTES[variante]['titulo']}</b>",
+        eje_x='Tiempo (días)',
+        eje_y='Número de personas',
+        xaxis=dict(range=[0, t_max]),
+        showlegend=not vacia
+    )
+
+# --- 3. Definición del Layout ---
 layout = html.Div(className='content-container', children=[
     
     # --- Columna Izquierda: Controles y Explicación ---
@@ -62,59 +183,126 @@ $$
         html.Label("Tiempo de simulación (días):", className='input-label'),
         dcc.Input(id='input-tiempo-seir', type='number', value=100, className='input-field'),
 
-        html.Button('Simular Epidemia SEIR', id='btn-simular-seir', n_clicks=0, className='btn-generar')
+        html.Button('Simular Epidemia SEIR', id='btn-simular-seir', n_clicks=0, className='btn-generar'),
+
+        # --- Simulaciones largas: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-seir', style={'display': 'none'}, children=[
+            html.Label("Simulación larga en curso...", className='input-label'),
+            html.Progress(id='progreso-seir', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-seir', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-seir'),
+
+        # --- Modo en vivo: recalcula al soltar/arrastrar los sliders (con espera) ---
+        html.H3("Modo en vivo"),
+        dcc.Checklist(
+            id='check-vivo-seir',
+            options=[{'label': ' Recalcular al mover los sliders', 'value': 'si'}],
+            value=[],
+            className='input-label'
+        ),
+        html.Label("β (en vivo):", className='input-label'),
+        dcc.Slider(id='slider-beta-seir', min=0.01, max=1.5, step=0.01, value=0.5, updatemode='drag',
+                   marks=None, tooltip={'placement': 'bottom', 'always_visible': True}),
+        html.Label("γ (en vivo):", className='input-label'),
+        dcc.Slider(id='slider-gamma-seir', min=0.01, max=1, step=0.01, value=0.1, updatemode='drag',
+                   marks=None, tooltip={'placement': 'bottom', 'always_visible': True}),
+        html.Label("σ (en vivo):", className='input-label'),
+        dcc.Slider(id='slider-sigma-seir', min=0.01, max=1, step=0.01, value=0.2, updatemode='drag',
+                   marks=None, tooltip={'placement': 'bottom', 'always_visible': True}),
+        dcc.Store(id='store-vivo-seir'),
+
+        html.Hr(style={'marginTop': '20px'}),
+
+        # --- Variantes: otro flujo entre compartimentos, mismos parámetros de arriba ---
+        html.H3("Variantes del modelo"),
+        dcc.Markdown(r"""
+Con N, β, γ, I₀ y el tiempo de arriba, más una tasa propia:
+* **SEIRS:** los recuperados vuelven a ser susceptibles, $R \xrightarrow{\xi} S$ (usa también σ).
+* **SIRD:** una parte de los infectados fallece, $I \xrightarrow{\mu} D$.
+* **SIRV:** se vacuna a los susceptibles, $S \xrightarrow{\nu} V$.
+
+En SIRD y SIRV no hay expuestos: E₀ se suma a los infectados iniciales.
+""", mathjax=True),
+
+        dcc.RadioItems(id='radio-variante-seir', options=OPCIONES_VARIANTE, value='seirs',
+                       className='input-label'),
+
+        html.Label("Tasa de la variante (ξ, μ o ν):", className='input-label'),
+        dcc.Input(id='input-tasa-variante', type='number', value=0.01, min=0, step=0.001, className='input-field'),
+
+        html.Button('Simular variante', id='btn-variante-seir', n_clicks=0, className='btn-generar'),
+
+        html.Div(id='trabajo-variante', style={'display': 'none'}, children=[
+            html.Label("Simulación larga en curso...", className='input-label'),
+            html.Progress(id='progreso-variante', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-variante', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-variante'),
+
+        html.Hr(style={'marginTop': '20px'}),
+
+        # --- Metapoblación: muchos distritos acoplados por movilidad ---
+        html.H3("Metapoblación (distritos)"),
+        dcc.Markdown(r"""
+Una cuadrícula de distritos, cada uno con N personas y el SEIR de arriba.
+Una fracción $m$ de los contactos de cada distrito es con sus vecinos:
+$\lambda_i = \beta \sum_j C_{ij} I_j / N_j$, con $C$ una matriz dispersa.
+La epidemia empieza con I₀ y E₀ en el distrito central.
+
+También puedes subir tu propia $C$ (en lugar de la cuadrícula, y sin usar
+$m$): un `.npz` de `scipy.sparse.save_npz` o un CSV con filas
+`fila,columna,valor` (índices desde 0). Debe ser de $n \times n$, con
+$n$ = distritos por lado al cuadrado, y sin valores negativos.
+""", mathjax=True),
+
+        html.Label(f"Distritos por lado (máx. {MAX_LADO_META}):", className='input-label'),
+        dcc.Input(id='input-lado-meta', type='number', value=30, className='input-field'),
+
+        html.Label("Movilidad entre vecinos (m, de 0 a 1):", className='input-label'),
+        dcc.Input(id='input-movilidad-meta', type='number', value=0.05, step=0.01, className='input-field'),
+
+        dcc.Upload(
+            id='upload-matriz-meta',
+            children=html.Div(["Arrastra o ", html.A("elige una matriz (.npz o CSV)", href="#")]),
+            style={'width': '100%', 'padding': '20px 0', 'borderWidth': '2px', 'borderStyle': 'dashed',
+                   'borderRadius': '5px', 'textAlign': 'center', 'boxSizing': 'border-box'},
+            multiple=False,
+            max_size=MAX_BYTES_MATRIZ
+        ),
+        html.Div(id='nombre-archivo-matriz', className='input-label'),
+
+        html.Button('Simular distritos', id='btn-meta-seir', n_clicks=0, className='btn-generar'),
+
+        # --- Muchos distritos: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-meta', style={'display': 'none'}, children=[
+            html.Label("Simulación de distritos en curso...", className='input-label'),
+            html.Progress(id='progreso-meta', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-meta', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-meta')
     ]),
     
     # --- Columna Derecha: Gráfica ---
     html.Div(className='right-column card', children=[
         html.H2("Evolución de la Epidemia (SEIR)"),
-        dcc.Graph(id='graph-seir-evolucion')
+        dcc.Graph(id='graph-seir-evolucion', figure=crear_figura_seir()),
+
+        html.H2("Variantes"),
+        dcc.Graph(id='graph-seir-variante', figure=crear_figura_variante()),
+
+        html.H2("Metapoblación"),
+        dcc.Graph(id='graph-seir-meta', figure=crear_figura_meta()),
+        dcc.Graph(id='graph-seir-meta-mapa', figure=crear_mapa_meta())
     ])
 ])
 
-# --- 3. Función para crear el gráfico base (vacío o con datos) ---
-def crear_figura_seir(t=None, S=None, E=None, I=None, R=None, t_max=100):
-    fig = go.Figure()
-
-    if t is not None:
-        # Si hay datos, dibujamos las curvas
-        fig.add_trace(go.Scatter(
-            x=t, y=S, mode='lines', name='Susceptibles (S)', line=dict(color='blue')
-        ))
-        fig.add_trace(go.Scatter(
-            x=t, y=E, mode='lines', name='Expuestos (E)', line=dict(color='orange')
-        ))
-        fig.add_trace(go.Scatter(
-            x=t, y=I, mode='lines', name='Infectados (I)', line=dict(color='red')
-        ))
-        fig.add_trace(go.Scatter(
-            x=t, y=R, mode='lines', name='Recuperados (R)', line=dict(color='green')
-        ))
-    
-    # Damos estilo a la figura (con datos o vacía)
-    fig.update_layout(
-        title=dict(text='<b>Evolución del Modelo SEIR</b>', font=dict(color='#880e4f', size=16)),
-        title_x=0.5,
-        xaxis_title='Tiempo (días)',
-        yaxis_title='Número de personas',
-        height=450,
-        legend=dict(x=0.02, y=0.98),
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(
-            showgrid=True, gridcolor='lightgrey', zeroline=True, 
-            zerolinewidth=2, zerolinecolor='black', range=[0, t_max]
-        ),
-        yaxis=dict(
-            showgrid=True, gridcolor='lightgrey', zeroline=True, 
-            zerolinewidth=2, zerolinecolor='black'
-        )
-    )
-    return fig
-
-# --- 4. Callback para actualizar el gráfico ---
+# --- 4. Callbacks para actualizar el gráfico ---
+# Los pedidos chicos se resuelven aquí mismo; los de horizonte muy largo
+# se dejan en store-trabajo-seir para el callback en segundo plano de abajo
 @callback(
     Output('graph-seir-evolucion', 'figure'),
+    Output('store-trabajo-seir', 'data'),
     Input('btn-simular-seir', 'n_clicks'),
     State('input-N-seir', 'value'),
     State('input-beta-seir', 'value'),
@@ -124,6 +312,17 @@ def crear_figura_seir(t=None, S=None, E=None, I=None, R=None, t_max=100):
     State('input-E0-seir', 'value'),
     State('input-tiempo-seir', 'value')
 )
+def simular_seir(n_clicks, N, beta, gamma, sigma, I0, E0, t_max):
+    # Un pedido pesado ya calculado (aquí o en segundo plano) sale de la caché
+    if n_clicks and gestor_fondo is not None and es_pesado(t_max=t_max) \
+            and update_seir_graph.buscar(n_clicks, N, beta, gamma, sigma, I0, E0, t_max) is None:
+        return no_update, {'N': N, 'beta': beta, 'gamma': gamma, 'sigma': sigma,
+                           'I0': I0, 'E0': E0, 't_max': t_max, 'n': n_clicks}
+    return update_seir_graph(n_clicks, N, beta, gamma, sigma, I0, E0, t_max), no_update
+
+# Al navegador solo viajan los arreglos x/y (y el rango del eje X)
+@enviar_parche(layout=('xaxis.range', 'showlegend'))
+@memoizar_callback(cache_figuras, cache_compartida) # Memoria del worker y luego disco compartido
 def update_seir_graph(n_clicks, N, beta, gamma, sigma, I0, E0, t_max):
     
     # Si el botón no se ha presionado, muestra el gráfico vacío
@@ -138,42 +337,314 @@ def update_seir_graph(n_clicks, N, beta, gamma, sigma, I0, E0, t_max):
         beta = float(beta)
         gamma = float(gamma)
         sigma = float(sigma)
-        t_max = int(t_max)
+        t_max = int(min(float(t_max), T_MAX_MAXIMO))
     except (ValueError, TypeError):
         return crear_figura_seir(t_max=t_max) # Error en inputs, devuelve vacío
 
+    if N <= 0 or I0 < 0 or E0 < 0 or I0 + E0 > N or t_max <= 0:
+        return crear_figura_seir(t_max=t_max) # Población vacía o más infectados que personas
+
     # --- B. Condiciones Iniciales ---
     R0 = 0
     S0 = N - I0 - E0 - R0 # S0 se calcula con los 3 restantes
     y0 = [S0, E0, I0, R0] # Vector de condiciones iniciales (¡4 elementos!)
 
-    # --- C. Definir el sistema de Ecuaciones (las 4 ecuaciones) ---
-    def seir_model(t, y):
-        S, E, I, R = y
-        dSdt = - (beta * S * I) / N
-        dEdt = (beta * S * I) / N - sigma * E
-        dIdt = sigma * E - gamma * I
-        dRdt = gamma * I
-        return [dSdt, dEdt, dIdt, dRdt]
-
-    # --- D. Resolver el sistema ---
-    t_span = [0, t_max]
-    t_eval = np.linspace(0, t_max, 500) 
-    
-    sol = solve_ivp(
-        seir_model, 
-        t_span, 
-        y0, 
-        t_eval=t_eval, 
-        method='RK45'
+    # --- C. Resolver el sistema (motor compartido en utils/modelos.py) ---
+    # Malla densa según el horizonte; luego se reduce a los puntos de pantalla
+    t_eval = tiempos_densos(t_max)
+    try:
+        y = integrar(seir, y0, t_eval, args=(beta, gamma, sigma, N))
+    except RuntimeError: # El integrador no pudo avanzar (parámetros extremos)
+        return crear_figura_seir(t_max=t_max)
+
+    # --- D. Extraer resultados (LTTB, conserva el pico; utils/submuestreo.py) ---
+    t, S, E, I, R = submuestrear(t_eval, *y.T)
+
+    # --- E. Devolver la figura con los datos ---
+    return crear_figura_seir(t, S, E, I, R, t_max)
+
+# --- Simulaciones largas en segundo plano ---
+# Corre en un proceso aparte (DiskcacheManager): el worker queda libre,
+# la barra avanza por tramos y el botón "Cancelar" mata el proceso
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-seir-evolucion', 'figure', allow_duplicate=True),
+        Input('store-trabajo-seir', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-seir', 'value'), Output('progreso-seir', 'max')],
+        running=[
+            (Output('btn-simular-seir', 'disabled'), True, False),
+            (Output('trabajo-seir', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-seir', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_seir_graph_fondo(set_progress, trabajo):
+        limitar_recursos()
+        try:
+            N = int(trabajo['N'])
+            I0 = int(trabajo['I0'])
+            E0 = int(trabajo['E0'])
+            beta = float(trabajo['beta'])
+            gamma = float(trabajo['gamma'])
+            sigma = float(trabajo['sigma'])
+            t_max = int(min(float(trabajo['t_max']), T_MAX_MAXIMO))
+        except (ValueError, TypeError, KeyError):
+            raise PreventUpdate
+        if N <= 0 or I0 < 0 or E0 < 0 or I0 + E0 > N or t_max <= 0:
+            raise PreventUpdate
+
+        t_eval = tiempos_densos(t_max)
+        try:
+            y = integrar_por_tramos(seir, [N - I0 - E0, E0, I0, 0], t_eval, args=(beta, gamma, sigma, N),
+                                    avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        except RuntimeError:
+            return parche(crear_figura_seir(t_max=t_max), layout=('xaxis.range', 'showlegend'))
+        t, S, E, I, R = submuestrear(t_eval, *y.T)
+
+        # Misma clave que el camino rápido: el próximo pedido igual sale de la caché
+        argumentos = tuple(trabajo[k] for k in ('n', 'N', 'beta', 'gamma', 'sigma', 'I0', 'E0', 't_max'))
+        fig = update_seir_graph.guardar(argumentos, crear_figura_seir(t, S, E, I, R, t_max))
+        return parche(fig, layout=('xaxis.range', 'showlegend'))
+
+
+# --- Modo en vivo ---
+# El navegador espera a que el slider se quede quieto (assets/en_vivo.js)
+clientside_callback(
+    ClientsideFunction(namespace='en_vivo', function_name='retrasar'),
+    Output('store-vivo-seir', 'data'),
+    Input('check-vivo-seir', 'value'),
+    Input('slider-beta-seir', 'value'),
+    Input('slider-gamma-seir', 'value'),
+    Input('slider-sigma-seir', 'value'),
+    prevent_initial_call=True
+)
+
+# Solo se resuelve el último pedido de cada cliente en esta página (utils/en_vivo.py);
+# reutiliza update_seir_graph y su caché
+@callback(
+    Output('graph-seir-evolucion', 'figure', allow_duplicate=True),
+    Input('store-vivo-seir', 'data'),
+    State('input-N-seir', 'value'),
+    State('input-I0-seir', 'value'),
+    State('input-E0-seir', 'value'),
+    State('input-tiempo-seir', 'value'),
+    prevent_initial_call=True
+)
+def update_seir_graph_en_vivo(vivo, N, I0, E0, t_max):
+    if not vivo:
+        raise PreventUpdate
+    beta, gamma, sigma = vivo['valores']
+    with solicitudes_en_vivo.turno('seir', vivo['cliente'], vivo['secuencia']):
+        return update_seir_graph(1, N, beta, gamma, sigma, I0, E0, t_max)
+
+
+# --- Variantes SEIRS / SIRD / SIRV ---
+# Mismo reparto que el SEIR: los horizontes muy largos van al segundo plano
+@callback(
+    Output('graph-seir-variante', 'figure'),
+    Output('store-trabajo-variante', 'data'),
+    Input('btn-variante-seir', 'n_clicks'),
+    State('radio-variante-seir', 'value'),
+    State('input-N-seir', 'value'),
+    State('input-beta-seir', 'value'),
+    State('input-gamma-seir', 'value'),
+    State('input-sigma-seir', 'value'),
+    State('input-tasa-variante', 'value'),
+    State('input-I0-seir', 'value'),
+    State('input-E0-seir', 'value'),
+    State('input-tiempo-seir', 'value')
+)
+def simular_variante(n_clicks, *parametros):
+    if n_clicks and gestor_fondo is not None and es_pesado(t_max=parametros[-1]) \
+            and update_seir_variante.buscar(n_clicks, *parametros) is None:
+        return no_update, {'parametros': parametros, 'n': n_clicks}
+    return update_seir_variante(n_clicks, *parametros), no_update
+
+@memoizar_callback(cache_figuras, cache_compartida) # En disco: la comparte el trabajo en segundo plano
+def update_seir_variante(n_clicks, variante, N, beta, gamma, sigma, tasa, I0, E0, t_max):
+    if n_clicks == 0 or variante not in VARIANTES:
+        return crear_figura_variante(t_max=t_max)
+    return calcular_variante(variante, N, beta, gamma, sigma, tasa, I0, E0, t_max)
+
+def calcular_variante(variante, N, beta, gamma, sigma, tasa, I0, E0, t_max, avance=None):
+    # avance(hecho, total): se integra por tramos para la barra de progreso
+    try:
+        N = int(N)
+        I0 = int(I0)
+        E0 = int(E0)
+        beta = float(beta)
+        gamma = float(gamma)
+        sigma = float(sigma)
+        tasa = float(tasa)
+        t_max = int(min(float(t_max), T_MAX_MAXIMO))
+    except (ValueError, TypeError):
+        return crear_figura_variante(variante, t_max=t_max)
+
+    if N <= 0 or I0 < 0 or E0 < 0 or I0 + E0 > N or t_max <= 0 or min(beta, gamma, sigma, tasa) < 0:
+        return crear_figura_variante(variante, t_max=t_max)
+
+    # --- A. Estado inicial y argumentos, por nombre de compartimento y de parámetro ---
+    modelo = VARIANTES[variante]['modelo']
+    iniciales = {'S': N - I0 - E0, 'E': E0, 'I': I0} if 'E' in modelo.compartimentos \
+        else {'S': N - I0 - E0, 'I': I0 + E0}
+    y0 = [iniciales.get(c, 0) for c in modelo.compartimentos]
+    valores = {'beta': beta, 'gamma': gamma, 'sigma': sigma, VARIANTES[variante]['tasa']: tasa, 'N': N}
+    argumentos = tuple(valores[p] for p, _ in modelo.parametros)
+
+    # --- B. Resolver con el motor compartido y reducir a los puntos de pantalla ---
+    t_eval = tiempos_densos(t_max)
+    try:
+        if avance is None:
+            y = integrar(modelo.rhs, y0, t_eval, args=argumentos)
+        else:
+            y = integrar_por_tramos(modelo.rhs, y0, t_eval, args=argumentos, avance=avance)
+    except RuntimeError: # El integrador no pudo avanzar (parámetros extremos)
+        return crear_figura_variante(variante, t_max=t_max)
+
+    t, *columnas = submuestrear(t_eval, *y.T)
+    return crear_figura_variante(variante, t, columnas, t_max)
+
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-seir-variante', 'figure', allow_duplicate=True),
+        Input('store-trabajo-variante', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-variante', 'value'), Output('progreso-variante', 'max')],
+        running=[
+            (Output('btn-variante-seir', 'disabled'), True, False),
+            (Output('trabajo-variante', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-variante', 'n_clicks')],
+        prevent_initial_call=True
     )
+    def update_seir_variante_fondo(set_progress, trabajo):
+        limitar_recursos()
+        if not trabajo or trabajo['parametros'][0] not in VARIANTES:
+            raise PreventUpdate
+        fig = calcular_variante(*trabajo['parametros'],
+                                avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        return update_seir_variante.guardar((trabajo['n'], *trabajo['parametros']), fig)
 
-    # --- E. Extraer resultados ---
-    t = sol.t
-    S = sol.y[0]
-    E = sol.y[1]
-    I = sol.y[2]
-    R = sol.y[3]
 
-    # --- F. Devolver la figura con los datos ---
-    return crear_figura_seir(t, S, E, I, R, t_max)
\ No newline at end of file
+# --- Metapoblación: SEIR en una cuadrícula de distritos (utils/metapoblacion.py) ---
+@callback(
+    Output('nombre-archivo-matriz', 'children'),
+    Input('upload-matriz-meta', 'filename')
+)
+def mostrar_matriz(nombre):
+    return f"Matriz: {nombre}" if nombre else "Sin matriz: se usa la cuadrícula con movilidad m."
+
+# Como en el SEIR: las cuadrículas grandes van al callback en segundo plano
+@callback(
+    Output('graph-seir-meta', 'figure'),
+    Output('graph-seir-meta-mapa', 'figure'),
+    Output('store-trabajo-meta', 'data'),
+    Input('btn-meta-seir', 'n_clicks'),
+    State('input-N-seir', 'value'),
+    State('input-beta-seir', 'value'),
+    State('input-gamma-seir', 'value'),
+    State('input-sigma-seir', 'value'),
+    State('input-I0-seir', 'value'),
+    State('input-E0-seir', 'value'),
+    State('input-tiempo-seir', 'value'),
+    State('input-lado-meta', 'value'),
+    State('input-movilidad-meta', 'value'),
+    State('upload-matriz-meta', 'contents'),
+    State('upload-matriz-meta', 'filename')
+)
+def simular_meta(n_clicks, *parametros):
+    t_max, lado = parametros[6], parametros[7]
+    try:
+        distritos = min(int(lado), MAX_LADO_META) ** 2
+    except (TypeError, ValueError):
+        distritos = 0
+    if n_clicks and gestor_fondo is not None and es_pesado(t_max=t_max, distritos=distritos) \
+            and update_seir_meta.buscar(n_clicks, *parametros) is None:
+        return no_update, no_update, {'parametros': parametros, 'n': n_clicks}
+    return *update_seir_meta(n_clicks, *parametros), no_update
+
+@memoizar_callback(cache_figuras, cache_compartida) # En disco: la comparte el trabajo en segundo plano
+def update_seir_meta(n_clicks, N, beta, gamma, sigma, I0, E0, t_max, lado, movilidad, contenido, nombre):
+    if n_clicks == 0:
+        return crear_figura_meta(), crear_mapa_meta()
+    return simular_distritos(N, beta, gamma, sigma, I0, E0, t_max, lado, movilidad, contenido, nombre)
+
+def simular_distritos(N, beta, gamma, sigma, I0, E0, t_max, lado, movilidad, contenido=None, nombre=None,
+                      avance=None):
+    # avance(hecho, total): se integra por tramos para la barra de progreso
+    try:
+        N = int(N)
+        I0 = int(I0)
+        E0 = int(E0)
+        beta = float(beta)
+        gamma = float(gamma)
+        sigma = float(sigma)
+        t_max = float(min(float(t_max), T_MAX_MAXIMO))
+        lado = min(max(int(lado), 1), MAX_LADO_META)
+        movilidad = min(max(float(movilidad), 0.0), 1.0)
+    except (ValueError, TypeError):
+        return crear_figura_meta(), crear_mapa_meta()
+
+    if N <= 0 or I0 < 0 or E0 < 0 or I0 + E0 > N or t_max <= 0:
+        return crear_figura_meta(), crear_mapa_meta() # El distrito central no tiene tantas personas
+
+    # --- A. Red de distritos (la cuadrícula o la matriz subida) y estado inicial (n_distritos, 4) ---
+    if contenido:
+        try:
+            C = leer_matriz(contenido, lado * lado, nombre or '')
+        except (ValueError, UnicodeDecodeError) as error:
+            mensaje = str(error) if isinstance(error, ValueError) else "el CSV debe ser texto UTF-8."
+            return crear_figura_meta(aviso=f"No se pudo usar la matriz: {mensaje}"), crear_mapa_meta()
+        if C.nnz > MAX_CONEXIONES_META:
+            aviso = f"No se pudo usar la matriz: tiene más de {MAX_CONEXIONES_META:,} conexiones.".replace(',', '.')
+            return crear_figura_meta(aviso=aviso), crear_mapa_meta()
+    else:
+        C = malla_distritos(lado, movilidad)
+    poblaciones = np.full(lado * lado, float(N))
+    centro = (lado // 2) * lado + lado // 2
+    y0 = estado_inicial(poblaciones, I0, centro, E0)
+
+    # --- B. Integrar: la fuerza de infección es un producto disperso por paso ---
+    t_eval = np.linspace(0, t_max, PUNTOS_META)
+    argumentos = (beta, gamma, sigma, C, poblaciones)
+    info = {}
+    try:
+        if avance is None:
+            y = integrar(seir_meta, y0, t_eval, args=argumentos, info=info, maximo=2)
+        else:
+            y = integrar_por_tramos(seir_meta, y0, t_eval, args=argumentos, avance=avance, info=info, maximo=2)
+    except RuntimeError: # El integrador no pudo avanzar (parámetros extremos)
+        return crear_figura_meta(), crear_mapa_meta()
+
+    # --- C. Totales de la región y día del pico en cada distrito (seguido paso a paso) ---
+    t, S, E, I, R = submuestrear(t_eval, *y.sum(axis=1).T)
+    dia_pico = info['t_maximo'].reshape(lado, lado)
+    return crear_figura_meta(t, S, E, I, R, t_max, lado * lado), crear_mapa_meta(dia_pico)
+
+# Proceso aparte con progreso por tramos y "Cancelar"; el resultado queda
+# en la caché con la misma clave que el camino rápido
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-seir-meta', 'figure', allow_duplicate=True),
+        Output('graph-seir-meta-mapa', 'figure', allow_duplicate=True),
+        Input('store-trabajo-meta', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-meta', 'value'), Output('progreso-meta', 'max')],
+        running=[
+            (Output('btn-meta-seir', 'disabled'), True, False),
+            (Output('trabajo-meta', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-meta', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_seir_meta_fondo(set_progress, trabajo):
+        limitar_recursos()
+        if not trabajo:
+            raise PreventUpdate
+        figuras = simular_distritos(*trabajo['parametros'],
+                                    avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        return update_seir_meta.guardar((trabajo['n'], *trabajo['parametros']), figuras)
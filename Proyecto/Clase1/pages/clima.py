@@ -1,9 +1,11 @@
 import dash
 from dash import html, dcc, callback, Input, Output
 import plotly.graph_objects as go
-import requests
-import pandas as pd
-from datetime import datetime
+import os
+
+from utils.clima import ActualizadorClima, Pronostico, cliente_clima
+from utils.submuestreo import submuestrear
+from utils.paginas import layout_diferido
 
 # --- 1. Registro de la página ---
 dash.register_page(__name__, path='/clima-peru', name='Clima en Perú (API)')
@@ -20,55 +22,70 @@ ciudades = {
     "Huancayo": {"lat": -12.0651, "lon": -75.2049, "color": "brown"}
 }
 
+# Horizonte del pronóstico en días (la API acepta hasta 16)
+DIAS_PRONOSTICO = int(os.environ.get('CLIMA_DIAS', 1))
+
+# Un hilo de fondo trae las 8 ciudades en una sola petición cada
+# CLIMA_INTERVALO segundos; los clics se sirven desde esa copia en memoria
+actualizador = ActualizadorClima(
+    {nombre: (datos["lat"], datos["lon"]) for nombre, datos in ciudades.items()},
+    cliente_clima,
+    intervalo=int(os.environ.get('CLIMA_INTERVALO', 900)),
+    dias=DIAS_PRONOSTICO
+)
+
 # --- 3. Layout (Interfaz Gráfica) ---
-layout = html.Div(className='content-container', children=[
+# Se arma en la primera visita (la figura del mapa no se construye al importar)
+@layout_diferido
+def layout():
+    return html.Div(className='content-container', children=[
     
-    # --- Columna Izquierda: Mapa ---
-    html.Div(className='left-column card', children=[
-        html.H2("Mapa de Estaciones"),
-        dcc.Markdown("Haz clic en una ciudad para consultar la API de Open-Meteo en tiempo real."),
+        # --- Columna Izquierda: Mapa ---
+        html.Div(className='left-column card', children=[
+            html.H2("Mapa de Estaciones"),
+            dcc.Markdown("Haz clic en una ciudad para consultar la API de Open-Meteo en tiempo real."),
         
-        dcc.Graph(
-            id='mapa-peru',
-            figure=go.Figure(
-                data=[
-                    # Creamos los puntos en el mapa
-                    go.Scattermapbox(
-                        lat=[datos["lat"] for datos in ciudades.values()],
-                        lon=[datos["lon"] for datos in ciudades.values()],
-                        mode='markers+text',
-                        marker=go.scattermapbox.Marker(size=14, color='red'),
-                        text=list(ciudades.keys()), # Nombres de las ciudades
-                        textposition="top right",
-                        hoverinfo='text'
+            dcc.Graph(
+                id='mapa-peru',
+                figure=go.Figure(
+                    data=[
+                        # Creamos los puntos en el mapa
+                        go.Scattermapbox(
+                            lat=[datos["lat"] for datos in ciudades.values()],
+                            lon=[datos["lon"] for datos in ciudades.values()],
+                            mode='markers+text',
+                            marker=go.scattermapbox.Marker(size=14, color='red'),
+                            text=list(ciudades.keys()), # Nombres de las ciudades
+                            textposition="top right",
+                            hoverinfo='text'
+                        )
+                    ],
+                    layout=go.Layout(
+                        mapbox_style="open-street-map", # Estilo de mapa gratuito
+                        mapbox=dict(
+                            center=dict(lat=-9.19, lon=-75.015), # Centro de Perú
+                            zoom=4
+                        ),
+                        margin={"r":0,"t":0,"l":0,"b":0},
+                        height=450
                     )
-                ],
-                layout=go.Layout(
-                    mapbox_style="open-street-map", # Estilo de mapa gratuito
-                    mapbox=dict(
-                        center=dict(lat=-9.19, lon=-75.015), # Centro de Perú
-                        zoom=4
-                    ),
-                    margin={"r":0,"t":0,"l":0,"b":0},
-                    height=450
                 )
             )
-        )
-    ]),
+        ]),
     
-    # --- Columna Derecha: Pronóstico (Resultado de la API) ---
-    html.Div(className='right-column card', children=[
-        html.H2("Pronóstico Horario (24h)"),
-        dcc.Loading( # Muestra un circulito de carga mientras llama a la API
-            id="loading-clima",
-            type="circle",
-            children=[
-                dcc.Graph(id='grafica-clima'),
-                html.Div(id='info-extra', style={'marginTop': '20px'})
-            ]
-        )
+        # --- Columna Derecha: Pronóstico (Resultado de la API) ---
+        html.Div(className='right-column card', children=[
+            html.H2(f"Pronóstico Horario ({24 * DIAS_PRONOSTICO}h)"),
+            dcc.Loading( # Muestra un circulito de carga mientras llama a la API
+                id="loading-clima",
+                type="circle",
+                children=[
+                    dcc.Graph(id='grafica-clima'),
+                    html.Div(id='info-extra', style={'marginTop': '20px'})
+                ]
+            )
+        ])
     ])
-])
 
 # --- 4. Callback: El puente entre el Mapa y la API ---
 @callback(
@@ -87,21 +104,22 @@ def actualizar_clima(clickData):
     lat, lon = coords['lat'], coords['lon']
     
     # B. ¡LLAMADA A LA API! (Aquí ocurre la magia)
-    # Usamos la API de Open-Meteo
-    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&hourly=temperature_2m,relative_humidity_2m&timezone=auto&forecast_days=1"
-    
+    # Normalmente los datos ya están en memoria (actualizador de fondo).
+    # Si aún no hay instantánea, vamos a la API de Open-Meteo con el
+    # cliente de utils/clima.py (sesión compartida, timeouts y caché).
     try:
-        response = requests.get(url) # Hacemos la petición GET
-        data = response.json() # Convertimos la respuesta a JSON
+        instantanea = actualizador.obtener(ciudad_seleccionada)
+        if instantanea is not None:
+            pronostico, antiguedad = instantanea
+        else:
+            data = cliente_clima.pronostico(lat, lon, DIAS_PRONOSTICO)
+            pronostico, antiguedad = Pronostico.desde_json(data), 0.0
         
         # C. Procesar los datos (Extraer horas y temperaturas)
-        hourly_data = data['hourly']
-        tiempos = hourly_data['time']
-        temperaturas = hourly_data['temperature_2m']
-        humedad = hourly_data['relative_humidity_2m']
-        
-        # Convertir las fechas feas "2023-11-10T00:00" a objetos datetime
-        fechas_formateadas = [datetime.fromisoformat(t) for t in tiempos]
+        # Ya vienen en columnas NumPy: tiempos datetime64 y valores float
+        # (y con muchos días se reducen a los puntos de pantalla con LTTB)
+        fechas_formateadas, temperaturas, humedad = submuestrear(
+            pronostico.tiempo, pronostico['temperature_2m'], pronostico['relative_humidity_2m'])
         
         # D. Crear la Gráfica
         fig = go.Figure()
@@ -126,7 +144,7 @@ def actualizar_clima(clickData):
         ))
 
         fig.update_layout(
-            title=f"Clima en {ciudad_seleccionada} (Hoy)",
+            title=f"Clima en {ciudad_seleccionada} ({'Hoy' if DIAS_PRONOSTICO == 1 else f'{DIAS_PRONOSTICO} días'})",
             xaxis_title="Hora",
             yaxis_title="Temperatura (°C)",
             yaxis2=dict(
@@ -141,10 +159,12 @@ def actualizar_clima(clickData):
         )
         
         # Info extra
-        temp_actual = temperaturas[datetime.now().hour]
+        # (la hora en curso de la ciudad, no la del servidor)
+        temp_actual = temperaturas[pronostico.indice_actual()]
         mensaje = dcc.Markdown(f"""
             **Resumen para {ciudad_seleccionada}:**
             * Temperatura estimada actual: **{temp_actual}°C**
+            * Datos actualizados hace {antiguedad / 60:.0f} min
             * Fuente de datos: [Open-Meteo API](https://open-meteo.com/)
         """)
         
@@ -0,0 +1,211 @@
+import dash
+from dash import html, dcc, callback, Input, Output, State, no_update
+from dash.exceptions import PreventUpdate
+import plotly.graph_objects as go
+
+from utils.cache import cache_figuras, memoizar_callback
+from utils.cache_disco import cache_compartida
+from utils.figuras import figura_columnas
+from utils.sensibilidad import sobol
+from utils.trabajos import T_MAX_MAXIMO, es_pesado, gestor_fondo, limitar_recursos
+
+# --- 1. Registro de la página ---
+dash.register_page(__name__, path='/sensibilidad-seir', name='Sensibilidad SEIR (Sobol)')
+
+SIMBOLOS = ['β', 'γ', 'σ']
+TITULOS_SALIDA = ['Pico de infectados', 'Día del pico', 'Tamaño final']
+
+# Muestras base n (potencias de 2): se hacen n·(3 + 2) simulaciones
+OPCIONES_MUESTRAS = [
+    {'label': f' {2 ** k} muestras ({5 * 2 ** k:,} simulaciones)'.replace(',', '.'), 'value': 2 ** k}
+    for k in (10, 12, 14, 15)
+]
+
+# --- 2. Gráfico de barras de los índices ---
+def crear_figura_sobol(resultado=None, subtitulo=None):
+    columnas = [[] for _ in TITULOS_SALIDA]
+    if resultado is not None:
+        for nombre, clave, color in (('Primer orden (S₁)', 'S1', '#1f77b4'), ('Total (S_T)', 'ST', '#d62728')):
+            indices, intervalo = resultado[clave], resultado[f'{clave}_ic']
+            for k, trazas in enumerate(columnas):
+                trazas.append(go.Bar(
+                    x=SIMBOLOS, y=indices[:, k], name=nombre, marker_color=color,
+                    legendgroup=clave, showlegend=k == 0,
+                    error_y=dict(type='data', symmetric=False,
+                                 array=intervalo[1, :, k] - indices[:, k],
+                                 arrayminus=indices[:, k] - intervalo[0, :, k])
+                ))
+
+    titulo = '<b>Índices de Sobol del SEIR</b>'
+    if subtitulo:
+        titulo += f'<br><sup>{subtitulo}</sup>'
+
+    # Con pocas muestras S₁ puede salir algo negativo: con datos, el eje se ajusta a ellos
+    return figura_columnas(
+        columnas,
+        TITULOS_SALIDA,
+        titulo,
+        estilo_x=dict(showgrid=False),
+        estilo_y=dict(range=[0, 1.05]) if resultado is None else dict(rangemode='tozero'),
+        barmode='group',
+        legend=dict(orientation='h', x=0, y=-0.15)
+    )
+
+# --- 3. Layout ---
+layout = html.Div(className='content-container', children=[
+
+    # --- Columna Izquierda: Rangos y opciones ---
+    html.Div(className='left-column card', children=[
+        html.H2("Análisis de sensibilidad global"),
+
+        dcc.Markdown(r"""
+¿Qué parámetro decide el pico de la epidemia SEIR? En vez de mover β, γ
+y σ de a uno, se simulan miles de combinaciones tomadas de todo su
+rango (secuencia cuasi-aleatoria de Sobol) y se reparte la varianza de
+cada resultado entre los parámetros:
+
+* **Primer orden $S_1$:** lo que explica el parámetro **solo**.
+* **Total $S_T$:** lo que explica contando sus **interacciones** con los
+  demás. Si $S_T \gg S_1$, el efecto depende de los otros parámetros.
+
+Las barras de error son intervalos de bootstrap al 95 %.
+""", mathjax=True),
+
+        html.Hr(),
+
+        html.Label("β mínimo / máximo:", className='input-label'),
+        dcc.Input(id='input-beta-min-sobol', type='number', value=0.1, step=0.01, className='input-field'),
+        dcc.Input(id='input-beta-max-sobol', type='number', value=1.0, step=0.01, className='input-field'),
+
+        html.Label("γ mínimo / máximo:", className='input-label'),
+        dcc.Input(id='input-gamma-min-sobol', type='number', value=0.05, step=0.01, className='input-field'),
+        dcc.Input(id='input-gamma-max-sobol', type='number', value=0.5, step=0.01, className='input-field'),
+
+        html.Label("σ mínimo / máximo:", className='input-label'),
+        dcc.Input(id='input-sigma-min-sobol', type='number', value=0.1, step=0.01, className='input-field'),
+        dcc.Input(id='input-sigma-max-sobol', type='number', value=1.0, step=0.01, className='input-field'),
+
+        html.Label("Población Total (N):", className='input-label'),
+        dcc.Input(id='input-N-sobol', type='number', value=1000, className='input-field'),
+
+        html.Label("Infectados iniciales (I₀):", className='input-label'),
+        dcc.Input(id='input-I0-sobol', type='number', value=1, className='input-field'),
+
+        html.Label("Tiempo de simulación (días):", className='input-label'),
+        dcc.Input(id='input-tiempo-sobol', type='number', value=160, className='input-field'),
+
+        html.Label("Tamaño de la muestra:", className='input-label'),
+        dcc.RadioItems(id='radio-muestras-sobol', options=OPCIONES_MUESTRAS, value=2 ** 12,
+                       className='input-label'),
+
+        html.Button('Calcular índices', id='btn-sobol', n_clicks=0, className='btn-generar'),
+
+        # --- Muestras grandes: se calculan en segundo plano (utils/trabajos.py) ---
+        html.Div(id='trabajo-sobol', style={'display': 'none'}, children=[
+            html.Label("Simulando (trozos terminados)...", className='input-label'),
+            html.Progress(id='progreso-sobol', value='0', max='1', style={'width': '100%'}),
+            html.Button('Cancelar', id='btn-cancelar-sobol', n_clicks=0, className='btn-generar'),
+        ]),
+        dcc.Store(id='store-trabajo-sobol')
+    ]),
+
+    # --- Columna Derecha: Índices ---
+    html.Div(className='right-column card', children=[
+        html.H2("¿Qué parámetro importa más?"),
+        dcc.Loading(dcc.Graph(id='graph-sobol', figure=crear_figura_sobol()))
+    ])
+])
+
+# --- 4. Callbacks ---
+# Las muestras chicas se resuelven aquí mismo; las de 10^5 simulaciones
+# van al callback en segundo plano de abajo
+@callback(
+    Output('graph-sobol', 'figure'),
+    Output('store-trabajo-sobol', 'data'),
+    Input('btn-sobol', 'n_clicks'),
+    State('input-beta-min-sobol', 'value'),
+    State('input-beta-max-sobol', 'value'),
+    State('input-gamma-min-sobol', 'value'),
+    State('input-gamma-max-sobol', 'value'),
+    State('input-sigma-min-sobol', 'value'),
+    State('input-sigma-max-sobol', 'value'),
+    State('input-N-sobol', 'value'),
+    State('input-I0-sobol', 'value'),
+    State('input-tiempo-sobol', 'value'),
+    State('radio-muestras-sobol', 'value')
+)
+def calcular_sobol(n_clicks, *parametros):
+    muestras = parametros[-1]
+    try:
+        simulaciones = 5 * int(muestras)
+    except (TypeError, ValueError):
+        simulaciones = 0
+    # Un pedido pesado ya calculado (aquí o en segundo plano) sale de la caché
+    if n_clicks and gestor_fondo is not None and es_pesado(simulaciones=simulaciones) \
+            and update_sobol.buscar(n_clicks, *parametros) is None:
+        return no_update, {'parametros': parametros, 'n': n_clicks}
+    return update_sobol(n_clicks, *parametros), no_update
+
+@memoizar_callback(cache_figuras, cache_compartida) # Semilla fija: el resultado es reproducible
+def update_sobol(n_clicks, beta_min, beta_max, gamma_min, gamma_max, sigma_min, sigma_max, N, I0, t_max, muestras):
+    if n_clicks == 0:
+        return crear_figura_sobol()
+    return figura_indices(beta_min, beta_max, gamma_min, gamma_max, sigma_min, sigma_max, N, I0, t_max, muestras)
+
+def figura_indices(beta_min, beta_max, gamma_min, gamma_max, sigma_min, sigma_max, N, I0, t_max, muestras,
+                   avance=None):
+    # avance(hecho, total): trozos de simulaciones terminados, para la barra de progreso
+
+    # --- A. Sanitizar inputs ---
+    try:
+        limites = [(float(beta_min), float(beta_max)),
+                   (float(gamma_min), float(gamma_max)),
+                   (float(sigma_min), float(sigma_max))]
+        N = float(N)
+        I0 = float(I0)
+        t_max = float(min(float(t_max), T_MAX_MAXIMO))
+        muestras = int(muestras)
+    except (ValueError, TypeError):
+        return crear_figura_sobol()
+
+    if any(not 0 < bajo < alto for bajo, alto in limites) or not 0 < I0 < N or t_max <= 0 \
+            or muestras not in [opcion['value'] for opcion in OPCIONES_MUESTRAS]:
+        return crear_figura_sobol(subtitulo='Revisa los rangos: 0 < mínimo < máximo, 0 < I₀ < N')
+
+    # --- B. Muestreo, simulación por trozos en paralelo e índices ---
+    resultado = sobol(limites, muestras, N, I0, t_max, semilla=0, avance=avance)
+
+    simulaciones = f"{resultado['evaluaciones']:,}".replace(',', '.')
+    if resultado['constante'][0]:
+        # Todos los índices valen 0: no hay un parámetro que "domine"
+        subtitulo = f"{simulaciones} simulaciones; el pico no varía en estos rangos (varianza ≈ 0)"
+    else:
+        dominante = SIMBOLOS[resultado['ST'][:, 0].argmax()]
+        subtitulo = f"{simulaciones} simulaciones; el pico depende sobre todo de {dominante}"
+    return crear_figura_sobol(resultado, subtitulo)
+
+# --- Muestras grandes en segundo plano ---
+# Proceso aparte (DiskcacheManager) con límites de CPU y memoria: la barra
+# avanza con cada trozo de simulaciones y "Cancelar" mata el proceso
+if gestor_fondo is not None:
+    @callback(
+        Output('graph-sobol', 'figure', allow_duplicate=True),
+        Input('store-trabajo-sobol', 'data'),
+        background=True,
+        manager=gestor_fondo,
+        progress=[Output('progreso-sobol', 'value'), Output('progreso-sobol', 'max')],
+        running=[
+            (Output('btn-sobol', 'disabled'), True, False),
+            (Output('trabajo-sobol', 'style'), {'display': 'block'}, {'display': 'none'}),
+        ],
+        cancel=[Input('btn-cancelar-sobol', 'n_clicks')],
+        prevent_initial_call=True
+    )
+    def update_sobol_fondo(set_progress, trabajo):
+        limitar_recursos()
+        if not trabajo:
+            raise PreventUpdate
+        fig = figura_indices(*trabajo['parametros'],
+                             avance=lambda hecho, total: set_progress((str(hecho), str(total))))
+        # Misma clave que el camino rápido: el próximo pedido igual sale de la caché
+        return update_sobol.guardar((trabajo['n'], *trabajo['parametros']), fig)
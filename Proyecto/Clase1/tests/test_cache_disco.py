@@ -0,0 +1,69 @@
+# Sin directorio de datos (HOME de solo lectura en un contenedor, p. ej.)
+# la app debe arrancar igual: la caché en disco queda desactivada, el modo
+# en vivo usa memoria y los trabajos pesados siguen por el camino normal.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from utils.cache_disco import CacheDisco
+
+# Un directorio "dentro" de /dev/null nunca se puede crear (ni siendo root)
+SIN_DISCO = '/dev/null/modelamiento'
+
+_ARRANCAR = """
+import warnings
+warnings.simplefilter('ignore', RuntimeWarning)
+import app
+from utils.cache_disco import cache_compartida
+from utils.en_vivo import solicitudes_en_vivo
+from utils.trabajos import gestor_fondo
+cache_compartida.guardar('clave', [1, 2])
+assert cache_compartida.obtener('clave') is None
+with solicitudes_en_vivo.turno('sir', 'c1', 1):
+    pass
+assert solicitudes_en_vivo.estadisticas()['atendidas'] == 1
+assert gestor_fondo is None
+print('ok')
+"""
+
+
+class PruebaSinDisco(unittest.TestCase):
+
+    def test_no_crea_nada_al_importar(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            entorno = dict(os.environ, XDG_CACHE_HOME=os.path.join(directorio, 'datos'))
+            codigo = "import utils.cache_disco, utils.en_vivo; import os, sys; print(os.listdir(sys.argv[1]))"
+            salida = subprocess.run([sys.executable, '-c', codigo, directorio], cwd=RAIZ, env=entorno,
+                                    capture_output=True, text=True, timeout=60, check=True)
+            self.assertEqual(salida.stdout.strip(), '[]')
+
+    def test_la_app_arranca_sin_directorio(self):
+        entorno = {k: v for k, v in os.environ.items()
+                   if k not in ('CACHE_DISCO_RUTA', 'EN_VIVO_RUTA', 'TRABAJO_RUTA')}
+        entorno.update(HOME=SIN_DISCO, XDG_CACHE_HOME=SIN_DISCO, CARGA_DIFERIDA='0')
+        salida = subprocess.run([sys.executable, '-c', _ARRANCAR], cwd=RAIZ, env=entorno,
+                                capture_output=True, text=True, timeout=120)
+        self.assertEqual(salida.returncode, 0, salida.stderr[-2000:])
+        self.assertEqual(salida.stdout.strip().splitlines()[-1], 'ok')
+
+    def test_cache_desactivada_avisa_una_vez(self):
+        cache = CacheDisco()
+        cache._ruta, cache._sin_disco = None, False
+        with mock.patch('utils.cache_disco._ruta_por_defecto', side_effect=PermissionError('ro')):
+            with self.assertWarns(RuntimeWarning):
+                cache.guardar('a', 1)
+            self.assertIsNone(cache.obtener('a'))
+        self.assertEqual(cache.estadisticas()['fallos'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
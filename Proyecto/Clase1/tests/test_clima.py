@@ -0,0 +1,175 @@
+# Pruebas del cliente de Open-Meteo (utils/clima.py) contra un servidor
+# HTTP local: caducidad de la caché, peticiones agrupadas, reintentos y
+# timeouts. No sale a internet.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+#                          o:  python -m unittest discover tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from utils.clima import ClienteClima
+
+HORA = 3600
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    # Responde como Open-Meteo; el comportamiento lo fija el servidor de la prueba
+
+    def do_GET(self):
+        servidor = self.server
+        with servidor.lock:
+            servidor.peticiones += 1
+            fallar = servidor.fallos > 0
+            servidor.fallos -= fallar
+        time.sleep(servidor.demora)
+
+        try:
+            self._responder(fallar)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # El cliente se cansó de esperar (prueba de timeout)
+
+    def _responder(self, fallar):
+        if fallar:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        consulta = parse_qs(urlparse(self.path).query)
+        cuerpo = json.dumps({
+            'latitude': float(consulta['latitude'][0]),
+            'longitude': float(consulta['longitude'][0]),
+            'utc_offset_seconds': -18000,
+            'hourly': {'time': ['2024-01-01T00:00', '2024-01-01T01:00'],
+                       'temperature_2m': [20.5, 21.0],
+                       'relative_humidity_2m': [80, None]},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class PruebaClienteClima(unittest.TestCase):
+
+    def setUp(self):
+        self.servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Manejador)
+        self.servidor.daemon_threads = True
+        self.servidor.lock = threading.Lock()
+        self.servidor.peticiones = 0
+        self.servidor.fallos = 0      # cuántas respuestas 503 antes de responder bien
+        self.servidor.demora = 0.0    # segundos antes de responder
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.servidor.server_address[1]}/v1/forecast'
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def cliente(self, **opciones):
+        return ClienteClima(self.url, **opciones)
+
+    # --- 1. Caché hasta la siguiente hora en punto ---
+
+    def test_caduca_en_la_hora_en_punto(self):
+        cliente = self.cliente()
+        with mock.patch('utils.clima.time') as reloj:
+            reloj.time.return_value = 10 * HORA + 100
+            cliente.pronostico(-12.05, -77.04)
+            reloj.time.return_value = 11 * HORA - 1
+            cliente.pronostico(-12.05, -77.04)
+            self.assertEqual(self.servidor.peticiones, 1)
+
+            reloj.time.return_value = 11 * HORA
+            cliente.pronostico(-12.05, -77.04)
+        self.assertEqual(self.servidor.peticiones, 2)
+        self.assertEqual(cliente.estadisticas()['aciertos'], 1)
+
+    def test_entrega_copias(self):
+        cliente = self.cliente()
+        primero = cliente.pronostico(-12.05, -77.04)
+        primero['hourly']['temperature_2m'][0] = -999
+        segundo = cliente.pronostico(-12.05, -77.04)
+        self.assertEqual(segundo['hourly']['temperature_2m'][0], 20.5)
+        self.assertIsNot(primero, segundo)
+
+    # --- 2. Peticiones simultáneas: una sola llamada ---
+
+    def test_agrupa_peticiones_simultaneas(self):
+        self.servidor.demora = 0.3
+        cliente = self.cliente()
+        hilos = 10
+        barrera = threading.Barrier(hilos)
+        resultados = [None] * hilos
+
+        def pedir(i):
+            barrera.wait()
+            resultados[i] = cliente.pronostico(-12.05, -77.04)
+
+        trabajadores = [threading.Thread(target=pedir, args=(i,)) for i in range(hilos)]
+        for hilo in trabajadores:
+            hilo.start()
+        for hilo in trabajadores:
+            hilo.join(10)
+
+        self.assertEqual(self.servidor.peticiones, 1)
+        estadisticas = cliente.estadisticas()
+        self.assertEqual(estadisticas['llamadas'], 1)
+        self.assertEqual(estadisticas['agrupadas'], hilos - 1)
+        self.assertTrue(all(r == resultados[0] for r in resultados))
+        # Cada hilo con su propio objeto
+        self.assertEqual(len({id(r) for r in resultados}), hilos)
+
+    # --- 3. Reintentos y timeouts ---
+
+    def test_reintenta_errores_del_servidor(self):
+        self.servidor.fallos = 2
+        datos = self.cliente(reintentos=2).pronostico(-12.05, -77.04)
+        self.assertEqual(datos['latitude'], -12.05)
+        self.assertEqual(self.servidor.peticiones, 3)
+
+    def test_los_errores_no_se_guardan(self):
+        self.servidor.fallos = 2
+        cliente = self.cliente(reintentos=1)
+        with self.assertRaises(requests.RequestException):
+            cliente.pronostico(-12.05, -77.04)
+        self.assertEqual(self.servidor.peticiones, 2)
+
+        cliente.pronostico(-12.05, -77.04)
+        self.assertEqual(self.servidor.peticiones, 3)
+        self.assertEqual(cliente.estadisticas()['entradas'], 1)
+
+    def test_timeout_de_lectura(self):
+        self.servidor.demora = 2.0
+        cliente = self.cliente(timeout=(1.0, 0.2), reintentos=1)
+        inicio = time.perf_counter()
+        with self.assertRaises(requests.RequestException):
+            cliente.pronostico(-12.05, -77.04)
+        # Dos intentos de 0.2 s (más el backoff), no los 2 s del servidor
+        self.assertLess(time.perf_counter() - inicio, 1.5)
+        self.assertEqual(self.servidor.peticiones, 2)
+
+    def test_lote_en_una_peticion(self):
+        datos = self.cliente().pronostico_lote([(-12.05, -77.04)])
+        self.assertEqual(len(datos), 1)
+        self.assertEqual(self.servidor.peticiones, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# Pruebas del modo en vivo (utils/en_vivo.py): la última secuencia de
+# cada cliente se comparte entre procesos (dos instancias sobre el mismo
+# archivo hacen de dos workers) y va separada por página.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import tempfile
+import unittest
+
+from dash.exceptions import PreventUpdate
+
+from utils.en_vivo import SolicitudesEnVivo
+
+
+def _registrar_en_otro_proceso(ruta, pagina, cliente, secuencia):
+    SolicitudesEnVivo(ruta=ruta)._registrar(pagina, cliente, secuencia)
+
+
+class PruebaSolicitudesEnVivo(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'en_vivo.sqlite')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def test_pedido_nuevo_en_otro_worker_descarta_el_viejo(self):
+        worker_a = SolicitudesEnVivo(ruta=self.ruta)
+        with self.assertRaises(PreventUpdate):
+            with worker_a.turno('sir', 'c1', 1):
+                proceso = multiprocessing.get_context('spawn').Process(
+                    target=_registrar_en_otro_proceso, args=(self.ruta, 'sir', 'c1', 2))
+                proceso.start()
+                proceso.join(30)
+        self.assertEqual(worker_a.estadisticas()['descartadas'], 1)
+
+        with worker_a.turno('sir', 'c1', 2):
+            pass
+        self.assertEqual(worker_a.estadisticas()['atendidas'], 1)
+
+    def test_paginas_independientes(self):
+        solicitudes = SolicitudesEnVivo(ruta=self.ruta)
+        with solicitudes.turno('sir', 'c1', 4):
+            # El mismo cliente pide SEIR con una secuencia mayor (contador compartido)
+            with solicitudes.turno('seir', 'c1', 5):
+                pass
+        self.assertEqual(solicitudes.estadisticas()['atendidas'], 2)
+        self.assertEqual(solicitudes.estadisticas()['clientes'], 2)
+
+    def test_pedido_viejo_no_retrocede_la_secuencia(self):
+        solicitudes = SolicitudesEnVivo(ruta=self.ruta)
+        solicitudes._registrar('sir', 'c1', 7)
+        with self.assertRaises(PreventUpdate):
+            with solicitudes.turno('sir', 'c1', 3):
+                pass
+        self.assertTrue(solicitudes.vigente('sir', 'c1', 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+# Pruebas del motor estocástico (utils/estocastico.py): poblaciones
+# grandes sin desbordar los enteros y estados iniciales inválidos.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+import numpy as np
+
+from utils.estocastico import MAX_POBLACION, ensamble
+
+T = np.linspace(0, 100, 11)
+
+
+class PruebaEnsamble(unittest.TestCase):
+
+    def test_poblacion_mayor_que_int32(self):
+        N = 3_000_000_000
+        trayectorias = ensamble('sir', [N - 1, 1, 0], T, (0.3, 0.1, N), 10, 'tau', semilla=1, procesos=1)
+        self.assertEqual(trayectorias.dtype, np.int64)
+        self.assertTrue((trayectorias >= 0).all())
+        np.testing.assert_array_equal(trayectorias.sum(axis=2), N)
+
+    def test_rechaza_poblaciones_fuera_de_rango(self):
+        for y0 in ([MAX_POBLACION, 1, 0], [10 ** 20, 1, 0], [-5, 1, 0]):
+            with self.assertRaises(ValueError):
+                ensamble('sir', y0, T, (0.3, 0.1, 1.0), 10, 'tau', semilla=1, procesos=1)
+
+    def test_gillespie_conserva_la_poblacion(self):
+        trayectorias = ensamble('sir', [99, 1, 0], T, (0.3, 0.1, 100), 50, 'gillespie', semilla=3, procesos=1)
+        self.assertEqual(trayectorias.dtype, np.int64)
+        np.testing.assert_array_equal(trayectorias.sum(axis=2), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
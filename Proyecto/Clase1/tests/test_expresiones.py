@@ -0,0 +1,97 @@
+# Pruebas del compilador de expresiones del usuario (utils/expresiones.py):
+# la lista blanca rechaza todo lo que no sea aritmética, x, y y funciones
+# de NumPy, y lo compilado da lo mismo que escribirlo con NumPy.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+
+import numpy as np
+
+from utils.expresiones import LONGITUD_MAXIMA, compilar_expresion, compilar_sistema
+
+X, Y = np.meshgrid(np.linspace(-3, 3, 41), np.linspace(-2, 2, 31))
+
+
+class PruebaRechazos(unittest.TestCase):
+
+    def assertRechaza(self, texto):
+        with self.assertRaises(ValueError, msg=texto):
+            compilar_sistema(texto)
+
+    def test_import_y_builtins(self):
+        for texto in ("__import__('os').system('echo hola')", "open('/etc/passwd')", "eval('1')",
+                      "exec('x = 1')", "globals()", "__builtins__"):
+            self.assertRechaza(texto)
+
+    def test_atributos(self):
+        for texto in ('x.__class__', '().__class__.__bases__', 'x.T', 'np.linalg.norm(x)',
+                      'np.__dict__', 'numpy.sin.__call__(x)', 'sin(x).real'):
+            self.assertRechaza(texto)
+
+    def test_subindices_y_colecciones(self):
+        for texto in ('x[0]', 'x[::2]', '[x, y]', '(x, y)', '{x: y}', '{x}', "'texto'", 'b"x"'):
+            self.assertRechaza(texto)
+
+    def test_lambdas_y_comprensiones(self):
+        for texto in ('lambda: x', '(lambda x: x)(y)', '[x for x in y]', '(x for x in y)',
+                      '{x for x in y}', '{x: 1 for x in y}', 'sum(x for x in y)'):
+            self.assertRechaza(texto)
+
+    def test_otras_construcciones(self):
+        for texto in ('x if y else 1', 'x < y', 'x and y', 'x @ y', 'x ^ y', '(z := x)', 'z',
+                      'sin(x, out=y)', 'sin(*x)', 'max(x, y)', 'x = 1', '1 +', ''):
+            self.assertRechaza(texto)
+        self.assertRechaza('x + ' * LONGITUD_MAXIMA + 'x')
+
+    def test_exponentes_enormes(self):
+        inicio = time.perf_counter()
+        for texto in ('9**9**9', '10**400', '2.0**1e6', 'x + 9**9**9**9', '(-8)**(1/3)', '1/0', 'x + 2 % 0'):
+            self.assertRechaza(texto)
+        # Se rechazan al analizar, sin calcular el número
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+
+
+class PruebaResultados(unittest.TestCase):
+
+    CASOS = (
+        ('sin(x) * cos(y)', lambda x, y: np.sin(x) * np.cos(y)),
+        ('np.exp(-x**2 - y**2)', lambda x, y: np.exp(-x ** 2 - y ** 2)),
+        ('x**2 - y**2 + 2*x*y', lambda x, y: x ** 2 - y ** 2 + 2 * x * y),
+        ('numpy.arctan2(y, x) + pi', lambda x, y: np.arctan2(y, x) + np.pi),
+        ('maximum(x, y) % 3 - x // 2', lambda x, y: np.maximum(x, y) % 3 - x // 2),
+        ('-2**2 + x', lambda x, y: -4 + x),
+        ('(-2)**2 * y - -x', lambda x, y: 4 * y + x),
+        ('e**(x/3) - log(1 + hypot(x, y))', lambda x, y: np.e ** (x / 3) - np.log(1 + np.hypot(x, y))),
+        ('hypot(x, y) / (1 + hypot(x, y)) + sqrt(abs(x*y))',
+         lambda x, y: np.hypot(x, y) / (1 + np.hypot(x, y)) + np.sqrt(np.abs(x * y))),
+        ('power(2, y) * sign(x) + floor(x) - ceil(y)',
+         lambda x, y: np.power(2, y) * np.sign(x) + np.floor(x) - np.ceil(y)),
+    )
+
+    def test_coincide_con_numpy(self):
+        for texto, referencia in self.CASOS:
+            esperado = referencia(X, Y)
+            np.testing.assert_allclose(compilar_expresion(texto)(X, Y), esperado, rtol=1e-14, err_msg=texto)
+            u, = compilar_sistema(texto, cse=False)(X, Y)
+            np.testing.assert_allclose(u, esperado, rtol=1e-14, err_msg=texto)
+
+    def test_sistema_con_subexpresiones_comunes(self):
+        u, v = compilar_sistema('x*y - sin(x*y)', 'cos(x*y) + x*y')(X, Y)
+        np.testing.assert_allclose(u, X * Y - np.sin(X * Y), rtol=1e-14)
+        np.testing.assert_allclose(v, np.cos(X * Y) + X * Y, rtol=1e-14)
+
+    def test_constante_da_un_arreglo_del_mallado(self):
+        u, v = compilar_sistema('1', '2 * pi')(X, Y)
+        self.assertEqual(u.shape, X.shape)
+        np.testing.assert_array_equal(u, 1.0)
+        np.testing.assert_allclose(v, 2 * np.pi)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# La curva logística del navegador (assets/logistica.js) contra la de
+# referencia en Python (utils/funciones.grafica_logistica), sobre una
+# malla de parámetros. El JavaScript se ejecuta con node; sin node la
+# prueba se salta.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+import base64
+import itertools
+import json
+import shutil
+import subprocess
+import unittest
+
+import numpy as np
+
+from utils.funciones import grafica_logistica
+
+NODE = shutil.which('node')
+SCRIPT = os.path.join(RAIZ, 'assets', 'logistica.js')
+
+# assets/logistica.js espera un `window` de navegador con dash_clientside
+_EJECUTAR = """
+const fs = require('fs');
+global.window = {dash_clientside: {no_update: '__no_update__'}};
+eval(fs.readFileSync(process.argv[1], 'utf8'));
+const m = window.dash_clientside.modelamiento;
+const casos = JSON.parse(fs.readFileSync(0, 'utf8'));
+const figura = {data: [{name: 'Población'}, {name: 'Capacidad de Carga (K)'}], layout: {}};
+process.stdout.write(JSON.stringify(casos.map(a => m.logistica(1, ...a, figura))));
+"""
+
+P0 = (1, 200, 749)
+R = (-0.05, 0.0, 0.04, 1.5)
+K = (500, 750, 1e6)
+T_MAX = (0.5, 100, 1000)
+
+
+def arreglo(valor):
+    # Plotly guarda los arreglos de NumPy como {'dtype': 'f8', 'bdata': base64}
+    if isinstance(valor, dict):
+        return np.frombuffer(base64.b64decode(valor['bdata']), dtype=valor['dtype'])
+    return np.asarray(valor, dtype=float)
+
+
+def ejecutar_js(casos):
+    salida = subprocess.run([NODE, '-e', _EJECUTAR, SCRIPT], input=json.dumps(casos),
+                            capture_output=True, text=True, timeout=30, check=True)
+    return json.loads(salida.stdout)
+
+
+@unittest.skipIf(NODE is None, "node no está instalado")
+class PruebaLogisticaNavegador(unittest.TestCase):
+
+    def test_misma_curva_que_python(self):
+        casos = list(itertools.product(P0, R, K, T_MAX))
+        figuras_js = ejecutar_js(casos)
+        self.assertEqual(len(figuras_js), len(casos))
+
+        for parametros, fig_js in zip(casos, figuras_js):
+            # Sin la caché: se compara el cálculo, no lo guardado en disco
+            fig_py = grafica_logistica.__wrapped__(*parametros)
+            for traza_js, traza_py in zip(fig_js['data'], fig_py['data']):
+                for eje in ('x', 'y'):
+                    np.testing.assert_allclose(traza_js[eje], arreglo(traza_py[eje]), rtol=1e-12, atol=0,
+                                               err_msg=str(parametros))
+            # El último tiempo es exactamente t_max, como en np.linspace
+            self.assertEqual(fig_js['data'][0]['x'][-1], parametros[3])
+
+    def test_entradas_invalidas_no_actualizan(self):
+        resultados = ejecutar_js([[None, 0.04, 750, 100], [200, 0.04, 750, None]])
+        self.assertEqual(resultados, ['__no_update__', '__no_update__'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# Pruebas del SEIR metapoblacional (utils/metapoblacion.py): lectura y
+# validación de la matriz de contactos del usuario, y día del pico por
+# distrito sin depender de la malla de tiempos.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import base64
+import io
+import unittest
+
+import numpy as np
+from scipy import sparse
+
+from utils.metapoblacion import estado_inicial, leer_matriz, malla_distritos, seir_meta
+from utils.modelos import integrar
+from utils.trabajos import integrar_por_tramos
+
+
+def subida(datos, tipo='text/csv'):
+    # Lo que entrega dcc.Upload
+    return f'data:{tipo};base64,' + base64.b64encode(datos).decode()
+
+
+class PruebaLeerMatriz(unittest.TestCase):
+
+    def test_npz(self):
+        C = malla_distritos(4, 0.2)
+        archivo = io.BytesIO()
+        sparse.save_npz(archivo, C)
+        leida = leer_matriz(subida(archivo.getvalue(), 'application/octet-stream'), 16, 'contactos.npz')
+        self.assertEqual(leida.shape, (16, 16))
+        np.testing.assert_array_equal(leida.toarray(), C.toarray())
+
+    def test_csv_de_tripletas(self):
+        texto = b'fila;columna;valor\n0;0;0.9\n0;1;0.1\n1;1;1\n1;0;0.05\n1;0;0.05\n'
+        leida = leer_matriz(subida(texto), 4, 'contactos.csv')
+        esperada = np.zeros((4, 4))
+        esperada[0, 0], esperada[0, 1], esperada[1, 1], esperada[1, 0] = 0.9, 0.1, 1.0, 0.1
+        np.testing.assert_allclose(leida.toarray(), esperada)
+
+    def test_rechaza_forma_y_signo(self):
+        archivo = io.BytesIO()
+        sparse.save_npz(archivo, sparse.eye(9, format='csr'))
+        npz = subida(archivo.getvalue(), 'application/octet-stream')
+        malos = [
+            (npz, 'grande.npz'),                                  # 9 x 9 con 16 distritos
+            (subida(b'0,0,1\n1,1,-0.5\n'), 'negativo.csv'),
+            (subida(b'0,0,1\n1,1,nan\n'), 'nan.csv'),
+            (subida(b'0,0,1\n16,0,1\n'), 'fuera.csv'),            # índice 16 con 16 distritos
+            (subida(b'0,0.5,1\n'), 'decimal.csv'),
+            (subida(b'0,1\n1,0\n'), 'dos_columnas.csv'),
+            (subida(b'PK no es un zip'), 'roto.npz'),
+        ]
+        for contenido, nombre in malos:
+            with self.assertRaises(ValueError, msg=nombre):
+                leer_matriz(contenido, 16, nombre)
+
+
+class PruebaDiaDelPico(unittest.TestCase):
+
+    def test_no_depende_de_la_malla(self):
+        C = malla_distritos(6, 0.05)
+        N = np.full(36, 1000.0)
+        y0 = estado_inicial(N, 1, 21)
+        argumentos = (0.5, 0.1, 0.2, C, N)
+
+        t = np.linspace(0, 500, 50001)
+        y = integrar(seir_meta, y0, t, args=argumentos, rtol=1e-8, atol=1e-8)
+        referencia = t[y[:, :, 2].argmax(axis=0)]
+
+        # 201 puntos hasta 10^5 días dejaban todo el brote antes del primer punto
+        for integrador in (integrar, integrar_por_tramos):
+            info = {}
+            integrador(seir_meta, y0, np.linspace(0, 1e5, 201), args=argumentos, info=info, maximo=2)
+            np.testing.assert_allclose(info['t_maximo'], referencia, atol=1.0, err_msg=integrador.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
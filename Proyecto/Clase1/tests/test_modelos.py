@@ -0,0 +1,119 @@
+# Pruebas de utils/modelos.py: el pico (del barrido SIR y el que sigue el
+# integrador con maximo=) no depende de cuán larga sea la malla de tiempos,
+# y las variantes SEIRS, SIRD y SIRV coinciden con sus ecuaciones a mano.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+import numpy as np
+
+from utils.modelos import SEIRS, SIRD, SIRV, barrido_sir, integrar, seir, sir
+
+
+def pico_denso(N, beta, gamma, I0, t_max, puntos=20001):
+    t = np.linspace(0, t_max, puntos)
+    y = integrar(sir, [N - I0, I0, 0], t, args=(beta, gamma, N), rtol=1e-8, atol=1e-8)
+    return y[:, 1].max()
+
+
+class PruebaBarridoSIR(unittest.TestCase):
+
+    def test_pico_en_horizontes_largos(self):
+        referencia = pico_denso(1000, 0.3, 0.1, 1, 200)
+        self.assertAlmostEqual(referencia, 301, delta=1)
+        for t_max in (200, 1e4, 1e6):
+            pico, _ = barrido_sir(1000, [0.3], [0.1], 1, t_max)
+            self.assertAlmostEqual(pico[0, 0], referencia, delta=0.5, msg=t_max)
+
+    def test_pico_antes_de_alcanzarse_y_sin_brote(self):
+        betas, gammas = [0.05, 0.3, 1.0], [0.02, 0.1, 0.5]
+        for t_max in (15, 60):
+            pico, _ = barrido_sir(1000, betas, gammas, 5, t_max)
+            for i, gamma in enumerate(gammas):
+                for j, beta in enumerate(betas):
+                    self.assertAlmostEqual(pico[i, j], pico_denso(1000, beta, gamma, 5, t_max),
+                                           delta=0.5, msg=(beta, gamma, t_max))
+
+
+class PruebaMaximoIntegrador(unittest.TestCase):
+
+    def test_pico_seir_sin_malla(self):
+        beta, gamma, sigma = np.array([0.3, 0.9, 0.15]), np.array([0.1, 0.2, 0.1]), np.array([0.2, 1.0, 0.5])
+        y0 = np.tile([999.0, 0.0, 1.0, 0.0], (3, 1))
+        t = np.linspace(0, 600, 60001)
+        y = integrar(seir, y0, t, args=(beta, gamma, sigma, 1000), rtol=1e-8, atol=1e-8)
+        pico, dia = y[:, :, 2].max(axis=0), t[y[:, :, 2].argmax(axis=0)]
+
+        for metodo, t_max in (('auto', 600), ('auto', 1e6), ('BDF', 1e6), ('rk4', 600)):
+            info = {}
+            integrar(seir, y0, np.array([0.0, t_max]), args=(beta, gamma, sigma, 1000),
+                     metodo=metodo, paso=0.1, info=info, maximo=2)
+            np.testing.assert_allclose(info['maximo'], pico, rtol=5e-3, err_msg=metodo)
+            np.testing.assert_allclose(info['t_maximo'], dia, atol=1.0, err_msg=metodo)
+
+    def test_sin_brote_el_maximo_es_el_inicial(self):
+        info = {}
+        integrar(sir, [999.0, 1.0, 0.0], np.array([0.0, 1e5]), args=(0.05, 0.1, 1000), info=info, maximo=1)
+        self.assertEqual(info['maximo'], 1.0)
+        self.assertEqual(info['t_maximo'], 0.0)
+
+
+# Lados derechos escritos a mano, en el orden de compartimentos y parámetros de cada modelo
+def seirs_a_mano(y, beta, gamma, sigma, xi, N):
+    S, E, I, R = y
+    return np.array([-beta * S * I / N + xi * R, beta * S * I / N - sigma * E, sigma * E - gamma * I,
+                     gamma * I - xi * R])
+
+
+def sird_a_mano(y, beta, gamma, mu, N):
+    S, I, R, D = y
+    return np.array([-beta * S * I / N, beta * S * I / N - gamma * I - mu * I, gamma * I, mu * I])
+
+
+def sirv_a_mano(y, beta, gamma, nu, N):
+    S, I, R, V = y
+    return np.array([-beta * S * I / N - nu * S, beta * S * I / N - gamma * I, gamma * I, nu * S])
+
+
+class PruebaVariantes(unittest.TestCase):
+
+    CASOS = ((SEIRS, seirs_a_mano, (0.5, 0.1, 0.2, 0.01, 1000.0)),
+             (SIRD, sird_a_mano, (0.4, 0.1, 0.02, 1000.0)),
+             (SIRV, sirv_a_mano, (0.4, 0.1, 0.03, 1000.0)))
+
+    def test_rhs_y_jacobiano(self):
+        rng = np.random.default_rng(7)
+        for modelo, a_mano, args in self.CASOS:
+            for y in rng.uniform(0, 500, (5, 4)):
+                dy = np.empty(4)
+                modelo.rhs(y, dy, *args)
+                np.testing.assert_allclose(dy, a_mano(y, *args), rtol=1e-12, err_msg=modelo.nombre)
+
+                # Jacobiano contra diferencias centradas del RHS a mano
+                h = 1e-4
+                numerico = np.array([(a_mano(y + h * e, *args) - a_mano(y - h * e, *args)) / (2 * h)
+                                     for e in np.eye(4)]).T
+                np.testing.assert_allclose(modelo.jacobiano(y, *args), numerico, rtol=1e-6, atol=1e-9,
+                                           err_msg=modelo.nombre)
+
+    def test_trayectoria_y_poblacion(self):
+        from scipy.integrate import solve_ivp
+
+        t = np.linspace(0, 200, 201)
+        for modelo, a_mano, args in self.CASOS:
+            y0 = [990.0, 0.0, 10.0, 0.0] if modelo is SEIRS else [990.0, 10.0, 0.0, 0.0]
+            y = integrar(modelo.rhs, y0, t, args=args, rtol=1e-8, atol=1e-8)
+            referencia = solve_ivp(lambda _, y: a_mano(y, *args), (0, 200), y0, t_eval=t,
+                                   rtol=1e-10, atol=1e-10).y.T
+            np.testing.assert_allclose(y, referencia, rtol=1e-5, atol=1e-4, err_msg=modelo.nombre)
+            # Los flujos solo mueven personas entre compartimentos
+            np.testing.assert_allclose(y.sum(axis=1), 1000.0, rtol=1e-9, err_msg=modelo.nombre)
+
+
+if __name__ == '__main__':
+    unittest.main()
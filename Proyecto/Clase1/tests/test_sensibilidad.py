@@ -0,0 +1,44 @@
+# Pruebas del análisis de Sobol (utils/sensibilidad.py): las salidas no
+# dependen del horizonte una vez terminado el brote, y una salida sin
+# varianza no reparte índices.
+#
+# Uso (desde Proyecto/Clase1):  python -m pytest tests
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+
+import numpy as np
+
+from utils.sensibilidad import salidas_seir, sobol
+
+LIMITES = [(0.1, 1.0), (0.05, 0.5), (0.1, 1.0)]
+
+
+class PruebaSobol(unittest.TestCase):
+
+    def test_salidas_independientes_del_horizonte(self):
+        muestras = np.array([[0.3, 0.1, 0.2], [0.9, 0.2, 1.0], [0.5, 0.05, 0.1]])
+        corto = salidas_seir(muestras, 1000, 1, 1500)
+        for t_max in (1e4, 1e6):
+            np.testing.assert_allclose(salidas_seir(muestras, 1000, 1, t_max), corto, rtol=2e-3, atol=0.5)
+
+    def test_horizonte_largo_conserva_los_indices(self):
+        corto = sobol(LIMITES, 256, t_max=1500, semilla=0, procesos=1)
+        largo = sobol(LIMITES, 256, t_max=1e6, semilla=0, procesos=1)
+        self.assertFalse(largo['constante'].any())
+        self.assertGreater(largo['ST'][:, 0].max(), 0.3)
+        np.testing.assert_allclose(largo['ST'], corto['ST'], atol=0.05)
+
+    def test_salida_constante(self):
+        # R0 < 1 en todo el rango: el pico es siempre I0, el día 0
+        resultado = sobol([(0.01, 0.02), (0.3, 0.5), (0.1, 1.0)], 128, semilla=0, procesos=1)
+        self.assertEqual(list(resultado['constante']), [True, True, False])
+        self.assertTrue((resultado['S1'][:, :2] == 0).all())
+        self.assertTrue((resultado['ST'][:, :2] == 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import functools
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from utils.figuras import es_figura
+
+# =====================================================================
+# Caché LRU acotada para callbacks deterministas
+#
+# Los callbacks de los modelos son funciones puras de sus entradas: con
+# los mismos parámetros producen la misma figura. Guardamos la figura ya
+# serializada (JSON) para que una petición repetida se salte tanto la
+# integración como la construcción de la figura de Plotly.
+# =====================================================================
+
+
+class CacheLRU:
+    """Diccionario acotado que expulsa la entrada usada hace más tiempo."""
+
+    def __init__(self, tamano_maximo=256):
+        self.tamano_maximo = tamano_maximo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave, defecto=None):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+            return defecto
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamano_maximo:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = self.expulsiones = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'expulsiones': self.expulsiones,
+                'entradas': len(self._datos),
+                'tamano_maximo': self.tamano_maximo,
+            }
+
+
+# Caché compartida por todas las páginas (tamaño configurable por entorno)
+cache_figuras = CacheLRU(int(os.environ.get('CACHE_FIGURAS_TAMANO', 256)))
+
+
+# --- Normalización de las entradas ---
+
+def normalizar(valor):
+    # 1, 1.0 y "1" (dcc.Input puede mandar cualquiera) deben dar la misma clave
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float)):
+        return round(float(valor), 12)
+    if isinstance(valor, str):
+        try:
+            return round(float(valor), 12)
+        except ValueError:
+            return valor
+    if isinstance(valor, (list, tuple)):
+        return tuple(normalizar(v) for v in valor)
+    return repr(valor)
+
+
+# --- Serialización de los resultados ---
+
+def _serializar(resultado):
+    if isinstance(resultado, tuple):
+        return tuple(_serializar(r) for r in resultado)
+    if isinstance(resultado, go.Figure):
+        return ('figura', resultado.to_json())
+    if es_figura(resultado):
+        # Figuras de utils/figuras.py (dicts): mismo JSON compacto, sin validar
+        return ('figura', pio.to_json(resultado, validate=False))
+    return ('valor', resultado)
+
+
+def _deserializar(guardado):
+    # Desde la caché en disco (JSON) las tuplas vuelven como listas
+    if guardado and isinstance(guardado[0], (tuple, list)):
+        return tuple(_deserializar(g) for g in guardado)
+    tipo, contenido = guardado
+    return json.loads(contenido) if tipo == 'figura' else contenido
+
+
+def _buscar(caches, clave):
+    # Buscamos nivel por nivel; un acierto en un nivel lento (disco) se
+    # copia a los niveles rápidos que lo preceden (memoria).
+    for i, cache in enumerate(caches):
+        guardado = cache.obtener(clave)
+        if guardado is not None:
+            for anterior in caches[:i]:
+                anterior.guardar(clave, guardado)
+            return guardado
+    return None
+
+
+def _memoizar(funcion, caches, clave_de):
+    nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+
+    def buscar(*args):
+        # El resultado guardado para estos argumentos, o None (sin calcular)
+        guardado = _buscar(caches, (nombre,) + clave_de(args))
+        return None if guardado is None else _deserializar(guardado)
+
+    def guardar(args, resultado):
+        # Para resultados calculados por otro camino (p. ej. un trabajo en
+        # segundo plano): quedan bajo la misma clave que los de la función
+        guardado = _serializar(resultado)
+        for cache in caches:
+            cache.guardar((nombre,) + clave_de(args), guardado)
+        # Mismo tipo que en un acierto (dict de la figura, no go.Figure)
+        return _deserializar(guardado)
+
+    @functools.wraps(funcion)
+    def envoltura(*args):
+        resultado = buscar(*args)
+        if resultado is not None:
+            return resultado
+        return guardar(args, funcion(*args))
+
+    envoltura.caches = caches
+    envoltura.buscar = buscar
+    envoltura.guardar = guardar
+    return envoltura
+
+
+def memoizar(*caches):
+    """Decorador para funciones puras: todos los argumentos forman la clave.
+
+    Se pueden encadenar varias cachés (p. ej. memoria y luego disco).
+    """
+    caches = caches or (cache_figuras,)
+    return lambda funcion: _memoizar(funcion, caches, normalizar)
+
+
+def memoizar_callback(*caches):
+    """Decorador para callbacks de botón: f(n_clicks, *parametros).
+
+    Solo importa si n_clicks es 0 o no; el resto de argumentos se
+    normaliza para formar la clave. Las figuras se guardan como JSON.
+    """
+    caches = caches or (cache_figuras,)
+
+    def clave_de(args):
+        n_clicks, parametros = args[0], args[1:]
+        return (bool(n_clicks),) + normalizar(parametros)
+
+    return lambda funcion: _memoizar(funcion, caches, clave_de)
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import sqlite3
+import stat
+import threading
+import time
+import warnings
+
+# =====================================================================
+# Caché en disco compartida entre workers de gunicorn
+#
+# La CacheLRU de utils/cache.py vive dentro de cada proceso: con varios
+# workers se duplica y se pierde en cada reinicio. Esta versión guarda
+# los resultados en un archivo SQLite (modo WAL, lecturas concurrentes)
+# para que lo que calcula un worker lo sirvan también los demás.
+# Expone la misma interfaz (obtener / guardar / estadisticas).
+#
+# Los valores se guardan como JSON (nunca pickle): leer el archivo no
+# puede ejecutar código aunque alguien lo haya modificado. Por defecto
+# vive en un directorio propio de la aplicación con permisos 0700, que
+# se crea al primer uso (no al importar): si no se puede crear (HOME de
+# solo lectura, p. ej.), la caché en disco queda desactivada y solo se
+# usa la de memoria de cada worker.
+# =====================================================================
+
+
+def directorio_privado(ruta=None):
+    """Directorio de datos de la aplicación (0700, del usuario actual).
+
+    Por defecto $XDG_CACHE_HOME/modelamiento (o ~/.cache/modelamiento).
+    Lanza PermissionError si ya existe y es de otro usuario o lo pueden
+    escribir otros.
+    """
+    if ruta is None:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        ruta = os.path.join(base, 'modelamiento')
+    os.makedirs(ruta, mode=0o700, exist_ok=True)
+
+    info = os.lstat(ruta)
+    propio = not hasattr(os, 'getuid') or info.st_uid == os.getuid()
+    if not stat.S_ISDIR(info.st_mode) or not propio or info.st_mode & 0o077:
+        raise PermissionError(f"{ruta} debe ser un directorio del usuario actual con permisos 0700")
+    return ruta
+
+
+def _ruta_por_defecto():
+    return os.path.join(directorio_privado(), 'cache.sqlite')
+
+
+def avisar_sin_disco(que, error):
+    warnings.warn(f"{que}: no se pudo usar el directorio de datos ({error}); sigue sin disco.",
+                  RuntimeWarning, stacklevel=3)
+
+
+class CacheDisco:
+    """Caché SQLite con caducidad (TTL) y tamaño máximo en bytes.
+
+    Una entrada más grande que tamano_entrada (por defecto 1/8 del total)
+    no se guarda: desalojaría casi todo lo demás.
+    """
+
+    def __init__(self, ruta=None, ttl=3600, tamano_maximo=64 * 1024 * 1024, tamano_entrada=None):
+        self._ruta = ruta
+        self._sin_disco = False
+        self.ttl = ttl
+        self.tamano_maximo = tamano_maximo
+        self.tamano_entrada = tamano_entrada or tamano_maximo // 8
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self._local = threading.local()
+
+    @property
+    def ruta(self):
+        # Se resuelve al primer uso; None si no hay directorio donde guardar
+        if self._ruta is None and not self._sin_disco:
+            try:
+                self._ruta = _ruta_por_defecto()
+            except OSError as error:
+                self._sin_disco = True
+                avisar_sin_disco('Caché en disco', error)
+        return self._ruta
+
+    # --- Conexión: una por hilo y por proceso (gunicorn hace fork) ---
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or self._local.pid != os.getpid():
+            if self.ruta is None:
+                # Sin disco: cada operación falla como un error de SQLite y se trata como fallo
+                raise sqlite3.OperationalError("caché en disco desactivada")
+            conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS entradas ('
+                ' clave TEXT PRIMARY KEY, valor BLOB, tamano INTEGER,'
+                ' creado REAL, usado REAL)'
+            )
+            self._local.conexion = conexion
+            self._local.pid = os.getpid()
+        return conexion
+
+    @staticmethod
+    def _clave(clave):
+        # Las claves ya vienen normalizadas: su repr es estable entre procesos
+        return hashlib.sha256(repr(clave).encode('utf-8')).hexdigest()
+
+    def obtener(self, clave, defecto=None):
+        clave = self._clave(clave)
+        ahora = time.time()
+        try:
+            conexion = self._conexion()
+            fila = conexion.execute(
+                'SELECT valor, creado FROM entradas WHERE clave = ?', (clave,)
+            ).fetchone()
+            if fila is None or ahora - fila[1] > self.ttl:
+                self.fallos += 1
+                return defecto
+            conexion.execute('UPDATE entradas SET usado = ? WHERE clave = ?', (ahora, clave))
+        except sqlite3.Error:
+            # Si el disco falla, el callback simplemente recalcula
+            self.fallos += 1
+            return defecto
+
+        try:
+            valor = json.loads(fila[0])
+        except (TypeError, ValueError):
+            self.fallos += 1
+            return defecto
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        """Guarda `valor` si se puede escribir como JSON (las tuplas vuelven como listas)."""
+        clave = self._clave(clave)
+        try:
+            datos = json.dumps(valor, separators=(',', ':'), allow_nan=False)
+        except (TypeError, ValueError):
+            return  # No es JSON (arreglos, componentes...): se queda solo en memoria
+        tamano = len(datos.encode('utf-8'))
+        if tamano > self.tamano_entrada:
+            return
+        ahora = time.time()
+        try:
+            conexion = self._conexion()
+            conexion.execute(
+                'INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)',
+                (clave, datos, tamano, ahora, ahora)
+            )
+            self._expulsar(conexion, ahora)
+        except sqlite3.Error:
+            pass
+
+    def _expulsar(self, conexion, ahora):
+        # A. Entradas caducadas
+        borradas = conexion.execute(
+            'DELETE FROM entradas WHERE creado < ?', (ahora - self.ttl,)
+        ).rowcount
+
+        # B. Si seguimos por encima del límite, las menos usadas recientemente
+        total = conexion.execute('SELECT COALESCE(SUM(tamano), 0) FROM entradas').fetchone()[0]
+        if total > self.tamano_maximo:
+            sobrante = total - self.tamano_maximo
+            claves = []
+            for clave, tamano in conexion.execute('SELECT clave, tamano FROM entradas ORDER BY usado'):
+                if sobrante <= 0:
+                    break
+                claves.append((clave,))
+                sobrante -= tamano
+            conexion.executemany('DELETE FROM entradas WHERE clave = ?', claves)
+            borradas += len(claves)
+
+        self.expulsiones += max(borradas, 0)
+
+    def limpiar(self):
+        try:
+            self._conexion().execute('DELETE FROM entradas')
+        except sqlite3.Error:
+            pass
+        self.aciertos = self.fallos = self.expulsiones = 0
+
+    def estadisticas(self):
+        try:
+            entradas, total = self._conexion().execute(
+                'SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas'
+            ).fetchone()
+        except sqlite3.Error:
+            entradas, total = None, None
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'expulsiones': self.expulsiones,
+            'entradas': entradas,
+            'bytes': total,
+            'tamano_maximo': self.tamano_maximo,
+        }
+
+
+# Caché compartida por todos los workers (ruta, TTL y tamaño por entorno)
+cache_compartida = CacheDisco(
+    ruta=os.environ.get('CACHE_DISCO_RUTA'),
+    ttl=float(os.environ.get('CACHE_DISCO_TTL', 3600)),
+    tamano_maximo=int(os.environ.get('CACHE_DISCO_BYTES', 64 * 1024 * 1024)),
+)
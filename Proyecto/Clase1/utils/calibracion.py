@@ -0,0 +1,266 @@
+import base64
+import csv
+import hashlib
+import io
+
+import numpy as np
+
+from utils.cache_disco import cache_compartida
+from utils.modelos import SEIR, SIR, integrar
+from utils.trabajos import PROCESOS, ejecutor
+
+# =====================================================================
+# Calibración de SIR/SEIR con datos observados
+#
+# En vez de ajustar β y γ a mano con "Simular Epidemia", se ajustan por
+# mínimos cuadrados (o máxima verosimilitud de Poisson, con residuos de
+# deviance) con scipy.optimize.least_squares. Se ajustan en escala
+# logarítmica (siempre positivos) los parámetros del modelo y I₀.
+#
+# - Los residuos se evalúan como un lote: θ y sus p perturbaciones (para
+#   el jacobiano por diferencias finitas) van en una sola llamada a
+#   integrar(), con los mismos pasos para todas (sin ruido del control
+#   de paso en las diferencias).
+# - Multistart: varios puntos de partida (hipercubo latino) repartidos
+#   en el pool de procesos de utils/trabajos.py, más los mejores ajustes
+#   anteriores del mismo modelo con los mismos datos (guardados en la
+#   caché de disco) como arranque en caliente.
+# - Intervalos de confianza al 95 % con la aproximación lineal
+#   cov = s² (JᵀJ)⁻¹ en escala log (asimétricos en la escala original).
+#
+# scipy.optimize y scipy.stats (~0.6 s) se importan al calibrar, dentro
+# de cada función, y no al arrancar cada worker con la app.
+# =====================================================================
+
+
+# --- 1. Modelos y rangos de búsqueda ---
+
+# modelo -> (modelo compilado, parámetros que se ajustan; además de I₀)
+MODELOS = {
+    'sir': (SIR, ('beta', 'gamma')),
+    'seir': (SEIR, ('beta', 'gamma', 'sigma')),
+}
+
+LIMITES = {'beta': (1e-3, 10.0), 'gamma': (1e-3, 5.0), 'sigma': (1e-3, 10.0)}
+
+OBSERVABLES = ('I', 'nuevos')  # infectados activos o casos nuevos por intervalo
+PERDIDAS = ('mc', 'poisson')
+
+RTOL = 1e-6  # Más estricta que en las páginas: el jacobiano sale por diferencias
+PASO_DIFERENCIAS = 1e-4
+MAX_PREVIOS = 4  # Ajustes anteriores que se guardan para arrancar en caliente
+
+
+def carga(modelo, observable, perdida, n_inicios):
+    """Costo aproximado de calibrar(), en ajustes SIR de infectados por
+    mínimos cuadrados (~0.1 s cada uno con un núcleo)."""
+    # El SEIR, los casos nuevos y Poisson piden muchas más evaluaciones por ajuste
+    factor = (4 if modelo == 'seir' else 1) * (6 if observable == 'nuevos' or perdida == 'poisson' else 1)
+    return n_inicios * factor
+
+
+def _limites(modelo, N):
+    _, nombres = MODELOS[modelo]
+    inferior = [LIMITES[p][0] for p in nombres] + [1e-2]
+    superior = [LIMITES[p][1] for p in nombres] + [N / 2]
+    return np.log(inferior), np.log(superior)
+
+
+# --- 2. Lectura de los datos ---
+
+def leer_casos(contenido):
+    """(t, casos) desde un CSV de dos columnas (día, casos) o una sola (casos).
+
+    `contenido` puede ser el texto o lo que entrega dcc.Upload
+    ("data:text/csv;base64,..."). Las filas no numéricas (encabezado) se
+    saltan. Lanza ValueError si no hay datos válidos.
+    """
+    if contenido.startswith('data:'):
+        contenido = base64.b64decode(contenido.split(',', 1)[1]).decode('utf-8-sig')
+
+    try:
+        dialecto = csv.Sniffer().sniff(contenido[:2048], delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    filas = []
+    for fila in csv.reader(io.StringIO(contenido), dialecto):
+        try:
+            filas.append([float(valor) for valor in fila if valor.strip()])
+        except ValueError:
+            continue  # encabezado u otra fila de texto
+    filas = [f for f in filas if f]
+    if len(filas) < 3:
+        raise ValueError("El CSV necesita al menos 3 filas numéricas (día, casos).")
+    if len({len(f) for f in filas}) != 1 or len(filas[0]) > 2:
+        raise ValueError("Cada fila debe tener una columna (casos) o dos (día, casos).")
+
+    datos = np.array(filas)
+    t, casos = (np.arange(len(datos), dtype=float), datos[:, 0]) if datos.shape[1] == 1 else datos.T
+    if np.any(np.diff(t) <= 0) or t[0] < 0:
+        raise ValueError("Los días deben ser no negativos y estrictamente crecientes.")
+    if np.any(casos < 0) or not np.all(np.isfinite(casos)):
+        raise ValueError("Los casos deben ser números no negativos.")
+    return t, casos
+
+
+def datos_ejemplo(N=1000, beta=0.3, gamma=0.1, I0=2, dias=60, semilla=7):
+    """Infectados activos de un SIR con ruido de Poisson, para probar la página."""
+    t = np.arange(dias + 1, dtype=float)
+    y = integrar(SIR.rhs, [N - I0, I0, 0], t, args=(beta, gamma, N))
+    return t, np.random.default_rng(semilla).poisson(y[:, 1]).astype(float)
+
+
+# --- 3. Predicción y residuos (vectorizados sobre los θ) ---
+
+def predecir(modelo, theta, t, N, observable='I'):
+    """Observable del modelo en los tiempos t para cada fila de theta.
+
+    theta: (m, p + 1) con el log de los parámetros y de I₀. Devuelve (m, len(t)).
+    La simulación siempre arranca en t = 0.
+    """
+    compilado, _ = MODELOS[modelo]
+    theta = np.atleast_2d(theta)
+    valores = np.exp(theta)
+    iS, iI = compilado.compartimentos.index('S'), compilado.compartimentos.index('I')
+
+    y0 = np.zeros((len(theta), len(compilado.compartimentos)))
+    y0[:, iS] = N - valores[:, -1]
+    y0[:, iI] = valores[:, -1]
+
+    t = np.asarray(t, dtype=float)
+    t_eval = np.union1d([0.0], t)
+    y = integrar(compilado.rhs, y0, t_eval, args=(*valores[:, :-1].T, N), rtol=RTOL)
+
+    indices = np.searchsorted(t_eval, t)
+    if observable == 'I':
+        return y[indices, :, iI].T
+    # Casos nuevos: lo que salió de S desde el dato anterior (o desde t = 0)
+    acumulado = N - y[:, :, iS]
+    return np.diff(acumulado[np.concatenate([[0], indices])], axis=0).T
+
+
+def _residuos(prediccion, casos, perdida):
+    if perdida == 'mc':
+        return prediccion - casos
+    # Residuos de deviance de Poisson: Σ r² = deviance, su mínimo es el de máxima verosimilitud
+    mu = np.maximum(prediccion, 1e-9)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        termino = np.where(casos > 0, casos * np.log(casos / mu), 0.0)
+    return np.sign(mu - casos) * np.sqrt(np.maximum(2 * (termino - (casos - mu)), 0.0))
+
+
+def _ajustar_desde(modelo, t, casos, N, observable, perdida, theta0, inferior, superior):
+    # Cada evaluación integra θ y sus p perturbaciones en un solo lote: los
+    # residuos salen de la primera fila y el jacobiano (diferencias finitas)
+    # del resto, que least_squares pide enseguida para el mismo θ
+    from scipy.optimize import least_squares
+
+    ultimo = {}
+
+    def residuos(theta):
+        lote = np.tile(theta, (len(theta) + 1, 1))
+        pasos = PASO_DIFERENCIAS * np.where(theta + PASO_DIFERENCIAS > superior, -1.0, 1.0)
+        lote[1:] += np.diag(pasos)
+        r = _residuos(predecir(modelo, lote, t, N, observable), casos, perdida)
+        ultimo['theta'], ultimo['jac'] = theta.copy(), ((r[1:] - r[0]) / pasos[:, None]).T
+        return r[0]
+
+    def jacobiano(theta):
+        if 'theta' not in ultimo or not np.array_equal(theta, ultimo['theta']):
+            residuos(theta)
+        return ultimo['jac']
+
+    resultado = least_squares(residuos, theta0, jac=jacobiano, bounds=(inferior, superior),
+                              x_scale='jac', max_nfev=200)
+    return resultado.x, resultado.cost, resultado.jac, resultado.nfev
+
+
+# --- 4. Multistart, arranque en caliente e intervalos de confianza ---
+
+def _intervalos(theta, jac, costo, n_datos):
+    from scipy.stats import t as t_student
+
+    p = len(theta)
+    libertad = max(n_datos - p, 1)
+    varianza = 2 * costo / libertad  # s² = Σr² / (n - p)
+    cov = varianza * np.linalg.pinv(jac.T @ jac)
+    cuantil = t_student.ppf(0.975, libertad)
+    error = np.sqrt(np.maximum(np.diag(cov), 0.0))
+    return cov, theta - cuantil * error, theta + cuantil * error, cuantil
+
+
+def _clave_datos(t, casos):
+    # Los ajustes guardados solo sirven de arranque para los mismos datos
+    return hashlib.sha256(np.concatenate([t, casos]).tobytes()).hexdigest()
+
+
+def calibrar(t, casos, modelo='sir', N=1000, observable='I', perdida='mc', n_inicios=8,
+             semilla=0, procesos=PROCESOS, cache=cache_compartida, avance=None):
+    """Ajusta los parámetros del modelo y I₀ a los casos observados.
+
+    Parte de n_inicios puntos del hipercubo latino más los ajustes
+    anteriores del mismo modelo con los mismos datos. avance(hecho, total)
+    se llama al terminar cada punto de partida. Devuelve un dict con
+    'parametros' {nombre: (valor, inf. 95 %, sup. 95 %)} (incluye I0 y
+    R0 = β/γ), 'theta' (log del mejor ajuste), 'costo' (½ Σ r²), 'inicios',
+    'previos' y 'evaluaciones'. Lanza ValueError con opciones desconocidas o
+    un N demasiado chico, y RuntimeError si el integrador falla.
+    """
+    from scipy.stats import qmc
+
+    if modelo not in MODELOS or observable not in OBSERVABLES or perdida not in PERDIDAS:
+        raise ValueError(f"Opción de calibración desconocida: {modelo!r}, {observable!r}, {perdida!r}")
+    t = np.asarray(t, dtype=float)
+    casos = np.asarray(casos, dtype=float)
+    _, nombres = MODELOS[modelo]
+    inferior, superior = _limites(modelo, N)
+    if np.any(superior <= inferior):
+        raise ValueError("N es demasiado chico: I₀ se busca entre 0.01 y N/2.")
+
+    # A. Puntos de partida: un hipercubo latino en escala log más los ajustes anteriores
+    clave = ('calibracion', modelo, observable, float(N), _clave_datos(t, casos))
+    guardados = (cache.obtener(clave) or []) if cache is not None else []
+    previos = [np.clip(np.asarray(theta, dtype=float), inferior, superior) for theta in guardados
+               if len(theta) == len(inferior)]
+    muestra = qmc.LatinHypercube(len(inferior), rng=semilla).random(max(n_inicios, 1))
+    inicios = previos + list(qmc.scale(muestra, inferior, superior))
+
+    tareas = [(modelo, t, casos, N, observable, perdida, theta0, inferior, superior) for theta0 in inicios]
+    if procesos > 1 and len(tareas) > 1:
+        resultados = ejecutor(procesos).map(_ajustar_desde, *zip(*tareas))
+    else:
+        resultados = (_ajustar_desde(*tarea) for tarea in tareas)
+    ajustes = []
+    for ajuste in resultados:
+        ajustes.append(ajuste)
+        if avance is not None:
+            avance(len(ajustes), len(tareas))
+    theta, costo, jac, _ = min(ajustes, key=lambda ajuste: ajuste[1])
+
+    if cache is not None:
+        otros = [p for p in previos if not np.allclose(p, theta, atol=1e-3)]
+        # Listas, no arreglos: la caché en disco guarda JSON
+        cache.guardar(clave, [p.tolist() for p in [theta] + otros[:MAX_PREVIOS - 1]])
+
+    # B. Intervalos (en log) y vuelta a la escala original
+    cov, bajo, alto, cuantil = _intervalos(theta, jac, costo, len(casos))
+    with np.errstate(over='ignore'):  # Un intervalo enorme sale como inf: "no identificable"
+        parametros = {nombre: (float(np.exp(v)), float(np.exp(a)), float(np.exp(b)))
+                      for nombre, v, a, b in zip(nombres + ('I0',), theta, bajo, alto)}
+
+    # R0 = β/γ: log R0 = θβ - θγ, con su varianza por el método delta
+    log_r0 = theta[0] - theta[1]
+    error_r0 = np.sqrt(max(cov[0, 0] + cov[1, 1] - 2 * cov[0, 1], 0.0))
+    with np.errstate(over='ignore'):
+        parametros['R0'] = tuple(float(np.exp(log_r0 + s * cuantil * error_r0)) for s in (0, -1, 1))
+
+    return {
+        'modelo': modelo,
+        'parametros': parametros,
+        'theta': theta,
+        'costo': float(costo),
+        'inicios': len(inicios),
+        'previos': len(previos),
+        'evaluaciones': int(sum(ajuste[3] for ajuste in ajustes)),
+    }
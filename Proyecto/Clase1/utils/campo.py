@@ -0,0 +1,178 @@
+import warnings
+
+import numpy as np
+
+from utils.modelos import integrar
+
+# =====================================================================
+# Utilidades para el campo vectorial (pages/clase5.py)
+# =====================================================================
+
+
+# --- 1. Segmentos del campo ---
+
+def segmentos(x_inicio, y_inicio, x_fin, y_fin):
+    """Intercala inicio, fin y un separador NaN: [x0, x1, nan, x0, x1, nan, ...].
+
+    Plotly corta la línea en cada NaN, así todos los vectores caben en
+    una sola traza. Los arreglos se preasignan y se llenan por saltos de 3.
+    """
+    n = np.size(x_inicio)
+    plot_x = np.empty(3 * n)
+    plot_y = np.empty(3 * n)
+
+    plot_x[0::3] = np.ravel(x_inicio)
+    plot_x[1::3] = np.ravel(x_fin)
+    plot_x[2::3] = np.nan
+    plot_y[0::3] = np.ravel(y_inicio)
+    plot_y[1::3] = np.ravel(y_fin)
+    plot_y[2::3] = np.nan
+
+    return plot_x, plot_y
+
+
+def colores_segmentos(n):
+    # 0 = punto inicial, 1 = punto final (el separador NaN no se dibuja)
+    return np.tile(np.array([0, 1, 0], dtype=np.int8), n)
+
+
+# --- 2. Trayectorias (retrato de fase) ---
+
+def _rhs_campo(estado, d, campo, sentido):
+    u, v = campo(estado[:, 0], estado[:, 1])
+    d[:, 0] = sentido * u
+    d[:, 1] = sentido * v
+    return d
+
+
+def trayectorias(campo, semillas, t_max, limites, n_pasos=200):
+    """Integra todas las semillas a la vez, hacia adelante y hacia atrás.
+
+    `semillas` es un arreglo (n_semillas, 2) y `campo(x, y) -> (u, v)` la
+    función compilada de utils/expresiones.py. Cada curva se corta (NaN)
+    desde que sale de `limites` = (x_min, x_max, y_min, y_max) o diverge.
+    Devuelve (plot_x, plot_y) listos para una sola traza de Plotly.
+    """
+    semillas = np.asarray(semillas, dtype=float).reshape(-1, 2)
+    t_eval = np.linspace(0, t_max, n_pasos + 1)
+
+    # A. RK4 sobre el estado (n_semillas, 2) con el motor compartido
+    with np.errstate(all='ignore'):
+        adelante = integrar(_rhs_campo, semillas, t_eval, args=(campo, 1.0), metodo='rk4')
+        atras = integrar(_rhs_campo, semillas, t_eval, args=(campo, -1.0), metodo='rk4')
+
+    # B. Una curva por semilla: atrás (invertida) + adelante
+    curvas = np.concatenate([atras[::-1], adelante[1:]]) # (2*n_pasos + 1, n_semillas, 2)
+
+    # C. Máscara: desde la semilla hacia cada extremo, una vez fuera queda fuera
+    x_min, x_max, y_min, y_max = limites
+    X, Y = curvas[..., 0], curvas[..., 1]
+    with np.errstate(invalid='ignore'):
+        fuera = ~((X >= x_min) & (X <= x_max) & (Y >= y_min) & (Y <= y_max))
+    fuera[n_pasos:] = np.logical_or.accumulate(fuera[n_pasos:], axis=0)
+    fuera[:n_pasos + 1] = np.logical_or.accumulate(fuera[n_pasos::-1], axis=0)[::-1]
+    curvas[fuera] = np.nan
+
+    # D. (n_semillas, puntos + separador NaN) aplanado, como en segmentos()
+    n_semillas = semillas.shape[0]
+    plot = np.full((n_semillas, curvas.shape[0] + 1, 2), np.nan)
+    plot[:, :-1] = curvas.transpose(1, 0, 2)
+    return plot[..., 0].ravel(), plot[..., 1].ravel()
+
+
+def semillas_malla(range_x, range_y, por_eje):
+    # Semillas en el centro de cada celda de una malla por_eje x por_eje
+    bordes_x = np.linspace(-range_x, range_x, por_eje + 1)
+    bordes_y = np.linspace(-range_y, range_y, por_eje + 1)
+    centros_x = 0.5 * (bordes_x[:-1] + bordes_x[1:])
+    centros_y = 0.5 * (bordes_y[:-1] + bordes_y[1:])
+    sx, sy = np.meshgrid(centros_x, centros_y)
+    return np.column_stack([sx.ravel(), sy.ravel()])
+
+
+# --- 3. Mallado adaptativo ---
+
+# Centro y esquinas de una celda relativos a su centro, en unidades de medio ancho
+_PUNTOS_CELDA = np.array([[0, 0], [-1, -1], [1, -1], [-1, 1], [1, 1]])
+_ESQUINAS = _PUNTOS_CELDA[1:]
+
+
+def _refinar(u, v, angulo_max, razon_max):
+    # u, v: (n_celdas, 5) = centro + 4 esquinas. Se refina una celda si
+    # el campo gira mucho dentro de ella, si su magnitud varía mucho
+    # (cerca de un punto fijo) o si ambas componentes cambian de signo
+    # (se cruzan dos nulclinas: posible equilibrio).
+    magnitud = np.hypot(u, v)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        # Celdas con campo nulo: los 5 cosenos son NaN, nanmin avisa y devuelve NaN (no gira)
+        warnings.simplefilter('ignore', RuntimeWarning)
+        coseno = (u[:, :1] * u + v[:, :1] * v) / (magnitud[:, :1] * magnitud)
+        giro = np.nanmin(coseno, axis=1) < np.cos(angulo_max)
+        razon = magnitud.max(axis=1) / magnitud.min(axis=1)
+    variacion = ~(razon <= razon_max)  # incluye magnitud nula (inf / nan)
+    cruce = (np.ptp(np.sign(u), axis=1) > 1) & (np.ptp(np.sign(v), axis=1) > 1)
+    return giro | variacion | cruce
+
+
+def malla_adaptativa(campo, range_x, range_y, mallado, niveles=3,
+                     angulo_max=np.pi / 6, razon_max=3.0):
+    """Muestrea el campo empezando por una malla gruesa de mallado x mallado
+    celdas y subdividiendo en 4 solo las que lo necesitan, hasta `niveles` veces.
+
+    Centros y esquinas viven en una red entera (la del nivel más fino):
+    cada punto se evalúa una sola vez aunque lo compartan celdas vecinas o
+    una celda y sus hijas. Cada nivel evalúa sus puntos nuevos en una sola
+    llamada a `campo`. Devuelve (x, y, u, v, ancho, evaluaciones): el centro
+    de cada celda final, el campo en ese centro, el ancho de la celda en x
+    (para escalar el vector) y cuántos puntos distintos se evaluaron.
+    """
+    # A. Red entera: 1 unidad = medio ancho de una celda del último nivel
+    escala = 2 ** niveles
+    paso_x, paso_y = range_x / mallado / escala, range_y / mallado / escala
+    ancho_red = 2 * mallado * escala + 1
+
+    # Celdas del primer nivel: centros (enteros) y medio ancho en unidades de la red
+    c = escala * (2 * np.arange(mallado) + 1)
+    centros = np.column_stack([m.ravel() for m in np.meshgrid(c, c)])
+    medio = escala
+
+    # Puntos ya evaluados: claves ordenadas (px·ancho_red + py) y su campo
+    claves = np.empty(0, dtype=np.int64)
+    u_red = v_red = np.empty(0)
+
+    hojas = []
+    for nivel in range(niveles + 1):
+        # B. Centro + esquinas de todas las celdas del nivel; se evalúan solo los puntos nuevos
+        puntos = centros[:, None, :] + _PUNTOS_CELDA * medio
+        clave_punto = puntos[..., 0].astype(np.int64) * ancho_red + puntos[..., 1]
+        nuevas = np.setdiff1d(clave_punto, claves)
+        if len(nuevas):
+            u, v = campo(-range_x + (nuevas // ancho_red) * paso_x,
+                         -range_y + (nuevas % ancho_red) * paso_y)
+            u = np.broadcast_to(np.asarray(u, dtype=float), nuevas.shape)
+            v = np.broadcast_to(np.asarray(v, dtype=float), nuevas.shape)
+            claves = np.concatenate([claves, nuevas])
+            orden = np.argsort(claves, kind='stable')
+            claves = claves[orden]
+            u_red = np.concatenate([u_red, u])[orden]
+            v_red = np.concatenate([v_red, v])[orden]
+
+        indice = np.searchsorted(claves, clave_punto)
+        u, v = u_red[indice], v_red[indice]
+
+        refinar = _refinar(u, v, angulo_max, razon_max) if nivel < niveles \
+            else np.zeros(len(centros), dtype=bool)
+
+        # C. Las celdas que no se refinan quedan como hojas
+        quedan = ~refinar
+        hojas.append((centros[quedan], u[quedan, 0], v[quedan, 0],
+                      np.full(quedan.sum(), 2 * medio * paso_x)))
+
+        # D. Las demás se parten en 4 hijas de la mitad de tamaño
+        medio //= 2
+        centros = (centros[refinar][:, None, :] + _ESQUINAS * medio).reshape(-1, 2)
+        if not len(centros):
+            break
+
+    centros, u, v, ancho = (np.concatenate(partes) for partes in zip(*hojas))
+    return -range_x + centros[:, 0] * paso_x, -range_y + centros[:, 1] * paso_y, u, v, ancho, len(claves)
@@ -0,0 +1,292 @@
+import copy
+import os
+import threading
+import time
+
+import numpy as np
+
+# =====================================================================
+# Cliente de Open-Meteo para la página de clima (pages/clima.py)
+#
+# Antes cada clic en el mapa hacía un requests.get() sin timeout, sin
+# reutilizar conexiones y sin caché: un servidor lento dejaba bloqueado
+# al worker de gunicorn. Este cliente:
+#   * reutiliza una sola sesión HTTP con pool de conexiones (keep-alive),
+#   * usa timeouts explícitos (conexión, lectura) y reintentos cortos,
+#   * guarda cada pronóstico hasta la siguiente hora en punto (la API
+#     entrega datos horarios: antes de eso la respuesta no cambia),
+#   * agrupa las peticiones simultáneas: diez clics a la vez sobre
+#     "Lima" producen una sola llamada a la API,
+#   * entrega a cada llamador su propia copia del JSON: modificarla no
+#     toca lo guardado en la caché ni lo que reciben los demás hilos.
+#
+# Además, ActualizadorClima mantiene en memoria el pronóstico de todas
+# las ciudades del mapa, refrescado en segundo plano con UNA sola
+# petición (Open-Meteo acepta latitudes/longitudes separadas por comas).
+#
+# Cada respuesta se convierte una sola vez en columnas NumPy (Pronostico):
+# tiempos datetime64 y una columna float por variable, sin recorrer las
+# horas con Python; sirve igual para varios días y más variables.
+#
+# La URL base es configurable (OPEN_METEO_URL) para probarlo contra un
+# servidor HTTP local.
+# =====================================================================
+
+URL_POR_DEFECTO = 'https://api.open-meteo.com/v1/forecast'
+
+VARIABLES_HORARIAS = ('temperature_2m', 'relative_humidity_2m')
+
+
+class Pronostico:
+    """Pronóstico horario de una ciudad en columnas: tiempo (datetime64[m],
+    hora local de la ciudad) y una columna float64 por variable."""
+
+    __slots__ = ('tiempo', 'columnas', 'desfase')
+
+    def __init__(self, tiempo, columnas, desfase=0):
+        self.tiempo = tiempo
+        self.columnas = columnas
+        self.desfase = desfase   # segundos entre la hora local y UTC
+
+    @classmethod
+    def desde_json(cls, datos):
+        horario = datos['hourly']
+        # NumPy interpreta las fechas ISO ("2023-11-10T00:00") de una vez
+        tiempo = np.array(horario['time'], dtype='datetime64[m]')
+        # dtype=float convierte los null de la API en NaN
+        columnas = {
+            nombre: np.array(valores, dtype=np.float64)
+            for nombre, valores in horario.items() if nombre != 'time'
+        }
+        return cls(tiempo, columnas, int(datos.get('utc_offset_seconds', 0)))
+
+    def __getitem__(self, nombre):
+        return self.columnas[nombre]
+
+    def indice_actual(self, ahora=None):
+        # Posición de la hora en curso (en la hora local de la ciudad)
+        ahora = time.time() if ahora is None else ahora
+        local = np.datetime64(int(ahora) + self.desfase, 's').astype('datetime64[m]')
+        return int(np.clip(np.searchsorted(self.tiempo, local, side='right') - 1, 0, len(self.tiempo) - 1))
+
+
+class _Vuelo:
+    # Una petición en curso: los demás hilos esperan su resultado
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class ClienteClima:
+    """Pronósticos horarios de Open-Meteo con caché por ciudad y peticiones agrupadas."""
+
+    def __init__(self, url_base=URL_POR_DEFECTO, timeout=(3.05, 10), conexiones=8, reintentos=2):
+        self.url_base = url_base
+        self.timeout = timeout
+        self.conexiones = conexiones
+        self.reintentos = reintentos
+        self.llamadas = 0      # peticiones reales a la API
+        self.aciertos = 0      # servidas desde la caché
+        self.agrupadas = 0     # esperaron a una petición ya en curso
+        self._cache = {}       # clave -> (expira, datos)
+        self._vuelos = {}      # clave -> _Vuelo
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --- Sesión: una por hilo y por proceso (gunicorn hace fork) ---
+    def _sesion(self):
+        sesion = getattr(self._local, 'sesion', None)
+        if sesion is None or self._local.pid != os.getpid():
+            # Import diferido: la app arranca sin cargar requests
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            reintentos = Retry(total=self.reintentos, backoff_factor=0.3,
+                               status_forcelist=(429, 500, 502, 503, 504),
+                               allowed_methods=('GET',))
+            adaptador = HTTPAdapter(pool_connections=self.conexiones,
+                                    pool_maxsize=self.conexiones, max_retries=reintentos)
+            sesion = requests.Session()
+            sesion.mount('http://', adaptador)
+            sesion.mount('https://', adaptador)
+            self._local.sesion = sesion
+            self._local.pid = os.getpid()
+        return sesion
+
+    @staticmethod
+    def _expira(ahora):
+        # Siguiente hora en punto: ahí la API publica el siguiente dato horario
+        return (ahora // 3600 + 1) * 3600
+
+    def _pedir(self, lat, lon, dias):
+        parametros = {
+            'latitude': lat,
+            'longitude': lon,
+            'hourly': ','.join(VARIABLES_HORARIAS),
+            'timezone': 'auto',
+            'forecast_days': dias,
+        }
+        respuesta = self._sesion().get(self.url_base, params=parametros, timeout=self.timeout)
+        respuesta.raise_for_status()
+        return respuesta.json()
+
+    def pronostico_lote(self, coordenadas, dias=1):
+        """Una sola petición para varias ubicaciones [(lat, lon), ...].
+
+        Devuelve una lista con el JSON de cada una, en el mismo orden.
+        """
+        lats = ','.join(str(lat) for lat, _ in coordenadas)
+        lons = ','.join(str(lon) for _, lon in coordenadas)
+        with self._lock:
+            self.llamadas += 1
+        datos = self._pedir(lats, lons, int(dias))
+        # Con una sola ubicación la API devuelve un objeto, no una lista
+        return datos if isinstance(datos, list) else [datos]
+
+    def pronostico(self, lat, lon, dias=1):
+        """Devuelve una copia del JSON de Open-Meteo para (lat, lon); lanza la
+        excepción de requests si la API falla (los errores no se guardan en la caché)."""
+        clave = (round(float(lat), 4), round(float(lon), 4), int(dias))
+
+        # A. Caché vigente, o unirse a una petición ya en curso
+        with self._lock:
+            guardado = self._cache.get(clave)
+            if guardado is not None and guardado[0] > time.time():
+                self.aciertos += 1
+                return copy.deepcopy(guardado[1])
+            vuelo = self._vuelos.get(clave)
+            lider = vuelo is None
+            if lider:
+                vuelo = self._vuelos[clave] = _Vuelo()
+                self.llamadas += 1
+            else:
+                self.agrupadas += 1
+
+        if not lider:
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return copy.deepcopy(vuelo.resultado)
+
+        # B. Este hilo hace la petición y reparte el resultado
+        try:
+            vuelo.resultado = self._pedir(*clave)
+            with self._lock:
+                self._cache[clave] = (self._expira(time.time()), vuelo.resultado)
+            return copy.deepcopy(vuelo.resultado)
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._vuelos[clave]
+            vuelo.listo.set()
+
+    def limpiar(self):
+        with self._lock:
+            self._cache.clear()
+            self.llamadas = self.aciertos = self.agrupadas = 0
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'llamadas': self.llamadas,
+                'aciertos': self.aciertos,
+                'agrupadas': self.agrupadas,
+                'entradas': len(self._cache),
+            }
+
+
+class ActualizadorClima:
+    """Instantánea en memoria de varias ciudades, refrescada por un hilo de fondo.
+
+    Si la API falla se sigue sirviendo la última instantánea buena; las
+    estadísticas dicen qué tan vieja es y cuántos refrescos fallaron.
+    """
+
+    def __init__(self, ciudades, cliente, intervalo=900, reintento=60, dias=1):
+        self.ciudades = dict(ciudades)   # nombre -> (lat, lon)
+        self.cliente = cliente
+        self.intervalo = intervalo
+        self.reintento = reintento
+        self.dias = dias
+        self.refrescos = 0
+        self.fallos = 0
+        self.ultimo_error = None
+        self._datos = {}                 # nombre -> Pronostico
+        self._actualizado = None         # time.time() de la última instantánea buena
+        self._lock = threading.Lock()
+        self._primera = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._pid = None
+
+    def refrescar(self):
+        nombres = list(self.ciudades)
+        try:
+            datos = self.cliente.pronostico_lote([self.ciudades[n] for n in nombres], self.dias)
+            pronosticos = {n: Pronostico.desde_json(d) for n, d in zip(nombres, datos)}
+        except Exception as e:
+            # Nos quedamos con la última instantánea buena
+            with self._lock:
+                self.fallos += 1
+                self.ultimo_error = f"{type(e).__name__}: {e}"
+            self._primera.set()
+            return False
+
+        with self._lock:
+            self._datos = pronosticos
+            self._actualizado = time.time()
+            self.refrescos += 1
+            self.ultimo_error = None
+        self._primera.set()
+        return True
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            espera = self.intervalo if self.refrescar() else self.reintento
+            self._detener.wait(espera)
+
+    def iniciar(self):
+        # Un hilo por proceso: los hilos no sobreviven al fork de gunicorn
+        with self._lock:
+            if self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self._primera.clear()
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='clima-actualizador', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def obtener(self, nombre, espera=15):
+        """(Pronostico, antigüedad en segundos) de la ciudad, o None si aún no hay datos.
+
+        La primera llamada arranca el hilo y espera hasta `espera` segundos
+        a que llegue la primera instantánea.
+        """
+        self.iniciar()
+        if self._actualizado is None:
+            self._primera.wait(espera)
+        with self._lock:
+            if nombre not in self._datos:
+                return None
+            return self._datos[nombre], time.time() - self._actualizado
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'ciudades': len(self._datos),
+                'antiguedad': None if self._actualizado is None else time.time() - self._actualizado,
+                'refrescos': self.refrescos,
+                'fallos': self.fallos,
+                'ultimo_error': self.ultimo_error,
+            }
+
+
+# Cliente compartido por la página (URL configurable por entorno)
+cliente_clima = ClienteClima(os.environ.get('OPEN_METEO_URL', URL_POR_DEFECTO))
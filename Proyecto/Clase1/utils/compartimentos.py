@@ -0,0 +1,180 @@
+import ast
+import functools
+import keyword
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from utils.expresiones import CONSTANTES, FUNCIONES, _analizar
+
+# =====================================================================
+# Modelos compartimentales declarativos
+#
+# SIR, SEIR, rumor, política... son todos flujos entre compartimentos
+# con nombre a tasas de acción de masas. En vez de escribir a mano el
+# RHS de cada uno, se describe el modelo:
+#
+#   SIRD = modelo_compartimental(
+#       'sird', ('S', 'I', 'R', 'D'),
+#       [('S', 'I', 'beta / N', ('S', 'I')),   # flujo = beta/N · S · I
+#        ('I', 'R', 'gamma'),                   # flujo = gamma · I
+#        ('I', 'D', 'mu')],
+#       ('beta', 'gamma', 'mu', ('N', 1.0)))
+#
+# Cada transición es (origen, destino, tasa, factores): el flujo es la
+# tasa (expresión de los parámetros, validada con utils/expresiones.py)
+# por el producto de los compartimentos en `factores` (por defecto, el
+# origen). Origen o destino None son entradas o salidas del sistema.
+#
+# El modelo se compila una sola vez (y queda en caché) a funciones
+# generadas con la convención de utils/modelos.py: rhs(y, dy, *params)
+# escribe en `dy`, jacobiano(y, *params) da bloques (..., n, n) y
+# propensiones/cambios son las reacciones para utils/estocastico.py.
+# =====================================================================
+
+_RESERVADOS = set(FUNCIONES) | set(CONSTANTES) | {'np', 'numpy'}
+
+
+def _validar_nombre(nombre, que):
+    if not isinstance(nombre, str) or not nombre.isidentifier() or keyword.iskeyword(nombre) \
+            or nombre.startswith('_') or nombre in _RESERVADOS:
+        raise ValueError(f"Nombre de {que} inválido: {nombre!r}")
+
+
+def _producto(terminos):
+    return ' * '.join(terminos) if terminos else '1.0'
+
+
+class ModeloCompartimental:
+    """Modelo ya compilado: rhs, jacobiano, propensiones y cambios."""
+
+    __slots__ = ('nombre', 'compartimentos', 'transiciones', 'parametros',
+                 'rhs', 'jacobiano', 'propensiones', 'cambios')
+
+    def __init__(self, nombre, compartimentos, transiciones, parametros, funciones, cambios):
+        self.nombre = nombre
+        self.compartimentos = compartimentos
+        self.transiciones = transiciones
+        self.parametros = parametros
+        self.rhs, self.jacobiano, self.propensiones = funciones
+        self.cambios = cambios
+
+    def __reduce__(self):
+        # Se envía la especificación, no el código generado: al otro lado
+        # (p. ej. un proceso de utils/estocastico.py) se vuelve a compilar
+        return (modelo_compartimental, (self.nombre, self.compartimentos, self.transiciones, self.parametros))
+
+    def __repr__(self):
+        return f"ModeloCompartimental({self.nombre!r}, {' '.join(self.compartimentos)})"
+
+
+def _generar(nombre, compartimentos, transiciones, parametros):
+    indice = {c: k for k, c in enumerate(compartimentos)}
+    n = len(compartimentos)
+    nombres_parametros = [p for p, _ in parametros]
+    firma = ', '.join(p if valor is None else f'{p}={valor!r}' for p, valor in parametros)
+
+    # Estado y tasas (las tasas solo dependen de los parámetros). Como en
+    # los RHS escritos a mano, y.T da un compartimento por fila sin copiar.
+    cabecera = [f"    {', '.join(compartimentos)}, = _y.T"]
+    cabecera += [f"    _k{i} = {ast.unparse(_analizar(tasa, nombres_parametros))}"
+                 for i, (_, _, tasa, _) in enumerate(transiciones)]
+    flujos = [f"_k{i} * {_producto(factores)}" if factores else f"_k{i}"
+              for i, (_, _, _, factores) in enumerate(transiciones)]
+
+    # A. RHS: cada flujo sale de su origen y entra a su destino
+    balance = defaultdict(list)
+    for i, (origen, destino, _, _) in enumerate(transiciones):
+        if origen is not None:
+            balance[indice[origen]].append(f"- _f{i}")
+        if destino is not None:
+            balance[indice[destino]].append(f"+ _f{i}")
+    lineas = [f"def {nombre}(_y, _dy, {firma}):"] + cabecera
+    lineas += [f"    _f{i} = {flujo}" for i, flujo in enumerate(flujos)]
+    lineas.append("    _d = _dy.T")
+    for k in range(n):
+        lineas.append(f"    _d[{k}] = {' '.join(balance[k]).lstrip('+ ') if balance[k] else '0.0'}")
+    lineas.append("    return _dy")
+
+    # B. Jacobiano: d(k·∏X)/dX = k · m · X^(m-1) · ∏(resto)
+    entradas = defaultdict(list)
+    for i, (origen, destino, _, factores) in enumerate(transiciones):
+        cuenta = Counter(factores)
+        for x, m in cuenta.items():
+            resto = [f for f, veces in cuenta.items() if f != x for _ in range(veces)]
+            potencia = [f"{m}.0 * {x}" if m == 2 else f"{m}.0 * {x} ** {m - 1}"] if m > 1 else []
+            derivada = _producto([f"_k{i}"] + potencia + resto)
+            if origen is not None:
+                entradas[indice[origen], indice[x]].append(f"- {derivada}")
+            if destino is not None:
+                entradas[indice[destino], indice[x]].append(f"+ {derivada}")
+    lineas += ["", f"def jac_{nombre}(_y, {firma}):"] + cabecera
+    lineas.append(f"    _J = _zeros(({n}, {n}) + _y.shape[::-1][1:])")
+    for (fila, columna), terminos in sorted(entradas.items()):
+        lineas.append(f"    _J[{fila}, {columna}] = {' '.join(terminos).lstrip('+ ')}")
+    lineas.append("    return _J.T.swapaxes(-1, -2)")
+
+    # C. Propensiones (una fila por transición) para el motor estocástico
+    lineas += ["", f"def propensiones_{nombre}(_y, {firma}):"] + cabecera
+    lineas.append(f"    return _stack(_broadcast_arrays({', '.join(flujos)}, {compartimentos[0]})[:-1])")
+
+    # Solo llegan aquí nombres validados y tasas reconstruidas desde la lista blanca
+    espacio = {'__builtins__': {}, '_zeros': np.zeros, '_stack': np.stack,
+               '_broadcast_arrays': np.broadcast_arrays, **FUNCIONES}
+    exec(compile('\n'.join(lineas), f'<modelo {nombre}>', 'exec'), espacio)
+    return espacio[nombre], espacio[f'jac_{nombre}'], espacio[f'propensiones_{nombre}']
+
+
+@functools.lru_cache(maxsize=64)
+def _compilar(nombre, compartimentos, transiciones, parametros):
+    _validar_nombre(nombre, 'modelo')
+    for c in compartimentos:
+        _validar_nombre(c, 'compartimento')
+    for p, _ in parametros:
+        _validar_nombre(p, 'parámetro')
+    if len(set(compartimentos) | {p for p, _ in parametros}) != len(compartimentos) + len(parametros):
+        raise ValueError("Los nombres de compartimentos y parámetros deben ser distintos.")
+    con_valor = [valor is not None for _, valor in parametros]
+    if con_valor != sorted(con_valor):
+        raise ValueError("Los parámetros con valor por defecto van al final.")
+
+    for origen, destino, _, factores in transiciones:
+        for c in (origen, destino, *factores):
+            if c is not None and c not in compartimentos:
+                raise ValueError(f"Compartimento desconocido en una transición: {c!r}")
+
+    funciones = _generar(nombre, compartimentos, transiciones, parametros)
+    rhs, jacobiano, _ = funciones
+    rhs.jacobiano = jacobiano  # utils.modelos.integrar lo usa si no se le pasa `jac`
+
+    cambios = np.zeros((len(transiciones), len(compartimentos)), dtype=np.int64)
+    for i, (origen, destino, _, _) in enumerate(transiciones):
+        if origen is not None:
+            cambios[i, compartimentos.index(origen)] -= 1
+        if destino is not None:
+            cambios[i, compartimentos.index(destino)] += 1
+    cambios.setflags(write=False)
+
+    return ModeloCompartimental(nombre, compartimentos, transiciones, parametros, funciones, cambios)
+
+
+def modelo_compartimental(nombre, compartimentos, transiciones, parametros):
+    """Compila (una sola vez) un modelo de flujos de acción de masas.
+
+    compartimentos: nombres, en el orden del vector de estado.
+    transiciones: (origen, destino, tasa[, factores]); el flujo es
+        tasa · ∏ factores, y por defecto factores = (origen,).
+    parametros: nombres o pares (nombre, valor por defecto), en el orden
+        en que se pasan como `args` a integrar().
+
+    Lanza ValueError si la especificación usa nombres o expresiones no válidos.
+    """
+    compartimentos = tuple(compartimentos)
+    normalizadas = []
+    for transicion in transiciones:
+        origen, destino, tasa, *factores = transicion
+        factores = tuple(factores[0]) if factores else ((origen,) if origen is not None else ())
+        normalizadas.append((origen, destino, str(tasa), factores))
+    parametros = tuple((p, None) if isinstance(p, str) else (p[0], None if p[1] is None else float(p[1]))
+                       for p in parametros)
+    return _compilar(nombre, compartimentos, tuple(normalizadas), parametros)
@@ -0,0 +1,153 @@
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+from dash.exceptions import PreventUpdate
+
+from utils.cache_disco import avisar_sin_disco, directorio_privado
+
+# =====================================================================
+# Modo en vivo (sliders) para SIR / SEIR
+#
+# Al arrastrar un slider el navegador espera a que el valor se quede
+# quieto un momento (assets/en_vivo.js) y recién entonces manda los
+# parámetros, con un id de cliente y un número de secuencia creciente.
+# Aquí nos aseguramos de que solo se resuelva el último pedido de cada
+# cliente en cada página: uno que ya fue reemplazado por otro más nuevo
+# se descarta antes de esperar turno, al conseguirlo y antes de responder.
+#
+# La última secuencia de cada (página, cliente) vive en un archivo SQLite
+# del directorio privado de la aplicación: con varios workers de gunicorn
+# los pedidos de un mismo cliente caen en procesos distintos y todos
+# deben ver cuál es el más nuevo. La página va en la clave porque SIR y
+# SEIR comparten el contador del navegador: un pedido de SEIR no vuelve
+# obsoleto uno de SIR. El semáforo que limita cuántos cálculos en vivo
+# corren a la vez sí es por proceso: acota la carga de cada worker.
+#
+# El archivo se abre con el primer pedido, no al importar. Si no se puede
+# crear, cada proceso usa una base en memoria: el modo en vivo funciona
+# igual, solo que cada worker ve únicamente sus propios pedidos.
+# =====================================================================
+
+
+class SolicitudesEnVivo:
+    """Última secuencia por (página, cliente), compartida entre procesos, + un
+    cupo de cálculos simultáneos por proceso."""
+
+    def __init__(self, concurrencia=2, ruta=None, caducidad=600):
+        self.ruta = ruta             # None: en_vivo.sqlite del directorio privado
+        self.caducidad = caducidad   # segundos sin pedidos tras los que se olvida un cliente
+        self.atendidas = 0
+        self.descartadas = 0
+        self._registros = 0
+        self._lock = threading.Lock()
+        self._cupo = threading.BoundedSemaphore(concurrencia)
+        self._local = threading.local()
+        self._memoria = None         # (pid, conexión) si no hay disco
+
+    # --- Conexión: una por hilo y por proceso (gunicorn hace fork) ---
+    def _conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None or self._local.pid != os.getpid():
+            conexion = self._abrir()
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS ultima ('
+                ' clave TEXT PRIMARY KEY, secuencia INTEGER, usado REAL) WITHOUT ROWID'
+            )
+            self._local.conexion = conexion
+            self._local.pid = os.getpid()
+        return conexion
+
+    def _abrir(self):
+        if self._memoria is None:
+            try:
+                ruta = self.ruta or os.path.join(directorio_privado(), 'en_vivo.sqlite')
+                conexion = sqlite3.connect(ruta, timeout=30, isolation_level=None)
+                conexion.execute('PRAGMA journal_mode=WAL')
+                conexion.execute('PRAGMA synchronous=NORMAL')
+                return conexion
+            except (OSError, sqlite3.Error) as error:
+                avisar_sin_disco('Modo en vivo', error)
+                self._memoria = (None, None)
+
+        # Sin disco: una base en memoria por proceso, compartida por sus hilos
+        with self._lock:
+            pid, conexion = self._memoria
+            if pid != os.getpid():
+                conexion = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+                self._memoria = (os.getpid(), conexion)
+            return conexion
+
+    @staticmethod
+    def _clave(pagina, cliente):
+        # El id de cliente viene del navegador: solo se usa como texto de la clave
+        return f"{pagina}:{str(cliente)[:64]}"
+
+    def _registrar(self, pagina, cliente, secuencia):
+        ahora = time.time()
+        conexion = self._conexion()
+        conexion.execute(
+            'INSERT INTO ultima VALUES (?, ?, ?) ON CONFLICT(clave) DO UPDATE SET'
+            ' secuencia = max(secuencia, excluded.secuencia), usado = excluded.usado',
+            (self._clave(pagina, cliente), int(secuencia), ahora)
+        )
+        with self._lock:
+            self._registros += 1
+            limpiar = self._registros % 256 == 0
+        if limpiar:
+            conexion.execute('DELETE FROM ultima WHERE usado < ?', (ahora - self.caducidad,))
+
+    def vigente(self, pagina, cliente, secuencia):
+        fila = self._conexion().execute(
+            'SELECT secuencia FROM ultima WHERE clave = ?', (self._clave(pagina, cliente),)
+        ).fetchone()
+        return fila is None or fila[0] <= secuencia
+
+    def _descartar(self):
+        with self._lock:
+            self.descartadas += 1
+        raise PreventUpdate
+
+    @contextlib.contextmanager
+    def turno(self, pagina, cliente, secuencia):
+        """Bloque en el que corre el cálculo de (cliente, secuencia) en `pagina`.
+
+        Lanza PreventUpdate (Dash no toca la gráfica) si el pedido queda
+        obsoleto mientras espera o mientras se calcula.
+        """
+        self._registrar(pagina, cliente, secuencia)
+
+        # A. Esperar cupo, abandonando si llega un pedido más nuevo
+        while not self._cupo.acquire(timeout=0.05):
+            if not self.vigente(pagina, cliente, secuencia):
+                self._descartar()
+
+        # B. Calcular (también se descarta si se volvió obsoleto al conseguir cupo)
+        try:
+            if not self.vigente(pagina, cliente, secuencia):
+                self._descartar()
+            yield
+        finally:
+            self._cupo.release()
+
+        # C. Ya calculado: si llegó otro pedido, no vale la pena responder
+        if not self.vigente(pagina, cliente, secuencia):
+            self._descartar()
+        with self._lock:
+            self.atendidas += 1
+
+    def estadisticas(self):
+        clientes = self._conexion().execute('SELECT count(*) FROM ultima').fetchone()[0]
+        with self._lock:
+            return {
+                'atendidas': self.atendidas,
+                'descartadas': self.descartadas,
+                'clientes': clientes,
+            }
+
+
+# Compartido por las páginas SIR y SEIR (cupo y archivo configurables por entorno)
+solicitudes_en_vivo = SolicitudesEnVivo(int(os.environ.get('EN_VIVO_CONCURRENCIA', 2)),
+                                        os.environ.get('EN_VIVO_RUTA'))
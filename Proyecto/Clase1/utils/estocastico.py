@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+
+from utils.modelos import SEIR, SIR
+from utils.trabajos import PROCESOS as PROCESOS_TRABAJO, ejecutor
+
+# =====================================================================
+# Motor estocástico (Gillespie exacto y tau-leaping)
+#
+# Con poblaciones chicas (el rumor tiene 275 alumnos) el azar importa:
+# un brote puede extinguirse al principio aunque R0 > 1. Aquí cada
+# modelo se describe por sus reacciones (cambios en el estado y
+# propensiones) y se simulan muchas realizaciones a la vez, como un
+# lote de NumPy: cada iteración avanza un evento de todas las
+# realizaciones vivas.
+#
+# ensamble() reparte las realizaciones en trozos de tamaño fijo, cada
+# uno con su propio flujo aleatorio (SeedSequence.spawn), y los corre en
+# el pool de procesos de utils/trabajos.py. Como los trozos no dependen
+# del número de procesos, una misma semilla da el mismo resultado con 1
+# o con 16 núcleos.
+# La salida se resume en bandas de cuantiles (bandas()).
+# =====================================================================
+
+
+# --- 1. Reacciones de cada modelo ---
+# Salen de la especificación de utils/compartimentos.py: una reacción por
+# transición, con `cambios` (n_reacciones, n_comp) y propensiones(y, *args)
+# -> (n_reacciones, n_realizaciones). Se acepta el modelo o su nombre.
+
+MODELOS = {'sir': SIR, 'seir': SEIR}
+
+
+def _reacciones(modelo):
+    if isinstance(modelo, str):
+        modelo = MODELOS[modelo]
+    return modelo.cambios, modelo.propensiones
+
+
+# --- 2. Gillespie exacto (SSA), vectorizado sobre las realizaciones ---
+
+def gillespie(modelo, y0, t_eval, args, n_realizaciones, rng):
+    """Estado de cada realización en los instantes t_eval: (len(t_eval), n, n_comp)."""
+    cambios, propensiones = _reacciones(modelo)
+    t_eval = np.asarray(t_eval, dtype=float)
+    n_t = len(t_eval)
+
+    # Arreglos compactos con las realizaciones vivas; `ids` dice cuál es cada una
+    ids = np.arange(n_realizaciones)
+    y = np.tile(np.asarray(y0, dtype=np.int64), (n_realizaciones, 1))
+    t = np.zeros(n_realizaciones)
+    j = np.zeros(n_realizaciones, dtype=np.intp)  # siguiente t_eval por llenar
+    salida = np.empty((n_t, n_realizaciones, y.shape[1]), dtype=np.int64)
+    indices_t = np.arange(n_t)[:, None]
+
+    while ids.size:
+        a = propensiones(y, *args)
+        a0 = a.sum(axis=0)
+
+        # A. Tiempo al siguiente evento (infinito si ya no puede pasar nada)
+        with np.errstate(divide='ignore'):
+            t_nuevo = t + rng.exponential(size=ids.size) / a0
+        fin = np.searchsorted(t_eval, t_nuevo, side='left')
+
+        # B. El estado actual vale en todos los t_eval de [t, t_nuevo)
+        terminadas = fin >= n_t
+        if terminadas.any():
+            r = ids[terminadas]
+            resto = indices_t >= j[terminadas]
+            salida[:, r] = np.where(resto[:, :, None], y[terminadas], salida[:, r])
+            sigue = ~terminadas
+            ids, y, j, a, a0, t_nuevo, fin = ids[sigue], y[sigue], j[sigue], a[:, sigue], a0[sigue], t_nuevo[sigue], fin[sigue]
+
+        pendientes = np.flatnonzero(j < fin)
+        while pendientes.size:
+            salida[j[pendientes], ids[pendientes]] = y[pendientes]
+            j[pendientes] += 1
+            pendientes = pendientes[j[pendientes] < fin[pendientes]]
+
+        # C. Ocurre la reacción k con probabilidad a_k / a0
+        umbral = rng.random(ids.size) * a0
+        reaccion = (np.cumsum(a, axis=0) < umbral).sum(axis=0)
+        y += cambios[np.minimum(reaccion, len(cambios) - 1)]
+        t = t_nuevo
+
+    return salida
+
+
+# --- 3. Tau-leaping (aproximado, paso fijo) ---
+
+def tau_leaping(modelo, y0, t_eval, args, n_realizaciones, rng, tau=None):
+    """Como gillespie(), pero con saltos de Poisson de tamaño tau.
+
+    Cada reacción se limita a los individuos disponibles, así ningún
+    compartimento queda negativo. Por defecto tau es el paso de t_eval / 10.
+    """
+    cambios, propensiones = _reacciones(modelo)
+    t_eval = np.asarray(t_eval, dtype=float)
+    if tau is None:
+        tau = (t_eval[-1] - t_eval[0]) / max(len(t_eval) - 1, 1) / 10
+
+    y = np.tile(np.asarray(y0, dtype=np.int64), (n_realizaciones, 1))
+    salida = np.empty((len(t_eval), n_realizaciones, y.shape[1]), dtype=np.int64)
+    salida[0] = y
+    consumidos = [np.flatnonzero(c < 0) for c in cambios]  # reactivos de cada reacción
+
+    for n in range(1, len(t_eval)):
+        dt = t_eval[n] - t_eval[n - 1]
+        sub_pasos = max(1, int(np.ceil(dt / tau)))
+        h = dt / sub_pasos
+        for _ in range(sub_pasos):
+            eventos = rng.poisson(propensiones(y, *args) * h)
+            for k, cambio in enumerate(cambios):
+                disponibles = (y[:, consumidos[k]] // -cambio[consumidos[k]]).min(axis=1)
+                y += np.minimum(eventos[k], disponibles)[:, None] * cambio
+        salida[n] = y
+
+    return salida
+
+
+METODOS = {'gillespie': gillespie, 'tau': tau_leaping}
+
+
+# --- 4. Ensambles en varios procesos ---
+
+TAMANO_TROZO = 1000
+# Los estados son enteros de 64 bits, pero las propensiones se calculan en
+# float: por encima de 2**53 individuos los conteos dejarían de ser exactos
+MAX_POBLACION = 2 ** 53
+PROCESOS = int(os.environ.get('ESTOCASTICO_PROCESOS', PROCESOS_TRABAJO))
+
+
+def _trozo(modelo, metodo, y0, t_eval, args, n_realizaciones, semilla):
+    rng = np.random.default_rng(semilla)
+    return METODOS[metodo](modelo, y0, t_eval, args, n_realizaciones, rng)
+
+
+def ensamble(modelo, y0, t_eval, args=(), n_realizaciones=1000, metodo='gillespie',
+             semilla=None, procesos=PROCESOS):
+    """n_realizaciones del modelo: arreglo (len(t_eval), n_realizaciones, n_comp).
+
+    Los trozos de TAMANO_TROZO realizaciones usan flujos aleatorios
+    independientes derivados de `semilla` y corren en paralelo si
+    procesos > 1. Lanza ValueError si el estado inicial tiene valores
+    negativos o suma más de MAX_POBLACION.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método estocástico desconocido: {metodo!r}")
+    y0 = [int(v) for v in y0]
+    if min(y0) < 0 or sum(y0) > MAX_POBLACION:
+        raise ValueError(f"El estado inicial debe ser no negativo y sumar a lo más {MAX_POBLACION}.")
+
+    tamanos = [TAMANO_TROZO] * (n_realizaciones // TAMANO_TROZO)
+    if n_realizaciones % TAMANO_TROZO:
+        tamanos.append(n_realizaciones % TAMANO_TROZO)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    tareas = [(modelo, metodo, y0, t_eval, args, n, s) for n, s in zip(tamanos, semillas)]
+
+    if procesos > 1 and len(tareas) > 1:
+        trozos = list(ejecutor(procesos).map(_trozo, *zip(*tareas)))
+    else:
+        trozos = [_trozo(*tarea) for tarea in tareas]
+    return np.concatenate(trozos, axis=1)
+
+
+def bandas(trayectorias, cuantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """Cuantiles entre realizaciones: (len(cuantiles), len(t_eval), n_comp)."""
+    return np.quantile(trayectorias, cuantiles, axis=1)
@@ -0,0 +1,202 @@
+import ast
+import functools
+from collections import Counter
+
+import numpy as np
+
+# =====================================================================
+# Compilador seguro de expresiones del usuario (campo vectorial)
+#
+# En vez de eval() sobre el texto crudo en cada clic, la expresión se
+# analiza una sola vez con `ast`, se valida contra una lista blanca de
+# nodos, nombres y funciones de NumPy, y se compila a una función
+# vectorizada f(x, y). El resultado queda en caché por el texto, así que
+# repetir la consulta o cambiar el mallado solo cuesta evaluar arreglos.
+# =====================================================================
+
+LONGITUD_MAXIMA = 500
+
+VARIABLES = ('x', 'y')
+
+FUNCIONES = {
+    nombre: getattr(np, nombre)
+    for nombre in (
+        'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'arctan2',
+        'sinh', 'cosh', 'tanh', 'exp', 'log', 'log10', 'log2', 'sqrt',
+        'abs', 'sign', 'floor', 'ceil', 'minimum', 'maximum', 'power', 'hypot',
+    )
+}
+
+CONSTANTES = {'pi': np.pi, 'e': np.e}
+
+# Operador de `ast` -> ufunc con la que se pliegan las partes constantes
+_OPERADORES = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.Pow: np.power, ast.Mod: np.mod, ast.FloorDiv: np.floor_divide,
+}
+_UNARIOS = {ast.UAdd: np.positive, ast.USub: np.negative}
+
+
+# --- 1. Validación: solo se reconstruyen los nodos permitidos ---
+
+def _nombre_numpy(nodo):
+    # Acepta tanto `sin` como `np.sin` / `numpy.sin`
+    if isinstance(nodo, ast.Name):
+        return nodo.id
+    if isinstance(nodo, ast.Attribute) and isinstance(nodo.value, ast.Name) \
+            and nodo.value.id in ('np', 'numpy'):
+        return nodo.attr
+    return None
+
+
+def _valor(nodo):
+    # Valor de un nodo constante ya validado (-c llega como UnaryOp), o None
+    if isinstance(nodo, ast.Constant):
+        return nodo.value
+    if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.USub) and isinstance(nodo.operand, ast.Constant):
+        return -nodo.operand.value
+    return None
+
+
+def _constante(valor):
+    # Un negativo se escribe -(c): ast.unparse(Constant(-8.0) ** x) daría -8.0 ** x
+    if valor < 0:
+        return ast.UnaryOp(ast.USub(), ast.Constant(-valor))
+    return ast.Constant(valor)
+
+
+def _plegar(ufunc, operandos, nodo):
+    # Calcula una operación entre constantes como lo haría NumPy con los
+    # arreglos, pero un desborde (9**9**9), una división por cero o un
+    # resultado inválido ((-8)**(1/3)) es un error de la expresión
+    try:
+        with np.errstate(all='raise'):
+            return _constante(float(ufunc(*operandos)))
+    except FloatingPointError:
+        raise ValueError(f"Operación fuera de rango: {ast.unparse(nodo)}") from None
+
+
+def _validar(nodo, variables=VARIABLES):
+    if isinstance(nodo, ast.Expression):
+        return _validar(nodo.body, variables)
+
+    if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES:
+        izquierda, derecha = _validar(nodo.left, variables), _validar(nodo.right, variables)
+        operandos = (_valor(izquierda), _valor(derecha))
+        if None not in operandos:
+            return _plegar(_OPERADORES[type(nodo.op)], operandos, nodo)
+        return ast.BinOp(izquierda, nodo.op, derecha)
+
+    if isinstance(nodo, ast.UnaryOp) and type(nodo.op) in _UNARIOS:
+        operando = _validar(nodo.operand, variables)
+        if _valor(operando) is not None:
+            return _plegar(_UNARIOS[type(nodo.op)], (_valor(operando),), nodo)
+        return ast.UnaryOp(nodo.op, operando)
+
+    if isinstance(nodo, ast.Constant) and type(nodo.value) in (int, float):
+        # Todo a float (así 9**9**9 desborda en vez de colgar el worker) y
+        # las operaciones entre constantes se pliegan con NumPy, que no
+        # devuelve complejos como (-8.0)**(1/3) en Python
+        return ast.Constant(float(nodo.value))
+
+    if isinstance(nodo, ast.Name) and nodo.id in variables:
+        return ast.Name(nodo.id, ast.Load())
+
+    nombre = _nombre_numpy(nodo)
+    if nombre in CONSTANTES:
+        return ast.Constant(CONSTANTES[nombre])
+
+    if isinstance(nodo, ast.Call) and not nodo.keywords:
+        funcion = _nombre_numpy(nodo.func)
+        if funcion in FUNCIONES and not any(isinstance(a, ast.Starred) for a in nodo.args):
+            return ast.Call(ast.Name(funcion, ast.Load()), [_validar(a, variables) for a in nodo.args], [])
+        raise ValueError(f"Función no permitida: {ast.unparse(nodo.func)}")
+
+    raise ValueError(f"Expresión no permitida: {ast.unparse(nodo)}")
+
+
+def _analizar(texto, variables=VARIABLES):
+    texto = str(texto).strip()
+    if not texto or len(texto) > LONGITUD_MAXIMA:
+        raise ValueError("La ecuación está vacía o es demasiado larga.")
+    try:
+        arbol = ast.parse(texto, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Sintaxis inválida en '{texto}': {e.msg}") from None
+    return _validar(arbol, variables)
+
+
+# --- 2. Eliminación de subexpresiones comunes (CSE) ---
+
+def _extraer_comunes(arboles):
+    conteo = Counter(
+        ast.dump(nodo)
+        for arbol in arboles
+        for nodo in ast.walk(arbol)
+        if isinstance(nodo, (ast.BinOp, ast.UnaryOp, ast.Call))
+    )
+    asignaciones = []
+    temporales = {}
+
+    def reemplazar(nodo):
+        clave = ast.dump(nodo)
+        if clave in temporales:
+            return ast.Name(temporales[clave], ast.Load())
+
+        # Primero los hijos (post-orden): cada temporal usa solo los anteriores
+        if isinstance(nodo, ast.BinOp):
+            nuevo = ast.BinOp(reemplazar(nodo.left), nodo.op, reemplazar(nodo.right))
+        elif isinstance(nodo, ast.UnaryOp):
+            nuevo = ast.UnaryOp(nodo.op, reemplazar(nodo.operand))
+        elif isinstance(nodo, ast.Call):
+            nuevo = ast.Call(nodo.func, [reemplazar(a) for a in nodo.args], [])
+        else:
+            return nodo
+
+        if conteo[clave] < 2:
+            return nuevo
+        nombre = f"_c{len(asignaciones)}"
+        asignaciones.append((nombre, nuevo))
+        temporales[clave] = nombre
+        return ast.Name(nombre, ast.Load())
+
+    return [reemplazar(arbol) for arbol in arboles], asignaciones
+
+
+# --- 3. Generación de la función vectorizada ---
+
+def _generar(arboles, cse):
+    asignaciones = []
+    if cse:
+        arboles, asignaciones = _extraer_comunes(arboles)
+
+    # Solo llegan aquí nodos validados: el código generado no puede
+    # referirse a nada fuera de x, y y las funciones de la lista blanca.
+    lineas = [f"def _campo({', '.join(VARIABLES)}):"]
+    lineas += [f"    {nombre} = {ast.unparse(valor)}" for nombre, valor in asignaciones]
+    lineas.append(f"    return ({', '.join(ast.unparse(a) for a in arboles)},)")
+
+    espacio = {'__builtins__': {}, **FUNCIONES}
+    exec(compile('\n'.join(lineas), '<campo>', 'exec'), espacio)
+    return espacio['_campo']
+
+
+@functools.lru_cache(maxsize=128)
+def compilar_sistema(*textos, cse=True):
+    """Compila una o varias ecuaciones en f(x, y) -> (u, v, ...) en una sola pasada.
+
+    Lanza ValueError si alguna usa sintaxis o nombres fuera de la lista blanca.
+    """
+    funcion = _generar([_analizar(texto) for texto in textos], cse)
+
+    def sistema(x, y):
+        # Una ecuación constante ("1") también debe dar un arreglo del mallado
+        return np.broadcast_arrays(*funcion(x, y), x, y)[:len(textos)]
+
+    return sistema
+
+
+def compilar_expresion(texto):
+    """Compila una sola ecuación en f(x, y)."""
+    sistema = compilar_sistema(texto)
+    return lambda x, y: sistema(x, y)[0]
@@ -1,27 +1,38 @@
+import os
+
 import plotly.graph_objects as go
 import numpy as np
 
-def grafica_logistica(p0, r, k, t_max):
+from utils.cache import cache_figuras, memoizar
+from utils.cache_disco import cache_compartida
+from utils.figuras import figura
+
+# Modo navegador: clase3 y clase4 calculan la curva en assets/logistica.js
+# (clientside callback) y el servidor no recibe peticiones. Con
+# LOGISTICA_EN_NAVEGADOR=0 vuelven los callbacks de Python, que siguen
+# siendo la referencia de la versión en JavaScript.
+LOGISTICA_EN_NAVEGADOR = os.environ.get('LOGISTICA_EN_NAVEGADOR', '1') != '0'
+
+def figura_logistica(t=(), poblacion=(), k=None, t_max=None):
+    # Sin datos: las mismas trazas vacías (el callback luego envía solo x/y)
+    capacidad_x, capacidad_y = ([0, t_max], [k, k]) if k is not None else ((), ())
 
-    t = np.linspace(0, t_max, 100)
-    poblacion = k / (1 + ((k - p0) / p0) * np.exp(-r * t))
-    
     trace_poblacion = go.Scatter(x=t, y=poblacion, mode='lines', name='Población', line=dict(color='#880e4f'))
-    trace_capacidad = go.Scatter(x=[0, t_max], y=[k, k], mode='lines', name='Capacidad de Carga (K)', line=dict(color='grey', dash='dash'))
+    trace_capacidad = go.Scatter(x=capacidad_x, y=capacidad_y, mode='lines', name='Capacidad de Carga (K)', line=dict(color='grey', dash='dash'))
 
-    fig = go.Figure(data=[trace_poblacion, trace_capacidad])
-    
-    fig.update_layout(
-        title=dict(text='<b>Modelo Logístico de Crecimiento Poblacional</b>', font=dict(color='#880e4f', size=16)),
-        title_x=0.5,
-        xaxis_title='Tiempo (t)',
-        yaxis_title='Población P(t)',
-        height=450,
-        legend=dict(x=0.02, y=0.98),
-        plot_bgcolor='white',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='black'),
-        yaxis=dict(showgrid=True, gridcolor='lightgrey', zeroline=True, zerolinewidth=2, zerolinecolor='black')
+    # Estilo común: plantilla de utils/figuras.py
+    return figura(
+        [trace_poblacion, trace_capacidad],
+        titulo='<b>Modelo Logístico de Crecimiento Poblacional</b>',
+        eje_x='Tiempo (t)',
+        eje_y='Población P(t)'
     )
+
+
+@memoizar(cache_figuras, cache_compartida)
+def grafica_logistica(p0, r, k, t_max):
+
+    t = np.linspace(0, t_max, 100)
+    poblacion = k / (1 + ((k - p0) / p0) * np.exp(-r * t))
     
-    return fig
\ No newline at end of file
+    return figura_logistica(t, poblacion, k, t_max)
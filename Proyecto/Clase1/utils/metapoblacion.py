@@ -0,0 +1,166 @@
+import base64
+import csv
+import io
+import zipfile
+
+import numpy as np
+from scipy import sparse
+
+# =====================================================================
+# SEIR metapoblacional (distritos o grupos de edad acoplados)
+#
+# En vez de una sola población homogénea de tamaño N hay n parches, cada
+# uno con su S, E, I, R y su población N_i. Se contagian según una
+# matriz de contactos/movilidad C (n x n, dispersa):
+#
+#   fuerza de infección  λ_i = β · Σ_j C_ij · I_j / N_j
+#
+# que es un solo producto matriz-vector disperso por evaluación: miles
+# de parches siguen siendo interactivos. El estado tiene forma (n, 4),
+# la misma convención de lote que utils/modelos.py, así integrar() lo
+# trata como cualquier otro modelo (incluido el cambio a BDF, con el
+# jacobiano disperso de abajo).
+#
+# C puede ser la cuadrícula de malla_distritos() o una matriz subida por
+# el usuario (leer_matriz(): .npz de scipy.sparse o CSV de tripletas).
+# =====================================================================
+
+
+# --- 1. Matrices de contacto ---
+
+def matriz_movilidad(adyacencia, movilidad):
+    """C = (1 - m)·I + m·P, con P la adyacencia normalizada por filas.
+
+    Cada parche pasa una fracción `movilidad` de sus contactos con sus
+    vecinos (repartida según el peso de cada conexión) y el resto en casa.
+    """
+    adyacencia = sparse.csr_matrix(adyacencia, dtype=float)
+    grados = np.asarray(adyacencia.sum(axis=1)).ravel()
+    inversos = np.divide(1.0, grados, out=np.zeros_like(grados), where=grados > 0)
+    P = sparse.diags(inversos) @ adyacencia
+    # Un parche aislado (sin vecinos) se queda con todos sus contactos
+    en_casa = 1.0 - movilidad * (grados > 0)
+    return (sparse.diags(en_casa) + movilidad * P).tocsr()
+
+
+def malla_distritos(lado, movilidad):
+    """Contactos de lado x lado distritos en una cuadrícula (vecinos N, S, E, O)."""
+    n = lado * lado
+    indices = np.arange(n).reshape(lado, lado)
+    horizontales = np.stack([indices[:, :-1].ravel(), indices[:, 1:].ravel()])
+    verticales = np.stack([indices[:-1, :].ravel(), indices[1:, :].ravel()])
+    filas, columnas = np.concatenate([horizontales, verticales], axis=1)
+    adyacencia = sparse.coo_matrix((np.ones(len(filas)), (filas, columnas)), shape=(n, n))
+    return matriz_movilidad(adyacencia + adyacencia.T, movilidad)
+
+
+def _leer_tripletas(texto, n):
+    # CSV fila,columna,valor; las filas no numéricas (encabezado) se saltan
+    try:
+        dialecto = csv.Sniffer().sniff(texto[:2048], delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    filas = []
+    for fila in csv.reader(io.StringIO(texto), dialecto):
+        try:
+            filas.append([float(valor) for valor in fila if valor.strip()])
+        except ValueError:
+            continue
+    filas = [f for f in filas if f]
+    if not filas or any(len(f) != 3 for f in filas):
+        raise ValueError("Cada fila del CSV debe tener tres columnas: fila, columna, valor.")
+
+    i, j, valores = np.array(filas).T
+    indices = np.concatenate([i, j])
+    if np.any(indices != np.round(indices)) or indices.min() < 0 or indices.max() >= n:
+        raise ValueError(f"Los índices de fila y columna deben ser enteros entre 0 y {n - 1}.")
+    return sparse.coo_matrix((valores, (i.astype(int), j.astype(int))), shape=(n, n))
+
+
+def leer_matriz(contenido, n, nombre=''):
+    """Matriz de contactos C (n, n) dispersa desde un archivo del usuario.
+
+    `contenido` puede ser el texto o lo que entrega dcc.Upload
+    ("data:...;base64,..."): un .npz de scipy.sparse.save_npz o un CSV de
+    tripletas fila,columna,valor (índices desde 0; las repetidas se
+    suman). Lanza ValueError si la forma no es (n, n) o hay contactos
+    negativos o no finitos.
+    """
+    if contenido.startswith('data:'):
+        datos = base64.b64decode(contenido.split(',', 1)[1])
+    else:
+        datos = contenido.encode()
+
+    if nombre.lower().endswith('.npz') or datos[:2] == b'PK':
+        try:
+            C = sparse.load_npz(io.BytesIO(datos))  # sin pickle: solo arreglos
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as error:
+            raise ValueError("El .npz debe guardarse con scipy.sparse.save_npz.") from error
+    else:
+        C = _leer_tripletas(datos.decode('utf-8-sig'), n)
+
+    if C.shape != (n, n):
+        raise ValueError(f"La matriz debe ser {n} x {n}, una fila y una columna por distrito "
+                         f"(es {C.shape[0]} x {C.shape[1]}).")
+    C = sparse.csr_matrix(C, dtype=float)
+    C.sum_duplicates()
+    if not np.all(np.isfinite(C.data)) or np.any(C.data < 0):
+        raise ValueError("Los contactos deben ser números finitos y no negativos.")
+    C.eliminate_zeros()
+    return C
+
+
+# --- 2. RHS y jacobiano ---
+
+def seir_meta(y, dy, beta, gamma, sigma, C, N):
+    """SEIR con n parches: y y dy con forma (n, 4); C dispersa (n, n); N con forma (n,)."""
+    S, E, I, R = y.T
+    contagios = beta * S * (C @ (I / N))
+    incubaciones = sigma * E
+    recuperaciones = gamma * I
+    d = dy.T
+    d[0] = -contagios
+    d[1] = contagios - incubaciones
+    d[2] = incubaciones - recuperaciones
+    d[3] = recuperaciones
+    return dy
+
+
+def jac_seir_meta(y, beta, gamma, sigma, C, N):
+    """Jacobiano del estado aplanado (4n x 4n), disperso: mismo patrón que C."""
+    n = y.shape[0]
+    S, I = y[:, 0], y[:, 2]
+    C = sparse.coo_matrix(C)
+    fila = np.arange(n) * 4  # índice de S_i en el estado aplanado
+
+    # ∂(contagios_i)/∂I_j = β · S_i · C_ij / N_j   y   ∂(contagios_i)/∂S_i = λ_i
+    acople = beta * S[C.row] * C.data / N[C.col]
+    fuerza = beta * (C.tocsr() @ (I / N))
+
+    filas = [fila[C.row], fila[C.row] + 1,                      # S_i, E_i respecto de I_j
+             fila, fila + 1, fila + 1, fila + 2, fila + 2, fila + 3]
+    columnas = [fila[C.col] + 2, fila[C.col] + 2,
+                fila, fila, fila + 1, fila + 1, fila + 2, fila + 2]
+    valores = [-acople, acople,
+               -fuerza, fuerza, np.full(n, -sigma), np.full(n, sigma), np.full(n, -gamma), np.full(n, gamma)]
+    return sparse.csc_matrix(
+        (np.concatenate(valores), (np.concatenate(filas), np.concatenate(columnas))),
+        shape=(4 * n, 4 * n)
+    )
+
+
+# integrar() usa el jacobiano tal cual (ya es del estado aplanado)
+jac_seir_meta.plano = True
+seir_meta.jacobiano = jac_seir_meta
+
+
+def estado_inicial(N, I0, parche_inicial, E0=0):
+    """Todos susceptibles salvo I0 infectados (y E0 expuestos) en un parche."""
+    N = np.asarray(N, dtype=float)
+    y0 = np.zeros((len(N), 4))
+    y0[:, 0] = N
+    y0[parche_inicial, 0] -= I0 + E0
+    y0[parche_inicial, 1] = E0
+    y0[parche_inicial, 2] = I0
+    return y0
@@ -0,0 +1,469 @@
+import math
+
+import numpy as np
+
+from utils.compartimentos import modelo_compartimental
+
+# =====================================================================
+# Motor compartimental compartido (SIR, SEIR, rumor, política...)
+#
+# Convención: el estado tiene forma (..., n_compartimentos). Un estado
+# 1D es una sola simulación; un estado (n_params, 3) son muchas
+# simulaciones SIR integradas a la vez. Las funciones del lado derecho
+# (RHS) escriben en un arreglo `dy` preasignado en lugar de devolver
+# una lista nueva en cada llamada. Los modelos se declaran como flujos
+# entre compartimentos (utils/compartimentos.py) y se compilan una vez.
+#
+# integrar() elige el método: Dormand-Prince explícito mientras el
+# problema no sea rígido y, si detecta rigidez (β enorme, σ o γ muy
+# grandes...), sigue desde ese punto con un método implícito de scipy
+# (BDF/Radau/LSODA) usando el jacobiano analítico del modelo.
+# =====================================================================
+
+
+# --- 1. Modelos (RHS y jacobiano generados por utils/compartimentos.py) ---
+# Con N=1 el contagio queda en la forma de acción de masas b*S*I de
+# aplicaciones.py.
+
+SIR = modelo_compartimental(
+    'sir', ('S', 'I', 'R'),
+    [('S', 'I', 'beta / N', ('S', 'I')),   # contagios
+     ('I', 'R', 'gamma')],                 # recuperaciones
+    ('beta', 'gamma', ('N', 1.0))
+)
+
+SEIR = modelo_compartimental(
+    'seir', ('S', 'E', 'I', 'R'),
+    [('S', 'E', 'beta / N', ('S', 'I')),   # contagios
+     ('E', 'I', 'sigma'),                  # incubaciones
+     ('I', 'R', 'gamma')],                 # recuperaciones
+    ('beta', 'gamma', 'sigma', ('N', 1.0))
+)
+
+# Variantes: la inmunidad se pierde (SEIRS), hay muertes (SIRD) o vacunación (SIRV)
+SEIRS = modelo_compartimental(
+    'seirs', ('S', 'E', 'I', 'R'),
+    [('S', 'E', 'beta / N', ('S', 'I')),
+     ('E', 'I', 'sigma'),
+     ('I', 'R', 'gamma'),
+     ('R', 'S', 'xi')],
+    ('beta', 'gamma', 'sigma', 'xi', ('N', 1.0))
+)
+
+SIRD = modelo_compartimental(
+    'sird', ('S', 'I', 'R', 'D'),
+    [('S', 'I', 'beta / N', ('S', 'I')),
+     ('I', 'R', 'gamma'),
+     ('I', 'D', 'mu')],
+    ('beta', 'gamma', 'mu', ('N', 1.0))
+)
+
+SIRV = modelo_compartimental(
+    'sirv', ('S', 'I', 'R', 'V'),
+    [('S', 'I', 'beta / N', ('S', 'I')),
+     ('I', 'R', 'gamma'),
+     ('S', 'V', 'nu')],
+    ('beta', 'gamma', 'nu', ('N', 1.0))
+)
+
+# Nombres de siempre: sir(y, dy, beta, gamma, N=1.0), jac_sir(y, beta, gamma, N=1.0), ...
+sir, jac_sir = SIR.rhs, SIR.jacobiano
+seir, jac_seir = SEIR.rhs, SEIR.jacobiano
+
+
+# --- 2. Máximo de una componente a lo largo de la integración ---
+
+class _Maximo:
+    # Máximo corrido de y[..., componente] y el instante en que se alcanza.
+    # Se observa cada paso del integrador (sus extremos y puntos interiores
+    # de la salida densa): no depende de t_eval, que puede tener 2 puntos.
+    FRACCIONES = np.linspace(0, 1, 9)[1:]
+
+    def __init__(self, y0, componente):
+        self.componente = componente
+        self.valor = np.array(y0[..., componente], dtype=float)
+        self.t = np.zeros_like(self.valor)
+
+    def observar(self, tiempos, valores):
+        # tiempos (m,) y valores (m,) + forma[:-1] de la componente
+        mejor = valores.argmax(axis=0)
+        candidato = np.take_along_axis(valores, mejor[None], axis=0)[0]
+        mayor = candidato > self.valor
+        self.valor = np.where(mayor, candidato, self.valor)
+        self.t = np.where(mayor, tiempos[mejor], self.t)
+
+
+# --- 3. Camino rápido: RK4 de paso fijo ---
+
+_PESOS_RK4 = np.array([1.0, 2.0, 2.0, 1.0]) / 6.0
+
+
+def _rk4(rhs, y0, t_eval, args, paso, contador, maximo=None):
+    # Cada intervalo de salida se divide en sub-pasos de tamaño <= paso,
+    # así los puntos de t_eval caen exactamente sobre la malla del método.
+    salida = np.empty((len(t_eval),) + y0.shape)
+    salida[0] = y0
+
+    y = y0.copy()
+    k = np.empty((4,) + y0.shape)
+    k_plano = k.reshape(4, -1)
+    tmp = np.empty_like(y0)
+    incremento = np.empty_like(y0)
+    incremento_plano = incremento.reshape(-1)
+
+    for n in range(1, len(t_eval)):
+        dt = t_eval[n] - t_eval[n - 1]
+        sub_pasos = max(1, int(np.ceil(dt / paso))) if paso else 1
+        h = dt / sub_pasos
+        contador['pasos'] += sub_pasos
+        contador['evaluaciones'] += 4 * sub_pasos
+        for i in range(sub_pasos):
+            rhs(y, k[0], *args)
+            np.multiply(k[0], 0.5 * h, out=tmp)
+            tmp += y
+            rhs(tmp, k[1], *args)
+            np.multiply(k[1], 0.5 * h, out=tmp)
+            tmp += y
+            rhs(tmp, k[2], *args)
+            np.multiply(k[2], h, out=tmp)
+            tmp += y
+            rhs(tmp, k[3], *args)
+            np.dot(_PESOS_RK4, k_plano, out=incremento_plano)
+            incremento *= h
+            y += incremento
+            if maximo is not None:
+                maximo.observar(np.array([t_eval[n - 1] + (i + 1) * h]), y[None, ..., maximo.componente])
+        salida[n] = y
+
+    return salida
+
+
+# --- 4. Camino adaptativo: Dormand-Prince 5(4) ---
+# Mismos coeficientes que RK45 de scipy, pero con las etapas en un
+# arreglo preasignado y la salida densa evaluada paso a paso.
+
+_A = [
+    np.array([]),
+    np.array([1/5]),
+    np.array([3/40, 9/40]),
+    np.array([44/45, -56/15, 32/9]),
+    np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+    np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+]
+_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+# Interpolante de cuarto orden (salida densa) de Dormand-Prince
+_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+
+def _norma(x):
+    # RMS por simulación y el peor caso de todo el lote
+    if x.ndim == 1:
+        return math.sqrt(np.dot(x, x) / x.size)
+    return math.sqrt(np.add.reduce(x * x, axis=-1).max() / x.shape[-1])
+
+
+def _paso_inicial(rhs, y0, f0, intervalo, args, rtol, atol):
+    escala = atol + rtol * np.abs(y0)
+    d0 = _norma(y0 / escala)
+    d1 = _norma(f0 / escala)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    h0 = min(h0, intervalo)
+
+    f1 = rhs(y0 + h0 * f0, np.empty_like(y0), *args)
+    d2 = _norma((f1 - f0) / escala) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** 0.2
+
+    return min(100 * h0, h1, intervalo)
+
+
+class _Rigidez(Exception):
+    # El método explícito se rindió en t (ya llenó salida[:j]):
+    # integrar() sigue desde (t, y) con uno implícito
+    def __init__(self, salida, j, t, y):
+        super().__init__(t)
+        self.salida, self.j, self.t, self.y = salida, j, t, y.copy()
+
+
+# Detección de rigidez de Hairer (DOPRI5): h·|λ| estimado fuera de la
+# región de estabilidad en 15 pasos aceptados (sin 6 pasos "sanos" seguidos)
+_H_LAMBDA_MAX = 3.25
+_SOSPECHAS_RIGIDEZ = 15
+_PASOS_SANOS = 6
+
+
+def _dopri5(rhs, y0, t_eval, args, rtol, atol, paso, contador, rigidez=False, maximo=None):
+    forma = y0.shape
+    salida = np.empty((len(t_eval),) + forma)
+    salida[0] = y0
+
+    t, t_final = t_eval[0], t_eval[-1]
+    if t_final <= t:
+        salida[:] = y0
+        return salida
+
+    y = y0.copy()
+    y_nuevo = np.empty_like(y0)
+    k = np.empty((7,) + forma)
+    k_plano = k.reshape(7, -1)
+    tmp = np.empty_like(y0)
+    tmp_plano = tmp.reshape(-1)
+    etapa6 = np.empty_like(y0)
+    sospechas = sanos = 0
+
+    rhs(y, k[0], *args)
+    contador['evaluaciones'] += 2  # f(y0) y la del paso inicial
+    h = paso or _paso_inicial(rhs, y, k[0], t_final - t, args, rtol, atol)
+    h_minimo = 1e-12 * max(1.0, abs(t_final))
+    j = 1  # siguiente punto de t_eval por rellenar
+
+    while j < len(t_eval):
+        if h < h_minimo:
+            if rigidez:
+                raise _Rigidez(salida, j, t, y)
+            raise RuntimeError(f"El paso de integración colapsó en t={t:.4g}; revisa los parámetros.")
+        ultimo = h >= t_final - t
+        if ultimo:
+            h = t_final - t
+
+        # A. Etapas del método
+        for s in range(1, 6):
+            np.dot(_A[s], k_plano[:s], out=tmp_plano)
+            tmp *= h
+            tmp += y
+            rhs(tmp, k[s], *args)
+        etapa6[...] = tmp
+        np.dot(_B, k_plano[:6], out=tmp_plano)
+        tmp *= h
+        np.add(y, tmp, out=y_nuevo)
+        rhs(y_nuevo, k[6], *args)
+        contador['evaluaciones'] += 6
+
+        # B. Error local estimado
+        np.dot(_E, k_plano, out=tmp_plano)
+        tmp *= h
+        escala = atol + rtol * np.maximum(np.abs(y), np.abs(y_nuevo))
+        error = _norma(tmp / escala)
+
+        if error <= 1.0:
+            contador['pasos'] += 1
+            t_nuevo = t_final if ultimo else t + h
+
+            # Rigidez: h·|λ| ≈ h·‖f(y₇) - f(y₆)‖ / ‖y₇ - y₆‖
+            if rigidez:
+                np.subtract(y_nuevo, etapa6, out=tmp)
+                denominador = np.dot(tmp_plano, tmp_plano)
+                if denominador > 0:
+                    np.subtract(k[6], k[5], out=tmp)
+                    h_lambda = h * math.sqrt(np.dot(tmp_plano, tmp_plano) / denominador)
+                    if h_lambda > _H_LAMBDA_MAX:
+                        sanos = 0
+                        sospechas += 1
+                        if sospechas == _SOSPECHAS_RIGIDEZ:
+                            raise _Rigidez(salida, j, t, y)
+                    else:
+                        sanos += 1
+                        if sanos == _PASOS_SANOS:
+                            sospechas = 0
+
+            # C. Salida densa para los t_eval que caen en (t, t_nuevo]
+            fin = np.searchsorted(t_eval, t_nuevo, side='right')
+            if fin > j or maximo is not None:
+                q = _P.T @ k_plano
+            if fin > j:
+                x = (t_eval[j:fin] - t) / h
+                potencias = x[:, None] ** np.arange(1, 5)
+                salida[j:fin] = y + h * (potencias @ q).reshape((fin - j,) + forma)
+                j = fin
+            if maximo is not None:
+                c = maximo.componente
+                potencias = _Maximo.FRACCIONES[:, None] ** np.arange(1, 5)
+                valores = y[..., c] + h * np.tensordot(potencias, q.reshape((4,) + forma)[..., c], axes=1)
+                maximo.observar(t + h * _Maximo.FRACCIONES, valores)
+
+            t = t_nuevo
+            y, y_nuevo = y_nuevo, y
+            k[0] = k[6]  # FSAL: la última etapa es la primera del paso siguiente
+            factor = 10.0 if error == 0 else min(10.0, 0.9 * error ** -0.2)
+        else:
+            contador['rechazados'] += 1
+            factor = max(0.2, 0.9 * error ** -0.2) if np.isfinite(error) else 0.2
+
+        h *= factor
+
+    return salida
+
+
+# --- 5. Camino rígido: métodos implícitos de scipy ---
+
+METODOS_IMPLICITOS = ('BDF', 'Radau', 'LSODA')
+
+
+def _jacobiano_scipy(jac, forma, args):
+    # Bloques (..., n, n) -> matriz del estado aplanado: densa para una sola
+    # simulación, dispersa diagonal por bloques para un lote. Un jacobiano
+    # marcado `plano` (p. ej. utils/metapoblacion.py, con parches acoplados)
+    # ya da la matriz del estado aplanado y se usa tal cual.
+    from scipy.sparse import csc_matrix
+
+    if getattr(jac, 'plano', False):
+        return lambda t, y: jac(y.reshape(forma), *args)
+
+    n = forma[-1]
+    n_bloques = int(np.prod(forma[:-1], dtype=int))
+    if n_bloques == 1:
+        return lambda t, y: jac(y.reshape(forma), *args).reshape(n, n)
+
+    base = np.arange(n_bloques)[:, None, None] * n
+    filas = np.broadcast_to(base + np.arange(n)[:, None], (n_bloques, n, n)).ravel()
+    columnas = np.broadcast_to(base + np.arange(n)[None, :], (n_bloques, n, n)).ravel()
+    tamano = n_bloques * n
+    return lambda t, y: csc_matrix((jac(y.reshape(forma), *args).ravel(), (filas, columnas)),
+                                   shape=(tamano, tamano))
+
+
+def _implicito(rhs, jac, y0, t0, t_eval, args, rtol, atol, metodo, contador, maximo=None):
+    from scipy.integrate import solve_ivp
+
+    forma = y0.shape
+    dy = np.empty(forma)
+
+    def f(t, y):
+        return rhs(y.reshape(forma), dy, *args).ravel().copy()
+
+    jacobiano = _jacobiano_scipy(jac, forma, args) if jac is not None else None
+    if metodo == 'LSODA' and jacobiano is not None and (y0.size > forma[-1] or getattr(jac, 'plano', False)):
+        # LSODA solo acepta jacobianos densos
+        disperso = jacobiano
+        jacobiano = lambda t, y: disperso(t, y).toarray()
+
+    solucion = solve_ivp(f, (t0, t_eval[-1]), y0.ravel(), method=metodo, jac=jacobiano,
+                         rtol=rtol, atol=atol, dense_output=True)
+    if not solucion.success:
+        raise RuntimeError(f"El integrador {metodo} falló: {solucion.message}")
+
+    contador['pasos'] += len(solucion.t) - 1
+    contador['evaluaciones'] += solucion.nfev
+    contador['jacobianos'] += solucion.njev
+    if maximo is not None:
+        tiempos = (solucion.t[:-1, None] + np.diff(solucion.t)[:, None] * _Maximo.FRACCIONES).ravel()
+        valores = solucion.sol(tiempos).T.reshape((len(tiempos),) + forma)[..., maximo.componente]
+        maximo.observar(tiempos, valores)
+    return solucion.sol(t_eval).T.reshape((len(t_eval),) + forma)
+
+
+# --- 6. Punto de entrada único para las páginas ---
+
+def integrar(rhs, y0, t_eval, args=(), metodo='auto', rtol=1e-3, atol=1e-6, paso=None,
+             jac=None, metodo_rigido='BDF', info=None, maximo=None):
+    """Integra dy/dt = rhs(y) y devuelve la solución en cada punto de t_eval.
+
+    El resultado tiene forma (len(t_eval),) + y0.shape.
+    metodo='auto' usa Dormand-Prince 5(4) y, si detecta rigidez, sigue
+    desde ese instante con `metodo_rigido` (BDF, Radau o LSODA de scipy)
+    y el jacobiano analítico (`jac`, o el de rhs.jacobiano si el modelo
+    viene de utils/compartimentos.py);
+    metodo='adaptativo' usa solo Dormand-Prince 5(4) con control de error;
+    metodo='rk4' usa RK4 de paso fijo (paso <= `paso`), útil para lotes;
+    metodo='BDF'/'Radau'/'LSODA' usa directamente ese método implícito.
+
+    Si se pasa un dict en `info`, se llena con el método usado, pasos
+    aceptados y rechazados, evaluaciones del RHS y del jacobiano, y el
+    instante en que se cambió a implícito (o None). Con `maximo` = índice
+    de un compartimento, info también recibe 'maximo' y 't_maximo': su
+    máximo en [t_eval[0], t_eval[-1]] y cuándo ocurre, forma y0.shape[:-1],
+    seguidos paso a paso por el integrador (no solo en los puntos de t_eval).
+    """
+    y0 = np.asarray(y0, dtype=float)
+    t_eval = np.asarray(t_eval, dtype=float)
+    if jac is None:
+        jac = getattr(rhs, 'jacobiano', None)
+
+    contador = {'metodo': metodo, 'pasos': 0, 'rechazados': 0, 'evaluaciones': 0,
+                'jacobianos': 0, 't_rigido': None}
+    if maximo is not None:
+        maximo = _Maximo(y0, maximo)
+        maximo.t += t_eval[0]
+
+    if metodo in ('auto', 'adaptativo'):
+        try:
+            salida = _dopri5(rhs, y0, t_eval, args, rtol, atol, paso, contador,
+                             rigidez=metodo == 'auto', maximo=maximo)
+            contador['metodo'] = 'DOPRI5'
+        except _Rigidez as rigido:
+            # Lo ya calculado se conserva; el resto, con el método implícito
+            salida, j = rigido.salida, rigido.j
+            salida[j:] = _implicito(rhs, jac, rigido.y, rigido.t, t_eval[j:], args,
+                                    rtol, atol, metodo_rigido, contador, maximo)
+            contador['metodo'] = f'DOPRI5 + {metodo_rigido}'
+            contador['t_rigido'] = float(rigido.t)
+    elif metodo == 'rk4':
+        salida = _rk4(rhs, y0, t_eval, args, paso, contador, maximo)
+        contador['metodo'] = 'RK4'
+    elif metodo in METODOS_IMPLICITOS:
+        salida = np.empty((len(t_eval),) + y0.shape)
+        salida[0] = y0
+        salida[1:] = _implicito(rhs, jac, y0, t_eval[0], t_eval[1:], args, rtol, atol, metodo,
+                                contador, maximo)
+    else:
+        raise ValueError(f"Método de integración desconocido: {metodo!r}")
+
+    if info is not None:
+        info.update(contador)
+        if maximo is not None:
+            info['maximo'], info['t_maximo'] = maximo.valor, maximo.t
+    return salida
+
+
+# --- 7. Barrido de parámetros del SIR (toda la malla en una pasada) ---
+
+def barrido_sir(N, betas, gammas, I0, t_max, avance=None, tramos=20):
+    """Integra todas las combinaciones (gamma, beta) del SIR como un solo lote.
+
+    Devuelve (pico_infectados, tamano_final), ambos con forma
+    (len(gammas), len(betas)); tamano_final = N - S(t_max) y el pico es
+    el máximo exacto de I en [0, t_max] (ver pico_sir()). Con `avance`,
+    se integra en `tramos` y se llama a avance(hecho, total) tras cada uno.
+    """
+    B, G = np.meshgrid(np.asarray(betas, dtype=float), np.asarray(gammas, dtype=float))
+    y = np.tile([N - I0, I0, 0.0], (B.size, 1)) # Estado (n_params, 3)
+    args = (B.ravel(), G.ravel(), N)
+
+    # Solo hace falta el estado final: el pico sale de la cantidad conservada
+    cortes = np.linspace(0.0, t_max, (tramos if avance is not None else 1) + 1)
+    for i, (a, b) in enumerate(zip(cortes[:-1], cortes[1:])):
+        y = integrar(sir, y, np.array([a, b]), args=args)[-1]
+        if avance is not None:
+            avance(i + 1, len(cortes) - 1)
+
+    pico_infectados = pico_sir(N - I0, I0, y[:, 0], y[:, 1], *args)
+    tamano_final = (N - y[:, 0]).reshape(B.shape)
+    return pico_infectados.reshape(B.shape), tamano_final
+
+
+def pico_sir(S0, I0, S_fin, I_fin, beta, gamma, N):
+    """Máximo de I(t) en [0, t_max] para el SIR, sin muestrear la curva.
+
+    En el SIR, I + S - (γN/β)·ln S se conserva y S decrece, así que I es
+    una función cóncava de S con máximo en S* = γN/β. Si S* queda entre
+    S(t_max) y S0 el pico es I0 + S0 - S* + S*·ln(S*/S0); si no, está en
+    un extremo (I0 o I(t_max)). Con una malla fija el máximo muestreado
+    se pierde en horizontes largos (el pico dura días y el paso son años).
+    """
+    S_fin, I_fin = np.asarray(S_fin, dtype=float), np.asarray(I_fin, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        S_critico = gamma * N / np.asarray(beta, dtype=float)
+        interior = (S_fin <= S_critico) & (S_critico <= S0)
+        pico = I0 + S0 - S_critico + S_critico * np.log(S_critico / S0)
+    return np.where(interior, pico, np.maximum(I0, I_fin))
@@ -0,0 +1,115 @@
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+
+import dash
+
+# =====================================================================
+# Registro de páginas con carga diferida y perfil de arranque
+#
+# Con use_pages=True, Dash importa todo pages/ y cada página arma su
+# layout (y sus figuras) al importarse, en cada worker. Aquí importamos
+# las páginas nosotros (app.py usa pages_folder=""), medimos cuánto
+# tarda cada una, y las páginas pesadas declaran su layout con
+# @layout_diferido para armarlo recién en la primera visita.
+#
+# Los callbacks se siguen registrando al importar: Dash necesita
+# conocerlos todos antes de la primera petición.
+# =====================================================================
+
+# modulo -> {'importar': segundos, 'layout': segundos, 'diferido': bool}
+PERFIL = {}
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_lock = threading.Lock()
+
+
+def layout_diferido(construir):
+    """Convierte construir() en un layout que se arma una sola vez, en la primera visita."""
+    modulo = construir.__module__
+    construido = []
+
+    @functools.wraps(construir)
+    def layout(**_):
+        if not construido:
+            with _lock:
+                if not construido:
+                    inicio = time.perf_counter()
+                    construido.append(construir())
+                    PERFIL.setdefault(modulo, {})['layout'] = time.perf_counter() - inicio
+        return construido[0]
+
+    layout.diferido = True
+    return layout
+
+
+def registrar_paginas(carpeta='pages', diferida=True):
+    """Importa cada página de `carpeta` (como haría Dash) midiendo el tiempo.
+
+    Con diferida=False los layouts diferidos se arman ya, al arrancar.
+    """
+    # Relativa a la raíz del proyecto, no al directorio desde donde se lanza
+    carpeta = os.path.join(RAIZ, carpeta)
+    paquete = os.path.basename(os.path.normpath(carpeta))
+
+    for archivo in sorted(os.listdir(carpeta)):
+        if archivo.startswith(('_', '.')) or not archivo.endswith('.py'):
+            continue
+        with open(os.path.join(carpeta, archivo), encoding='utf-8') as f:
+            if 'register_page' not in f.read():
+                continue
+
+        modulo = f"{paquete}.{archivo[:-3]}"
+        inicio = time.perf_counter()
+        pagina = importlib.import_module(modulo)
+        PERFIL.setdefault(modulo, {})['importar'] = time.perf_counter() - inicio
+        PERFIL[modulo]['diferido'] = getattr(pagina.layout, 'diferido', False)
+
+        # Lo mismo que hace Dash con las páginas que importa él mismo
+        registro = dash.page_registry[modulo]
+        if not registro['supplied_layout']:
+            registro['layout'] = pagina.layout
+
+        if not diferida and getattr(pagina.layout, 'diferido', False):
+            pagina.layout()
+
+
+def reporte_arranque():
+    filas = [f"{'Página':<22} {'Importar (ms)':>14} {'Layout (ms)':>14}"]
+    total_importar = total_layout = 0.0
+    for modulo, tiempos in PERFIL.items():
+        importar = tiempos.get('importar', 0.0)
+        layout = tiempos.get('layout')
+        total_importar += importar
+        total_layout += layout or 0.0
+        if layout is not None:
+            columna_layout = f"{layout * 1e3:14.1f}"
+        elif tiempos.get('diferido'):
+            columna_layout = f"{'(pendiente)':>14}"  # diferido y aún sin visitar
+        else:
+            columna_layout = f"{'(al importar)':>14}"  # layout estático, ya contado arriba
+        filas.append(f"{modulo:<22} {importar * 1e3:14.1f} {columna_layout}")
+    filas.append(f"{'TOTAL':<22} {total_importar * 1e3:14.1f} {total_layout * 1e3:14.1f}")
+    return '\n'.join(filas)
+
+
+if __name__ == '__main__':
+    # Perfil completo: importar la app y luego armar todos los layouts
+    #   python utils/paginas.py
+    sys.path.append(RAIZ)
+
+    inicio = time.perf_counter()
+    import app  # noqa: F401
+    arranque = time.perf_counter() - inicio
+
+    from utils.paginas import PERFIL as perfil, reporte_arranque as reporte
+    for pagina in dash.page_registry.values():
+        if callable(pagina['layout']):
+            pagina['layout']()
+
+    print(reporte())
+    print(f"\nArranque total de app.py: {arranque * 1e3:.1f} ms ({len(perfil)} páginas)")
@@ -0,0 +1,99 @@
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+
+import plotly.io as pio
+
+# =====================================================================
+# Figuras estáticas precalculadas
+#
+# Las páginas de teoría (clase1, clase2, aplicaciones) dibujan figuras
+# con parámetros fijos. En lugar de integrar y construir esas figuras al
+# importar la página en cada worker, se guardan una vez como JSON en
+# precalculado/ y las páginas solo las cargan. Cada archivo lleva una
+# huella de los parámetros y del código que la generó: si cambian, la
+# figura se regenera sola la próxima vez que se cargue.
+#
+# Para regenerarlas todas (p. ej. en el build):
+#   python utils/precalculo.py
+# =====================================================================
+
+CARPETA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'precalculado')
+
+# nombre -> (parametros, construir); se llena al importar las páginas
+REGISTRO = {}
+
+
+def huella(parametros, construir):
+    texto = json.dumps(parametros, sort_keys=True) + inspect.getsource(construir)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+
+def _ruta(nombre):
+    return os.path.join(CARPETA, f'{nombre}.json')
+
+
+def _escribir(nombre, parametros, construir):
+    figura = construir(**parametros)
+    contenido = {
+        'huella': huella(parametros, construir),
+        # go.Figure o el dict que arma utils/figuras.py
+        'figura': figura if isinstance(figura, dict) else figura.to_plotly_json(),
+    }
+    # El codificador de Plotly guarda los arreglos de NumPy en base64 (compacto)
+    texto = pio.to_json(contenido, validate=False, pretty=False)
+
+    # Escritura atómica: varios workers pueden regenerar a la vez
+    os.makedirs(CARPETA, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=CARPETA, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as archivo:
+        archivo.write(texto)
+    os.chmod(temporal, 0o644)
+    os.replace(temporal, _ruta(nombre))
+    return json.loads(texto)['figura']
+
+
+def figura_precalculada(nombre, parametros, construir):
+    """Devuelve la figura `nombre` (como dict) desde precalculado/.
+
+    Si el archivo no existe o su huella no coincide con los parámetros y
+    el código actuales, llama a construir(**parametros) y lo reescribe.
+    """
+    REGISTRO[nombre] = (parametros, construir)
+    try:
+        with open(_ruta(nombre), encoding='utf-8') as archivo:
+            contenido = json.load(archivo)
+        if contenido.get('huella') == huella(parametros, construir):
+            return contenido['figura']
+    except (OSError, ValueError):
+        pass
+
+    try:
+        return _escribir(nombre, parametros, construir)
+    except OSError:
+        # Sin permiso de escritura: servimos la figura igual, sin guardarla
+        return construir(**parametros)
+
+
+def regenerar_todo():
+    for nombre, (parametros, construir) in REGISTRO.items():
+        _escribir(nombre, parametros, construir)
+        print(f"Regenerada: {_ruta(nombre)}")
+
+
+if __name__ == '__main__':
+    # Importar la app registra todas las páginas (y sus figuras fijas)
+    sys.path.append(os.path.dirname(CARPETA))
+    os.chdir(os.path.dirname(CARPETA))
+    import app  # noqa: F401
+    import dash
+    # Los layouts son diferidos (utils/paginas.py): armarlos registra sus figuras
+    for pagina in dash.page_registry.values():
+        if callable(pagina['layout']):
+            pagina['layout']()
+    # Este archivo corre como __main__; el REGISTRO lleno es el de utils.precalculo
+    from utils.precalculo import regenerar_todo as regenerar
+    regenerar()
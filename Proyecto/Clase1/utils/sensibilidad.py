@@ -0,0 +1,159 @@
+import numpy as np
+
+from utils.modelos import seir, integrar
+from utils.trabajos import PROCESOS, ejecutor
+
+# =====================================================================
+# Análisis de sensibilidad global (índices de Sobol) del SEIR
+#
+# ¿Qué parámetro mueve más el pico de infectados: β, γ o σ? En vez de
+# barridos a mano, se muestrea todo el rango de los parámetros con una
+# secuencia cuasi-aleatoria de Sobol (esquema de Saltelli: matrices A, B
+# y las A_B^(i), n·(d + 2) simulaciones) y se estiman:
+#
+#   S_i  (primer orden): parte de la varianza de la salida que explica
+#        el parámetro i solo;
+#   ST_i (total): la que explica junto con sus interacciones.
+#
+# Las muestras se integran por trozos, cada trozo como un solo lote de
+# integrar(), repartidos en el pool de procesos de utils/trabajos.py.
+# De cada trozo solo vuelven las salidas escalares (pico, día del pico,
+# tamaño final): la memoria queda acotada por el tamaño del trozo aunque
+# se hagan 10^5 simulaciones.
+# =====================================================================
+
+PARAMETROS = ('beta', 'gamma', 'sigma')
+SALIDAS = ('pico', 'dia_pico', 'tamano_final')
+
+TAMANO_TROZO = 4096
+REMUESTREOS = 200  # bootstrap para los intervalos de los índices
+# Una salida cuya desviación estándar no pasa de esta fracción de su media
+# se toma como constante: no hay varianza que repartir entre los parámetros
+TOLERANCIA_CONSTANTE = 1e-9
+
+
+# --- 1. Salidas del SEIR para un trozo de muestras ---
+
+def salidas_seir(muestras, N, I0, t_max):
+    """(pico, día del pico, tamaño final) para cada fila (β, γ, σ) de `muestras`.
+
+    El pico y su día los sigue el integrador paso a paso (integrar(...,
+    maximo=)): con una malla fija de puntos, un t_max de años dejaba todo
+    el brote entre dos muestras.
+    """
+    beta, gamma, sigma = np.asarray(muestras, dtype=float).T
+    y0 = np.tile([N - I0, 0.0, I0, 0.0], (len(beta), 1))
+    info = {}
+    y = integrar(seir, y0, np.array([0.0, t_max]), args=(beta, gamma, sigma, N), info=info, maximo=2)
+
+    return np.stack([
+        info['maximo'],
+        info['t_maximo'],
+        N - y[-1, :, 0],
+    ], axis=1)
+
+
+# --- 2. Muestreo de Saltelli ---
+
+def muestras_saltelli(limites, n, semilla=None):
+    """Matrices A y B (n, d) de una secuencia de Sobol de dimensión 2d, escaladas a `limites`.
+
+    n debería ser potencia de 2 (si no, la secuencia pierde su balance).
+    """
+    from scipy.stats import qmc  # Solo al calcular: scipy.stats tarda ~0.5 s en importarse
+
+    limites = np.asarray(limites, dtype=float)
+    d = len(limites)
+    base = qmc.Sobol(2 * d, scramble=True, rng=semilla).random(n)
+    inferior, superior = np.tile(limites[:, 0], 2), np.tile(limites[:, 1], 2)
+    escaladas = qmc.scale(base, inferior, superior)
+    return escaladas[:, :d], escaladas[:, d:]
+
+
+def _matriz_ab(A, B, i):
+    # A con la columna i tomada de B
+    AB = A.copy()
+    AB[:, i] = B[:, i]
+    return AB
+
+
+# --- 3. Evaluación por trozos ---
+
+def _trozo(A, B, N, I0, t_max):
+    # Unas filas de A, B y de cada A_B^(i), como un solo lote
+    n, d = A.shape
+    bloques = [A, B] + [_matriz_ab(A, B, i) for i in range(d)]
+    salidas = salidas_seir(np.concatenate(bloques), N, I0, t_max)
+    return salidas.reshape(d + 2, n, -1)
+
+
+def evaluar(A, B, N, I0, t_max, procesos=PROCESOS, tamano_trozo=TAMANO_TROZO, avance=None):
+    """Salidas (d + 2, n, n_salidas) para A, B y las A_B^(i): fA = [0], fB = [1], fABi = [2 + i].
+
+    avance(hecho, total) se llama al terminar cada trozo.
+    """
+    n, d = A.shape
+    filas_trozo = max(tamano_trozo // (d + 2), 1)
+    tareas = [(A[inicio:inicio + filas_trozo], B[inicio:inicio + filas_trozo], N, I0, t_max)
+              for inicio in range(0, n, filas_trozo)]
+
+    if procesos > 1 and len(tareas) > 1:
+        resultados = ejecutor(procesos).map(_trozo, *zip(*tareas))
+    else:
+        resultados = (_trozo(*tarea) for tarea in tareas)
+    trozos = []
+    for trozo in resultados:
+        trozos.append(trozo)
+        if avance is not None:
+            avance(len(trozos), len(tareas))
+    return np.concatenate(trozos, axis=1)
+
+
+# --- 4. Índices de Sobol ---
+
+def constantes(f):
+    """Máscara (n_salidas,): salidas sin varianza en las muestras A y B."""
+    fAB = np.concatenate([f[0], f[1]])
+    return np.std(fAB, axis=0) <= TOLERANCIA_CONSTANTE * np.maximum(np.abs(fAB.mean(axis=0)), 1.0)
+
+
+def indices_sobol(f):
+    """(S1, ST), cada uno (d, n_salidas), con los estimadores de Saltelli (2010) y Jansen.
+
+    f: salidas de evaluar(), forma (d + 2, n, n_salidas).
+    """
+    fA, fB, fAB = f[0], f[1], f[2:]
+    varianza = np.var(np.concatenate([fA, fB]), axis=0)
+    varianza = np.where(constantes(f), np.inf, varianza)  # salida constante: índices 0
+    S1 = np.mean(fB * (fAB - fA), axis=1) / varianza
+    ST = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / varianza
+    return S1, ST
+
+
+def sobol(limites, n=1024, N=1000, I0=1, t_max=160, semilla=None, procesos=PROCESOS,
+          tamano_trozo=TAMANO_TROZO, remuestreos=REMUESTREOS, avance=None):
+    """Índices de Sobol de (pico, día del pico, tamaño final) respecto de (β, γ, σ).
+
+    limites: [(min, max)] de β, γ y σ. Hace n·(d + 2) simulaciones, por
+    trozos; avance(hecho, total) se llama al terminar cada uno.
+    Devuelve un dict con 'S1', 'ST' (d, n_salidas), sus intervalos de
+    bootstrap al 95 % 'S1_ic', 'ST_ic' (2, d, n_salidas), 'constante'
+    (n_salidas,: salidas sin varianza, con índices 0) y 'evaluaciones'.
+    """
+    A, B = muestras_saltelli(limites, n, semilla)
+    f = evaluar(A, B, N, I0, t_max, procesos, tamano_trozo, avance)
+    S1, ST = indices_sobol(f)
+
+    # Bootstrap sobre las n filas (sin volver a integrar)
+    rng = np.random.default_rng(semilla)
+    remuestras = [indices_sobol(f[:, rng.integers(0, n, n)]) for _ in range(remuestreos)]
+    S1_b, ST_b = (np.array(r) for r in zip(*remuestras))
+
+    return {
+        'S1': S1,
+        'ST': ST,
+        'S1_ic': np.quantile(S1_b, [0.025, 0.975], axis=0),
+        'ST_ic': np.quantile(ST_b, [0.025, 0.975], axis=0),
+        'constante': constantes(f),
+        'evaluaciones': f.shape[0] * f.shape[1],
+    }
@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+
+# =====================================================================
+# Submuestreo de trazas para pantalla (Largest-Triangle-Three-Buckets)
+#
+# Las simulaciones se evalúan con la salida densa del integrador sobre
+# una malla fina (tiempos_densos), proporcional al horizonte. Al
+# navegador no tiene sentido mandar más puntos que píxeles: submuestrear
+# reduce todas las series de una figura a un presupuesto fijo de puntos
+# con LTTB, que conserva la forma visual de la curva, y además agrega
+# siempre el máximo y el mínimo de cada serie (p. ej. el pico de
+# infectados). Así el tamaño de la respuesta no depende de t_max.
+# =====================================================================
+
+# Puntos por figura que se envían al navegador (~ancho de la gráfica en px)
+PUNTOS_PANTALLA = int(os.environ.get('PUNTOS_PANTALLA', 800))
+
+# Resolución de la malla densa donde se evalúa la solución
+PUNTOS_POR_UNIDAD = 20
+PUNTOS_DENSOS_MIN = 2000
+PUNTOS_DENSOS_MAX = 50000
+
+
+def tiempos_densos(t_max, por_unidad=PUNTOS_POR_UNIDAD,
+                   minimo=PUNTOS_DENSOS_MIN, maximo=PUNTOS_DENSOS_MAX):
+    """Malla de tiempos para la salida densa: más puntos cuanto más largo el horizonte."""
+    n_puntos = int(min(max(t_max * por_unidad, minimo), maximo))
+    return np.linspace(0, t_max, n_puntos)
+
+
+def _numerico(x):
+    # Fechas (datetime64) como números: solo importan las distancias
+    x = np.asarray(x)
+    if x.dtype.kind == 'M':
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def indices_lttb(x, y, n_puntos):
+    """Índices de los n_puntos que LTTB conserva de la serie (x, y).
+
+    Siempre incluye el primer y el último punto. Los puntos interiores se
+    reparten en n_puntos - 2 cubetas y de cada una se elige el que forma
+    el triángulo más grande con el punto elegido antes y el promedio de
+    la cubeta siguiente.
+    """
+    n = len(x)
+    if n_puntos >= n or n_puntos < 3:
+        return np.arange(n)
+
+    x = _numerico(x)
+    y = np.asarray(y, dtype=float)
+
+    # Bordes de las cubetas sobre los puntos interiores [1, n - 1)
+    bordes = np.linspace(1, n - 1, n_puntos - 1).astype(int)
+    tamanos = np.diff(bordes)
+    # Promedio de cada cubeta; la "siguiente" de la última es el punto final
+    medias_x = np.append(np.add.reduceat(x[:-1], bordes[:-1]) / tamanos, x[-1])
+    medias_y = np.append(np.add.reduceat(y[:-1], bordes[:-1]) / tamanos, y[-1])
+
+    elegidos = np.empty(n_puntos, dtype=np.intp)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(n_puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        ax, ay = x[a], y[a]
+        cx, cy = medias_x[i + 1], medias_y[i + 1]
+        # Doble del área del triángulo (a, b, c) para cada b de la cubeta
+        area = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        a = inicio + int(np.argmax(area))
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def _extremos(y):
+    validos = np.flatnonzero(np.isfinite(y))
+    if not len(validos):
+        return validos
+    return validos[[np.argmax(y[validos]), np.argmin(y[validos])]]
+
+
+def submuestrear(x, *series, n_puntos=PUNTOS_PANTALLA):
+    """Reduce (x, serie1, serie2, ...) a unos n_puntos compartidos.
+
+    Cada serie aporta sus puntos LTTB (n_puntos / número de series) más
+    su máximo y su mínimo; todas se devuelven sobre la unión de esos
+    índices, así siguen compartiendo el mismo eje x.
+    """
+    x = np.asarray(x)
+    series = [np.asarray(s) for s in series]
+    if len(x) <= n_puntos or not series:
+        return (x, *series)
+
+    por_serie = max(n_puntos // len(series), 3)
+    indices = [indices_lttb(x, s, por_serie) for s in series]
+    indices += [_extremos(np.asarray(s, dtype=float)) for s in series]
+    elegidos = np.unique(np.concatenate(indices))
+    return (x[elegidos], *(s[elegidos] for s in series))
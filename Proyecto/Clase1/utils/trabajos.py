@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils.cache_disco import avisar_sin_disco, directorio_privado
+from utils.modelos import integrar
+
+# =====================================================================
+# Trabajos pesados en segundo plano (Dash background callbacks)
+#
+# Un t_max enorme en SIR/SEIR, un barrido (β, γ) muy fino, un mallado
+# gigante en el campo vectorial, miles de distritos en la metapoblación,
+# una calibración con muchos puntos de partida o un análisis de Sobol
+# con 10^5 simulaciones dejaban bloqueado a un worker de gunicorn hasta
+# terminar. Ahora cada página decide con es_pesado(): los pedidos chicos
+# siguen por el camino rápido (callback normal + caché) y los grandes se
+# mandan a un proceso aparte con DiskcacheManager, con barra de
+# progreso, botón para cancelar y límites de CPU/memoria por trabajo. Su
+# resultado se guarda en las mismas cachés y con la misma clave que el
+# camino rápido, así un pedido pesado repetido ya no vuelve a segundo plano.
+#
+# Si diskcache/multiprocess no están instalados, o no se puede crear su
+# directorio, gestor_fondo es None y todo sigue por el camino normal (con
+# los mismos topes de tamaño).
+# =====================================================================
+
+# A partir de aquí un pedido se considera pesado
+LIMITE_T_MAX = float(os.environ.get('TRABAJO_LIMITE_T_MAX', 5000))
+LIMITE_MALLADO = int(os.environ.get('TRABAJO_LIMITE_MALLADO', 150))
+LIMITE_DISTRITOS = int(os.environ.get('TRABAJO_LIMITE_DISTRITOS', 2500))  # metapoblación: 50 x 50
+LIMITE_BARRIDO = int(os.environ.get('TRABAJO_LIMITE_BARRIDO', 2500))  # barrido SIR: malla 50 x 50
+LIMITE_AJUSTES = float(os.environ.get('TRABAJO_LIMITE_AJUSTES', 16))  # calibración: utils/calibracion.carga
+LIMITE_SIMULACIONES = int(os.environ.get('TRABAJO_LIMITE_SIMULACIONES', 25000))  # sensibilidad (Sobol)
+
+# Topes de cada trabajo
+T_MAX_MAXIMO = float(os.environ.get('TRABAJO_T_MAX_MAXIMO', 1e6))
+MALLADO_MAXIMO = int(os.environ.get('TRABAJO_MALLADO_MAXIMO', 600))
+CPU_MAXIMO = int(os.environ.get('TRABAJO_CPU_SEGUNDOS', 120))
+MEMORIA_MAXIMA = int(os.environ.get('TRABAJO_MEMORIA_MB', 1024)) * 1024 * 1024
+
+# Procesos para los cálculos que se reparten (ensambles, ajustes, ...)
+PROCESOS = int(os.environ.get('TRABAJO_PROCESOS', os.cpu_count() or 1))
+
+def _crear_gestor():
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+    except ImportError:
+        return None
+    # Los resultados se guardan en disco: cualquier worker de gunicorn los lee.
+    # diskcache los guarda con pickle: nunca en un /tmp compartido. Si no hay
+    # dónde crear el directorio, todo sigue por el camino normal.
+    try:
+        ruta = os.environ.get('TRABAJO_RUTA') or os.path.join(directorio_privado(), 'trabajos')
+        return DiskcacheManager(diskcache.Cache(ruta), expire=3600)
+    except (OSError, sqlite3.Error) as error:
+        avisar_sin_disco('Trabajos en segundo plano', error)
+        return None
+
+
+gestor_fondo = _crear_gestor()
+
+
+def es_pesado(t_max=0, mallado=0, distritos=0, ajustes=0, simulaciones=0, barrido=0):
+    try:
+        return float(t_max) > LIMITE_T_MAX or int(mallado) > LIMITE_MALLADO \
+            or int(distritos) > LIMITE_DISTRITOS or float(ajustes) > LIMITE_AJUSTES \
+            or int(simulaciones) > LIMITE_SIMULACIONES or int(barrido) > LIMITE_BARRIDO
+    except (TypeError, ValueError):
+        return False
+
+
+def _memoria_datos():
+    # Bytes de datos que ya usa el proceso (VmData: heap y mapeos anónimos), si se pueden leer
+    try:
+        with open('/proc/self/status') as estado:
+            for linea in estado:
+                if linea.startswith('VmData:'):
+                    return int(linea.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def limitar_recursos():
+    """Topes de CPU y memoria para el proceso del trabajo (no para el worker).
+
+    La memoria se limita con RLIMIT_DATA (heap y mapeos anónimos, que es
+    donde NumPy reserva sus arreglos) y no con RLIMIT_AS: el espacio de
+    direcciones de un proceso hijo del worker ya ocupa cientos de MB de
+    bibliotecas. El tope es lo que el proceso ya usa + MEMORIA_MAXIMA.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows: sin límites por proceso
+        return
+
+    def fijar(recurso, limite):
+        _, duro = resource.getrlimit(recurso)
+        if duro != resource.RLIM_INFINITY:
+            limite = min(limite, duro)
+        resource.setrlimit(recurso, (limite, duro))
+
+    fijar(resource.RLIMIT_CPU, CPU_MAXIMO)
+    fijar(getattr(resource, 'RLIMIT_DATA', resource.RLIMIT_AS), _memoria_datos() + MEMORIA_MAXIMA)
+
+
+def integrar_por_tramos(rhs, y0, t_eval, args=(), avance=None, tramos=20, info=None, **opciones):
+    """Como utils.modelos.integrar, pero por tramos de t_eval, llamando a
+    avance(hecho, total) después de cada uno (para la barra de progreso).
+
+    Con maximo=, info recibe el máximo de todos los tramos; el resto de
+    info es el del último tramo."""
+    t_eval = np.asarray(t_eval, dtype=float)
+    y0 = np.asarray(y0, dtype=float)
+    salida = np.empty((len(t_eval),) + y0.shape)
+    cortes = np.linspace(0, len(t_eval) - 1, min(tramos, len(t_eval) - 1) + 1).astype(int)
+
+    salida[0] = y0
+    for i, (a, b) in enumerate(zip(cortes[:-1], cortes[1:])):
+        # Cada tramo parte del último estado del anterior
+        parcial = {}
+        salida[a:b + 1] = integrar(rhs, salida[a], t_eval[a:b + 1], args, info=parcial, **opciones)
+        if info is not None:
+            if 'maximo' in info and 'maximo' in parcial:
+                mayor = parcial['maximo'] > info['maximo']
+                parcial['maximo'] = np.where(mayor, parcial['maximo'], info['maximo'])
+                parcial['t_maximo'] = np.where(mayor, parcial['t_maximo'], info['t_maximo'])
+            info.update(parcial)
+        if avance is not None:
+            avance(i + 1, len(cortes) - 1)
+    return salida
+
+
+# --- Pool de procesos compartido ---
+
+_pools = {}  # (pid, procesos) -> ProcessPoolExecutor
+_pools_lock = threading.Lock()
+
+
+def ejecutor(procesos=PROCESOS):
+    """ProcessPoolExecutor de `procesos` procesos, uno por worker y creado al primer uso."""
+    # Un pool por proceso: gunicorn hace fork de los workers
+    with _pools_lock:
+        clave = (os.getpid(), procesos)
+        if clave not in _pools:
+            _pools[clave] = ProcessPoolExecutor(procesos)
+        return _pools[clave]